@@ -0,0 +1,83 @@
+"""
+Фоновое подключение к базе данных с повторными попытками
+Позволяет не блокировать запуск приложения, пока сервер БД недоступен
+"""
+
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundConnectMixin:
+    """
+    Примесь для классов подключения с методом _connect() -> bool
+
+    Класс-наследник должен вызвать _init_background_connect() в __init__
+    и вызывать _mark_ready() / _mark_not_ready() при изменении состояния подключения.
+    """
+
+    def _init_background_connect(self, retry_interval: float) -> None:
+        """
+        Инициализация состояния фонового подключения
+
+        Args:
+            retry_interval (float): Пауза между попытками подключения, сек
+        """
+        self.retry_interval = retry_interval
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._retry_lock = threading.Lock()
+        self._retry_thread = None
+
+    @property
+    def is_ready(self) -> bool:
+        """Установлено ли подключение"""
+        return self._ready.is_set()
+
+    def _mark_ready(self) -> None:
+        self._ready.set()
+
+    def _mark_not_ready(self) -> None:
+        self._ready.clear()
+
+    def connect_in_background(self) -> None:
+        """Запуск фонового потока подключения (если он ещё не запущен)"""
+        with self._retry_lock:
+            if self._stopped.is_set() or self.is_ready:
+                return
+            if self._retry_thread is not None and self._retry_thread.is_alive():
+                return
+            self._retry_thread = threading.Thread(
+                target=self._retry_loop,
+                name=f"{type(self).__name__}-connect",
+                daemon=True
+            )
+            self._retry_thread.start()
+
+    def _retry_loop(self) -> None:
+        """Повторные попытки подключения до успеха или остановки"""
+        while not self._stopped.is_set():
+            if self._connect():
+                return
+            logger.info(
+                f"{type(self).__name__}: повторная попытка подключения через {self.retry_interval} с"
+            )
+            self._stopped.wait(self.retry_interval)
+
+    def wait_ready(self, timeout: float) -> bool:
+        """
+        Ожидание подключения
+
+        Args:
+            timeout (float): Максимальное время ожидания, сек
+
+        Returns:
+            bool: True если подключение установлено
+        """
+        return self._ready.wait(timeout)
+
+    def _stop_background_connect(self) -> None:
+        """Остановка фоновых попыток подключения"""
+        self._stopped.set()
+        self._ready.clear()
@@ -0,0 +1,190 @@
+"""
+Отслеживание изменений данных Sakila по колонке last_update
+
+ChangeWatcher периодически одним запросом читает MAX(last_update) и COUNT(*)
+каждой отслеживаемой таблицы. Если значения изменились, читаются только строки
+с last_update не раньше последней отметки, и подписчикам рассылается событие
+ChangeEvent с конкретными film_id, actor_id и жанрами. Удаление строк не меняет
+MAX(last_update) и видно только по COUNT(*) - тогда таблица помечается как
+изменённая целиком.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+import threading
+import logging
+
+from app.utils.pubsub import PubSub
+
+logger = logging.getLogger(__name__)
+
+# Запрос изменённых строк по таблице: ключи, по которым кэши сбрасываются точечно
+CHANGED_ROWS_QUERIES = {
+    "film": "SELECT film_id FROM film WHERE last_update >= %s",
+    "actor": "SELECT actor_id FROM actor WHERE last_update >= %s",
+    "category": "SELECT category_id, name AS genre FROM category WHERE last_update >= %s",
+    "film_actor": "SELECT film_id, actor_id FROM film_actor WHERE last_update >= %s",
+    "film_category": """
+        SELECT fc.film_id, c.name AS genre
+        FROM film_category fc
+        JOIN category c ON fc.category_id = c.category_id
+        WHERE fc.last_update >= %s
+    """,
+}
+WATCHED_TABLES = tuple(CHANGED_ROWS_QUERIES)
+
+
+class ChangeEvent:
+    """Изменения данных, найденные за один опрос"""
+
+    __slots__ = ("film_ids", "actor_ids", "genres", "tables", "full_tables")
+
+    def __init__(self):
+        self.film_ids: Set[int] = set()
+        self.actor_ids: Set[int] = set()
+        self.genres: Set[str] = set()
+        # Таблицы с изменениями
+        self.tables: Set[str] = set()
+        # Таблицы, изменённые целиком (удаление строк или первая загрузка отметок)
+        self.full_tables: Set[str] = set()
+
+    def __bool__(self) -> bool:
+        return bool(self.tables)
+
+    def affects(self, table: str) -> bool:
+        return table in self.tables
+
+    def as_dict(self) -> Dict[str, List]:
+        return {
+            "film_ids": sorted(self.film_ids),
+            "actor_ids": sorted(self.actor_ids),
+            "genres": sorted(self.genres),
+            "tables": sorted(self.tables),
+            "full_tables": sorted(self.full_tables),
+        }
+
+
+class ChangeWatcher:
+    """Периодический опрос last_update таблиц Sakila и рассылка событий изменений"""
+
+    def __init__(self, mysql_db, interval: float = 10.0, tables=WATCHED_TABLES):
+        """
+        Args:
+            mysql_db (MySQLConnector): Подключение к MySQL
+            interval (float): Интервал опроса, сек
+            tables: Отслеживаемые таблицы (из WATCHED_TABLES)
+        """
+        self.mysql_db = mysql_db
+        self.interval = interval
+        self.tables = tuple(tables)
+        # Отметки последнего опроса: таблица -> (MAX(last_update), COUNT(*))
+        self._marks: Dict[str, tuple] = {}
+        self.events = PubSub()
+        self.polls = 0
+        self.last_event: Optional[Dict] = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def _read_marks(self) -> Optional[Dict[str, tuple]]:
+        """MAX(last_update) и COUNT(*) всех таблиц одним запросом"""
+        query = " UNION ALL ".join(
+            f"SELECT '{table}' AS table_name, MAX(last_update) AS max_update, "
+            f"COUNT(*) AS row_count FROM {table}"
+            for table in self.tables
+        )
+        # Чтение идёт туда же, куда и запросы поиска (реплики): событие рассылается,
+        # когда изменение уже видно запросам, заполняющим кэши
+        rows = self.mysql_db._execute_query(query, name="change_watch.marks")
+        if rows is None:
+            return None
+        return {row["table_name"]: (row["max_update"], row["row_count"]) for row in rows}
+
+    def _collect_rows(self, event: ChangeEvent, table: str, since: datetime) -> bool:
+        """Добавление в событие ключей строк таблицы, изменённых с момента since"""
+        rows = self.mysql_db._execute_query(
+            CHANGED_ROWS_QUERIES[table], (since,), name=f"change_watch.{table}"
+        )
+        if rows is None:
+            return False
+        for row in rows:
+            if "film_id" in row:
+                event.film_ids.add(row["film_id"])
+            if "actor_id" in row:
+                event.actor_ids.add(row["actor_id"])
+            if "genre" in row:
+                event.genres.add(row["genre"])
+        return True
+
+    def poll(self) -> Optional[ChangeEvent]:
+        """
+        Один опрос: сравнение отметок и рассылка события при изменениях
+
+        Первый успешный опрос только запоминает отметки.
+
+        Returns:
+            Optional[ChangeEvent]: Найденные изменения или None
+        """
+        if not self.mysql_db.is_ready:
+            return None
+        marks = self._read_marks()
+        if marks is None:
+            return None
+        self.polls += 1
+        if not self._marks:
+            self._marks = marks
+            return None
+
+        event = ChangeEvent()
+        for table in self.tables:
+            previous_update, previous_count = self._marks.get(table, (None, None))
+            max_update, row_count = marks.get(table, (None, None))
+            if (max_update, row_count) == (previous_update, previous_count):
+                continue
+            event.tables.add(table)
+            deleted = row_count is not None and previous_count is not None and row_count < previous_count
+            if deleted or (row_count != previous_count and max_update == previous_update):
+                # Удаление строк (в том числе вместе с изменениями): удалённые ключи неизвестны
+                event.full_tables.add(table)
+            elif previous_update is None or not self._collect_rows(event, table, previous_update):
+                event.full_tables.add(table)
+        self._marks = marks
+
+        if not event:
+            return None
+        self.last_event = event.as_dict()
+        logger.info(f"Изменения данных MySQL: {self.last_event}")
+        self.events.publish(event)
+        return event
+
+    def start(self) -> None:
+        """Запуск опроса в фоновом потоке"""
+        if self._thread is not None:
+            return
+
+        def run() -> None:
+            while not self._stopped.wait(self.interval):
+                try:
+                    self.poll()
+                except Exception as err:
+                    logger.error(f"Ошибка при проверке изменений данных: {err}")
+
+        self._thread = threading.Thread(target=run, name="ChangeWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict:
+        """Состояние для /api/stats/changes"""
+        return {
+            "interval": self.interval,
+            "polls": self.polls,
+            "marks": {
+                table: {"max_update": max_update, "row_count": row_count}
+                for table, (max_update, row_count) in self._marks.items()
+            },
+            "last_event": self.last_event,
+        }
@@ -0,0 +1,93 @@
+"""
+Граф партнёров по фильмам, построенный из film_actor при запуске
+
+Граф неизменяемый: при изменении film_actor (события ChangeWatcher) он строится
+заново из MySQL - для Sakila это несколько миллисекунд - и заменяет прежний.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import threading
+import time
+import logging
+
+from app.utils.costar_graph import CoStarGraph
+
+logger = logging.getLogger(__name__)
+
+
+class CoStarIndex:
+    """Текущий граф актёр-фильм и запросы к нему"""
+
+    def __init__(self, mysql_db):
+        """
+        Args:
+            mysql_db (MySQLConnector): Источник связей film_actor
+        """
+        self.mysql_db = mysql_db
+        self._load_lock = threading.Lock()
+        self.graph: Optional[CoStarGraph] = None
+        self.build_time_ms = None
+
+    def load(self) -> bool:
+        """
+        Построение графа по всем связям film_actor
+
+        Returns:
+            bool: True если данные загружены
+        """
+        start_time = time.time()
+        pairs = self.mysql_db.get_film_actor_pairs()
+        if pairs is None:
+            logger.warning("Граф партнёров не построен: нет данных MySQL")
+            return False
+        # Запросы читают self.graph один раз, поэтому замена ссылки атомарна для них
+        self.graph = CoStarGraph(pairs)
+        self.build_time_ms = round((time.time() - start_time) * 1000, 1)
+        logger.info(f"Граф партнёров: {self.graph.stats()}, {self.build_time_ms} мс")
+        return True
+
+    def ensure_loaded(self) -> Optional[CoStarGraph]:
+        """Граф (строится при первом обращении, если не построен при запуске)"""
+        if self.graph is None:
+            with self._load_lock:
+                if self.graph is None:
+                    self.load()
+        return self.graph
+
+    def on_change(self, event) -> None:
+        """
+        Перестроение графа по событию ChangeWatcher
+
+        Args:
+            event (ChangeEvent): Изменения данных
+        """
+        if self.graph is not None and event.affects("film_actor"):
+            self.load()
+
+    # ===== ЗАПРОСЫ =====
+    def shared_films(self, actor_ids: List[int]) -> List[int]:
+        """ID фильмов, в которых снимались все актёры (пустой список без графа)"""
+        graph = self.ensure_loaded()
+        return graph.shared_films(actor_ids) if graph is not None else []
+
+    def costars(self, actor_id: int, limit: int) -> Optional[List[Tuple[int, int]]]:
+        """(actor_id, общих фильмов) партнёров; None, если актёр неизвестен"""
+        graph = self.ensure_loaded()
+        if graph is None or not graph.has_actor(actor_id):
+            return None
+        return graph.costars(actor_id, limit)
+
+    def shortest_path(self, from_id: int, to_id: int,
+                      max_depth: int) -> Optional[List[Tuple[int, Optional[int]]]]:
+        """Цепочка (actor_id, film_id) от from_id до to_id; None, если её нет"""
+        graph = self.ensure_loaded()
+        if graph is None:
+            return None
+        return graph.shortest_path(from_id, to_id, max_depth)
+
+    def stats(self) -> Dict:
+        graph = self.graph
+        return {
+            **(graph.stats() if graph is not None else {}),
+            "build_time_ms": self.build_time_ms,
+        }
@@ -0,0 +1,156 @@
+"""
+Индекс названий фильмов и имён актёров для поиска с опечатками
+
+Индекс строится из MySQL один раз и обновляется по событиям ChangeWatcher
+только для изменённых фильмов и актёров. Поиск выполняется в памяти
+(SymSpellIndex), MySQL используется только для выборки найденных фильмов по ID.
+"""
+
+from typing import Dict, List
+import threading
+import time
+import logging
+
+from app.utils.fuzzy import SymSpellIndex, index_names, rank_items, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Режимы поиска по названию и имени актёра
+EXACT = "exact"
+FUZZY = "fuzzy"
+MODE_PATTERN = f"^({EXACT}|{FUZZY})$"
+
+
+class FuzzyIndex:
+    """Названия фильмов и имена актёров в словарях SymSpell"""
+
+    def __init__(self, mysql_db, max_distance: int = 2, limit: int = 1000):
+        """
+        Args:
+            mysql_db (MySQLConnector): Источник названий и имён
+            max_distance (int): Максимальное число опечаток в слове
+            limit (int): Максимальное количество найденных фильмов или актёров
+        """
+        self.mysql_db = mysql_db
+        self.max_distance = max_distance
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._films = SymSpellIndex(max_distance)
+        self._actors = SymSpellIndex(max_distance)
+        self._titles: Dict[int, str] = {}
+        self._actor_names: Dict[int, str] = {}
+        self.loaded = False
+        self.load_time_ms = None
+
+    # ===== ПОСТРОЕНИЕ =====
+    def load(self) -> bool:
+        """
+        Построение индекса по всем фильмам и актёрам
+
+        Returns:
+            bool: True если данные загружены
+        """
+        start_time = time.time()
+        films = self.mysql_db.get_film_titles()
+        actors = self.mysql_db.get_actor_names()
+        if films is None or actors is None:
+            logger.warning("Индекс поиска с опечатками не построен: нет данных MySQL")
+            return False
+
+        film_index, actor_index = SymSpellIndex(self.max_distance), SymSpellIndex(self.max_distance)
+        titles = {row['film_id']: row['title'] for row in films}
+        actor_names = {
+            row['actor_id']: f"{row['first_name']} {row['last_name']}" for row in actors
+        }
+        index_names(film_index, titles, titles)
+        index_names(actor_index, actor_names, actor_names)
+        with self._lock:
+            self._films, self._actors = film_index, actor_index
+            self._titles, self._actor_names = titles, actor_names
+            self.loaded = True
+        self.load_time_ms = round((time.time() - start_time) * 1000, 1)
+        logger.info(
+            f"Индекс поиска с опечатками: фильмов {len(titles)}, актёров {len(actor_names)}, "
+            f"{self.load_time_ms} мс"
+        )
+        return True
+
+    def ensure_loaded(self) -> bool:
+        """Построение индекса при первом обращении (если не построен при запуске)"""
+        if self.loaded:
+            return True
+        with self._load_lock:
+            return self.loaded or self.load()
+
+    def on_change(self, event) -> None:
+        """
+        Обновление индекса по событию ChangeWatcher
+
+        Args:
+            event (ChangeEvent): Изменения данных
+        """
+        if not self.loaded:
+            return
+        if "film" in event.full_tables or "actor" in event.full_tables:
+            self.load()
+            return
+        if event.affects("film") and event.film_ids:
+            rows = self.mysql_db.get_film_titles(sorted(event.film_ids))
+            if rows is not None:
+                self._reindex(self._films, self._titles, event.film_ids,
+                              {row['film_id']: row['title'] for row in rows})
+        if event.affects("actor") and event.actor_ids:
+            rows = self.mysql_db.get_actor_names(sorted(event.actor_ids))
+            if rows is not None:
+                self._reindex(self._actors, self._actor_names, event.actor_ids, {
+                    row['actor_id']: f"{row['first_name']} {row['last_name']}" for row in rows
+                })
+
+    def _reindex(self, index: SymSpellIndex, names: Dict[int, str], changed_ids,
+                 fresh: Dict[int, str]) -> None:
+        """Замена слов изменённых элементов (отсутствующие в fresh удаляются)"""
+        with self._lock:
+            for item in changed_ids:
+                old_name = names.pop(item, None)
+                if old_name is not None:
+                    for token in set(tokenize(old_name)):
+                        index.remove(token, item)
+            names.update(fresh)
+            index_names(index, names, fresh)
+
+    # ===== ПОИСК =====
+    def search_films(self, query: str) -> List[int]:
+        """
+        ID фильмов, в названии которых есть все слова запроса (с учётом опечаток)
+
+        Args:
+            query (str): Текст запроса
+
+        Returns:
+            List[int]: ID фильмов: сначала с меньшим числом опечаток, затем по названию
+        """
+        if not self.ensure_loaded():
+            return []
+        with self._lock:
+            ranked = rank_items(self._films, query, self._titles)
+        return [film_id for film_id, _ in ranked[:self.limit]]
+
+    def search_actors(self, name: str) -> List[Dict]:
+        """
+        Актёры, в имени которых есть все слова запроса (с учётом опечаток)
+
+        Args:
+            name (str): Имя, фамилия или оба
+
+        Returns:
+            List[Dict]: actor_id, full_name, distance (число опечаток)
+        """
+        if not self.ensure_loaded():
+            return []
+        with self._lock:
+            ranked = rank_items(self._actors, name, self._actor_names)
+            return [
+                {"actor_id": actor_id, "full_name": self._actor_names[actor_id], "distance": distance}
+                for actor_id, distance in ranked[:self.limit]
+            ]
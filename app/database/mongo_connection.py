@@ -6,18 +6,23 @@ from pymongo import MongoClient
 from pymongo.errors import ServerSelectionTimeoutError, ConnectionFailure
 import logging
 
+from app.database.background_connect import BackgroundConnectMixin
+
 logger = logging.getLogger(__name__)
 
 
-class MongoConnection:
+class MongoConnection(BackgroundConnectMixin):
     """Базовый класс для подключения к MongoDB"""
 
-    def __init__(self, mongodb_url: str, database_name: str):
+    def __init__(self, mongodb_url: str, database_name: str,
+                 connect: bool = True, retry_interval: float = 5.0):
         self.mongodb_url = mongodb_url
         self.database_name = database_name
         self.client = None
         self.db = None
-        self._connect()
+        self._init_background_connect(retry_interval)
+        if connect:
+            self._connect()
 
     def _connect(self) -> bool:
         """Установка подключения к MongoDB с обработкой ошибок"""
@@ -25,22 +30,43 @@ class MongoConnection:
             self.client = MongoClient(
                 self.mongodb_url,
                 serverSelectionTimeoutMS=5000,
-                connectTimeoutMS=10000
+                connectTimeoutMS=10000,
+                # Даты возвращаются с часовым поясом UTC (timestamp логов)
+                tz_aware=True
             )
             # Проверка подключения
             self.client.admin.command('ping')
             self.db = self.client[self.database_name]
+            self._on_connect()
             logger.info(f"Подключение к MongoDB успешно: {self.database_name}")
+            self._mark_ready()
             return True
         except (ServerSelectionTimeoutError, ConnectionFailure) as err:
             logger.error(f"Ошибка подключения к MongoDB: {err}")
+            self._close_client()
             return False
         except Exception as err:
             logger.error(f"Неизвестная ошибка при подключении к MongoDB: {err}")
+            self._close_client()
             return False
 
+    def _on_connect(self) -> None:
+        """
+        Подготовка после подключения, до отметки о готовности (для наследников)
+
+        Исключение считается неудачной попыткой подключения: клиент закрывается,
+        и фоновый поток повторяет попытку.
+        """
+
+    def _close_client(self) -> None:
+        """Закрытие клиента после неудачной попытки подключения"""
+        if self.client:
+            self.client.close()
+            self.client = None
+
     def close(self) -> None:
         """Закрытие подключения к MongoDB"""
+        self._stop_background_connect()
         if self.client:
             self.client.close()
             logger.info("Подключение к MongoDB закрыто")
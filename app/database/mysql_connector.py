@@ -4,32 +4,120 @@ DAO (Data Access Object) для работы с MySQL базой данных Sa
 """
 
 import mysql.connector
-from mysql.connector import Error
-from typing import List, Dict, Tuple, Optional
+from mysql.connector import Error, InterfaceError, OperationalError
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import List, Dict, Tuple, Optional, Iterator
 import logging
+import re
+import threading
+import time
+
+from app.database.background_connect import BackgroundConnectMixin
+from app.utils.cancellation import CancelToken, QueryCancelled, current_token, current_time_limit
+from app.database.query_stats import QueryStats, plan_warnings
+from app.database.replicas import ReplicaPool, ROUND_ROBIN
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Колонки фильма, возвращаемые поисковыми запросами
+FILM_COLUMNS = """f.film_id, f.title, f.description, f.release_year,
+                   f.length, f.rating, f.language_id"""
+# Колонки фильма для ответов без описания (проекция fields/include)
+FILM_COLUMNS_LITE = """f.film_id, f.title, f.release_year, f.length, f.rating"""
+
+
+# Максимальное количество запомненных результатов COUNT запросов
+COUNT_CACHE_SIZE = 1024
+
+# Параметры запросов при проверке планов (check_query_plans)
+PLAN_CHECK_SEARCHES = (
+    ('keyword', {'keyword': 'a'}),
+    ('genre__years_range', {'genre': 'Action', 'year_from': 2000, 'year_to': 2010}),
+    ('genre', {'genre': 'Action'}),
+    ('actor', {'actor_id': 1}),
+    ('actor_name', {'actor_name': 'a'}),
+    ('actor_ids', {'actor_ids': [1, 2]}),
+)
+
+# Режим проверки планов: запросы потока не выполняются, а собираются результаты EXPLAIN
+_plan_capture = threading.local()
 
-class MySQLConnector:
+# Коды ошибок прерванного запроса: KILL QUERY и превышение MAX_EXECUTION_TIME
+ER_QUERY_INTERRUPTED = 1317
+ER_QUERY_TIMEOUT = 3024
+
+_SELECT_PREFIX = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+
+
+def with_time_limit(query: str, limit_ms: Optional[int]) -> str:
+    """
+    Добавление подсказки оптимизатора MAX_EXECUTION_TIME к SELECT запросу
+
+    Args:
+        query (str): SQL запрос
+        limit_ms (Optional[int]): Лимит времени выполнения, мс (None - без лимита)
+
+    Returns:
+        str: Запрос с подсказкой (другие запросы - без изменений)
+    """
+    if not limit_ms:
+        return query
+    return _SELECT_PREFIX.sub(f"SELECT /*+ MAX_EXECUTION_TIME({int(limit_ms)}) */", query, count=1)
+
+
+class ConnectionUnavailable(Exception):
+    """Подключение к серверу БД отсутствует или потеряно"""
+
+
+class MySQLConnector(BackgroundConnectMixin):
     """
     Data Access Object для работы с базой данных MySQL.
     Обеспечивает безопасное подключение и выполнение запросов.
     """
 
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, connect: bool = True, retry_interval: float = 5.0,
+                 replicas: Optional[List[dict]] = None, replica_policy: str = ROUND_ROBIN,
+                 replica_failure_threshold: int = 3, replica_eviction_seconds: float = 30.0,
+                 query_stats: Optional[QueryStats] = None):
         """
         Инициализация подключения к базе данных
 
         Args:
             config (dict): Словарь конфигурации с параметрами подключения
                           (host, user, password, database)
+            connect (bool): Подключиться сразу (иначе - connect_in_background())
+            retry_interval (float): Пауза между фоновыми попытками подключения, сек
+            replicas (Optional[List[dict]]): Конфигурации реплик для чтения
+            replica_policy (str): Балансировка реплик: round_robin или least_outstanding
+            replica_failure_threshold (int): Ошибок подряд до исключения реплики
+            replica_eviction_seconds (float): Длительность исключения реплики, сек
+            query_stats (Optional[QueryStats]): Учёт времени запросов (общий с репликами)
         """
         self.config = config
+        self.query_stats = query_stats or QueryStats()
         self.connection = None
-        self._connect()
+        # Подключение не потокобезопасно: запросы из пула потоков выполняются по очереди
+        self._query_lock = threading.Lock()
+        # KILL QUERY и завершение запроса не пересекаются: KILL не достанется следующему запросу
+        self._kill_lock = threading.Lock()
+        # Последние значения общего количества результатов поиска (для облегчённого режима)
+        self._count_cache = OrderedDict()
+        self._count_cache_lock = threading.Lock()
+        self._init_background_connect(retry_interval)
+        self.replica_pool = None
+        if replicas:
+            self.replica_pool = ReplicaPool(
+                [
+                    MySQLConnector(replica, connect, retry_interval, query_stats=self.query_stats)
+                    for replica in replicas
+                ],
+                replica_policy, replica_failure_threshold, replica_eviction_seconds
+            )
+        if connect:
+            self._connect()
 
     def _connect(self) -> bool:
         """
@@ -42,7 +130,9 @@ class MySQLConnector:
             self.connection = mysql.connector.connect(**self.config)
             if self.connection.is_connected():
                 logger.info(f"Подключение к БД успешно: {self.config['database']}")
+                self._mark_ready()
                 return True
+            return False
         except Error as err:
             if err.errno == 2003:
                 logger.error("Ошибка подключения: сервер недоступен")
@@ -54,66 +144,501 @@ class MySQLConnector:
 
     def close(self) -> None:
         """Закрытие подключения к базе данных"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-            logger.info("Подключение к БД закрыто")
+        self._stop_background_connect()
+        if self.replica_pool is not None:
+            self.replica_pool.close()
+        try:
+            if self.connection and self.connection.is_connected():
+                self.connection.close()
+                logger.info("Подключение к БД закрыто")
+        except Error as err:
+            logger.warning(f"Ошибка при закрытии подключения: {err}")
+
+    def connect_in_background(self) -> None:
+        """Фоновое подключение к primary и ко всем репликам"""
+        super().connect_in_background()
+        if self.replica_pool is not None:
+            for replica in self.replica_pool.replicas:
+                replica.connect_in_background()
+
+    @contextmanager
+    def dedicated(self) -> Iterator['MySQLConnector']:
+        """
+        Отдельное подключение с той же конфигурацией
+
+        Используется для длительных операций (потоковая выгрузка),
+        чтобы не занимать основное подключение. Если настроены реплики,
+        подключение открывается к первой допущенной реплике.
+
+        Yields:
+            MySQLConnector: Новый экземпляр, закрываемый при выходе из контекста
+        """
+        config = self.config
+        if self.replica_pool is not None:
+            candidates = self.replica_pool.candidates()
+            if candidates:
+                config = candidates[0].config
+        connector = MySQLConnector(config, query_stats=self.query_stats)
+        try:
+            yield connector
+        finally:
+            connector.close()
 
-    def _execute_query(self, query: str, params: Tuple = None) -> Optional[List[Dict]]:
+    def _execute_query(self, query: str, params: Tuple = None, read_only: bool = True,
+                       name: str = "query") -> Optional[List[Dict]]:
         """
         Выполнение SELECT запроса с обработкой ошибок
 
+        Запросы только на чтение направляются на реплики (если настроены)
+        по политике балансировки; при недоступности всех реплик - на primary.
+
         Args:
             query (str): SQL запрос
             params (Tuple): Параметры для защиты от SQL injection
+            read_only (bool): Запрос только читает данные
+            name (str): Имя запроса в статистике выполнения
 
         Returns:
             List[Dict]: Список словарей с результатами или None при ошибке
         """
+        if read_only and self.replica_pool is not None:
+            for replica in self.replica_pool.candidates():
+                try:
+                    with self.replica_pool.track(replica):
+                        result = replica._execute_local(query, params, name)
+                    self.replica_pool.report_success(replica)
+                    return result
+                except ConnectionUnavailable as err:
+                    logger.warning(f"Реплика {replica.config.get('host')}: {err}")
+                    self.replica_pool.report_failure(replica)
+
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            result = cursor.fetchall()
-            cursor.close()
-            return result
+            return self._execute_local(query, params, name)
+        except ConnectionUnavailable as err:
+            logger.warning(f"{err}, запрос не выполнен")
+            return None
+
+    def _execute_local(self, query: str, params: Tuple = None,
+                       name: str = "query") -> Optional[List[Dict]]:
+        """
+        Выполнение запроса на собственном подключении
+
+        Время выполнения учитывается в query_stats под именем запроса;
+        для медленных запросов в журнал записываются параметры и план (EXPLAIN).
+        SELECT получает лимит MAX_EXECUTION_TIME текущего HTTP запроса, а при отмене
+        запроса (клиент отключился) выполняющийся запрос прерывается KILL QUERY.
+
+        Args:
+            query (str): SQL запрос
+            params (Tuple): Параметры запроса
+            name (str): Имя запроса в статистике выполнения
+
+        Returns:
+            List[Dict]: Список словарей с результатами или None при ошибке SQL
+
+        Raises:
+            ConnectionUnavailable: Подключение отсутствует или потеряно
+            QueryCancelled: HTTP запрос отменён
+        """
+        if not self.is_ready:
+            # Не ждём подключения в запросе - переподключаемся в фоне
+            self.connect_in_background()
+            raise ConnectionUnavailable("Нет подключения к БД")
+        if getattr(_plan_capture, "plans", None) is not None:
+            _plan_capture.plans[name] = self._explain(query, params)
+            return []
+        token = current_token()
+        if token is not None:
+            token.raise_if_cancelled()
+        stats = self.query_stats
+        plan = None
+        start = time.perf_counter()
+        try:
+            with self._query_lock, self._cancellable(token):
+                start = time.perf_counter()
+                cursor = self.connection.cursor(dictionary=True)
+                result = self._fetch_all(cursor, with_time_limit(query, current_time_limit()), params)
+                duration_ms = (time.perf_counter() - start) * 1000
+                if stats.is_slow(duration_ms) and stats.needs_explain(name):
+                    try:
+                        plan = self._fetch_all(cursor, f"EXPLAIN {query}", params)
+                    except Error as err:
+                        logger.warning(f"Не удалось получить план запроса {name}: {err}")
+                cursor.close()
         except Error as err:
-            logger.error(f"Ошибка при выполнении запроса: {err}")
+            stats.record(name, (time.perf_counter() - start) * 1000, error=True)
+            if err.errno == ER_QUERY_INTERRUPTED and token is not None and token.cancelled:
+                logger.info(f"Запрос {name} прерван: клиент отключился")
+                raise QueryCancelled()
+            if err.errno == ER_QUERY_TIMEOUT:
+                logger.error(f"Запрос {name} прерван: превышен лимит {current_time_limit()} мс")
+                return None
+            if isinstance(err, (OperationalError, InterfaceError)):
+                logger.error(f"Потеряно подключение к БД: {err}")
+                self._mark_not_ready()
+                self.connect_in_background()
+                raise ConnectionUnavailable(f"Потеряно подключение к БД: {err}")
+            logger.error(f"Ошибка при выполнении запроса {name}: {err}")
             return None
+        stats.record(name, duration_ms)
+        if stats.is_slow(duration_ms):
+            stats.record_slow(name, duration_ms, query, params, plan)
+        return result
 
-    # ===== ПОИСК ПО КЛЮЧЕВОМУ СЛОВУ =====
-    def search_by_keyword(self, keyword: str, page: int = 1, page_size: int = 10) -> Tuple[List[Dict], int]:
+    @contextmanager
+    def _cancellable(self, token: Optional[CancelToken]) -> Iterator[None]:
         """
-        Поиск фильмов по названию (ключевому слову)
+        Прерывание запроса блока with (KILL QUERY) при отмене токена
+
+        Вызывается под _query_lock, поэтому на подключении выполняется ровно этот запрос.
+        """
+        if token is None:
+            yield
+            return
+        token.raise_if_cancelled()
+        running = {"connection_id": self.connection.connection_id}
+
+        def kill() -> None:
+            # cancel() вызывается из event loop: подключение для KILL открывается в отдельном потоке
+            threading.Thread(
+                target=self._kill_query, args=(running,), name="mysql-kill", daemon=True
+            ).start()
+
+        with token.on_cancel(kill):
+            try:
+                yield
+            finally:
+                with self._kill_lock:
+                    running["connection_id"] = None
+
+    def _kill_query(self, running: Dict) -> None:
+        """
+        KILL QUERY с отдельного подключения
 
         Args:
-            keyword (str): Ключевое слово для поиска
+            running (Dict): {"connection_id": ID подключения или None, если запрос завершён}
+        """
+        with self._kill_lock:
+            connection_id = running["connection_id"]
+            if connection_id is None:
+                return
+            try:
+                killer = mysql.connector.connect(**self.config)
+                try:
+                    cursor = killer.cursor()
+                    cursor.execute(f"KILL QUERY {int(connection_id)}")
+                    cursor.close()
+                finally:
+                    killer.close()
+                logger.info(f"Прерван запрос подключения {connection_id}")
+            except Error as err:
+                logger.warning(f"Не удалось прервать запрос подключения {connection_id}: {err}")
+
+    @staticmethod
+    def _fetch_all(cursor, query: str, params: Tuple = None) -> List[Dict]:
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+        return cursor.fetchall()
+
+    def _explain(self, query: str, params: Tuple = None) -> Optional[List[Dict]]:
+        """
+        План выполнения запроса (EXPLAIN) без выполнения самого запроса
+
+        Returns:
+            Optional[List[Dict]]: Строки EXPLAIN или None при ошибке SQL
+        """
+        try:
+            with self._query_lock:
+                cursor = self.connection.cursor(dictionary=True)
+                plan = self._fetch_all(cursor, f"EXPLAIN {query}", params)
+                cursor.close()
+            return plan
+        except Error as err:
+            logger.error(f"Ошибка при получении плана запроса: {err}")
+            return None
+
+    # ===== ДИАГНОСТИКА ПЛАНОВ ЗАПРОСОВ =====
+    def check_query_plans(self) -> Dict[str, List[str]]:
+        """
+        Проверка планов всех запросов класса (EXPLAIN с тестовыми параметрами)
+
+        Методы вызываются в режиме, в котором каждый запрос заменяется на EXPLAIN,
+        поэтому проверяются ровно те запросы, которые выполняет приложение.
+        Полные просмотры таблиц и запросы без индексов логируются как предупреждения.
+
+        Returns:
+            Dict[str, List[str]]: {имя запроса: найденные проблемы}
+        """
+        plans = {}
+        _plan_capture.plans = plans
+        try:
+            for search_type, params in PLAN_CHECK_SEARCHES:
+                self._search(search_type, params, 1, 10)
+            self.get_year_range_for_genre('Action')
+            self.get_all_genres()
+            self.get_all_actors()
+            self.get_year_range()
+            self.get_film_details(1)
+            self.get_film_actors(1)
+            self.get_film_categories(1)
+            self.get_actors_for_films([1, 2])
+            self.get_categories_for_films([1, 2])
+            self.get_actor_by_id(1)
+            self.get_films_by_ids([1, 2])
+            self.get_film_titles()
+            self.get_actor_names()
+            self.get_film_attributes([1, 2])
+            self.get_film_actor_pairs([1, 2])
+            self.get_film_category_pairs([1, 2])
+        finally:
+            _plan_capture.plans = None
+
+        if not plans:
+            logger.warning("Проверка планов запросов пропущена: нет подключения к БД")
+            return {}
+        report = {}
+        for name, plan in sorted(plans.items()):
+            warnings = plan_warnings(plan) if plan else ["план не получен"]
+            report[name] = warnings
+            self.query_stats.plan_check[name] = {"plan": plan, "warnings": warnings}
+            if warnings:
+                logger.warning(f"План запроса {name}: {'; '.join(warnings)}")
+        logger.info(
+            f"Проверка планов запросов: {len(report)} запросов, "
+            f"с предупреждениями: {sum(1 for warnings in report.values() if warnings)}"
+        )
+        return report
+
+    # ===== УСЛОВИЯ ПОИСКА =====
+    @staticmethod
+    def _search_clause(search_type: str, params: Dict) -> Tuple[str, Tuple]:
+        """
+        Построение FROM/WHERE части запроса для указанного типа поиска
+
+        Args:
+            search_type (str): Тип поиска (keyword, genre__years_range, genre, actor)
+            params (Dict): Параметры поиска
+
+        Returns:
+            Tuple[str, Tuple]: Кортеж (SQL фрагмент, параметры запроса)
+        """
+        if search_type == 'keyword':
+            return (
+                "FROM film f WHERE f.title LIKE %s",
+                (f"%{params['keyword']}%",)
+            )
+        if search_type == 'genre__years_range':
+            return (
+                """FROM film f
+                JOIN film_category fc ON f.film_id = fc.film_id
+                JOIN category c ON fc.category_id = c.category_id
+                WHERE c.name = %s AND f.release_year BETWEEN %s AND %s""",
+                (params['genre'], params['year_from'], params['year_to'])
+            )
+        if search_type == 'genre':
+            return (
+                """FROM film f
+                JOIN film_category fc ON f.film_id = fc.film_id
+                JOIN category c ON fc.category_id = c.category_id
+                WHERE c.name = %s""",
+                (params['genre'],)
+            )
+        if search_type == 'actor':
+            return (
+                """FROM film f
+                JOIN film_actor fa ON f.film_id = fa.film_id
+                WHERE fa.actor_id = %s""",
+                (params['actor_id'],)
+            )
+        if search_type == 'actor_name':
+            return (
+                """FROM film f
+                JOIN film_actor fa ON f.film_id = fa.film_id
+                JOIN actor a ON fa.actor_id = a.actor_id
+                WHERE CONCAT(a.first_name, ' ', a.last_name) LIKE %s""",
+                (f"%{params['actor_name']}%",)
+            )
+        if search_type == 'actor_ids':
+            placeholders = ', '.join(['%s'] * len(params['actor_ids']))
+            return (
+                f"""FROM film f
+                JOIN film_actor fa ON f.film_id = fa.film_id
+                WHERE fa.actor_id IN ({placeholders})""",
+                tuple(params['actor_ids'])
+            )
+        raise ValueError(f"Неизвестный тип поиска: {search_type}")
+
+    def _search(self, search_type: str, params: Dict, page: int, page_size: int,
+                use_cached_count: bool = False,
+                with_description: bool = True) -> Tuple[List[Dict], int]:
+        """
+        Выполнение поиска с постраничной навигацией
+
+        Args:
+            search_type (str): Тип поиска
+            params (Dict): Параметры поиска
             page (int): Номер страницы
             page_size (int): Количество результатов на странице
+            use_cached_count (bool): Взять общее количество из кэша, если оно там есть
+            with_description (bool): Выбирать ли описание фильма
 
         Returns:
             Tuple[List[Dict], int]: Кортеж (список фильмов, общее количество)
         """
         offset = (page - 1) * page_size
+        clause, args = self._search_clause(search_type, params)
+        count_key = (search_type, tuple(sorted(
+            (name, tuple(value) if isinstance(value, list) else value)
+            for name, value in params.items()
+        )))
 
-        # Получение общего количества результатов
-        count_query = "SELECT COUNT(*) as total FROM film WHERE title LIKE %s"
-        count_result = self._execute_query(count_query, (f"%{keyword}%",))
-        total_count = count_result[0]['total'] if count_result else 0
+        total_count = self._cached_count(count_key) if use_cached_count else None
+        if total_count is None:
+            # Получение общего количества результатов
+            count_query = f"SELECT COUNT(DISTINCT f.film_id) as total {clause}"
+            count_result = self._execute_query(count_query, args, name=f"search.{search_type}.count")
+            total_count = count_result[0]['total'] if count_result else 0
+            if count_result:
+                self._store_count(count_key, total_count)
 
         # Получение фильмов с постраничной навигацией
-        query = """
-            SELECT f.film_id, f.title, f.description, f.release_year, 
-                   f.length, f.rating, f.language_id
-            FROM film f
-            WHERE f.title LIKE %s
-            ORDER BY f.release_year DESC
+        columns = FILM_COLUMNS if with_description else FILM_COLUMNS_LITE
+        query = f"""
+            SELECT DISTINCT {columns}
+            {clause}
+            ORDER BY f.release_year DESC, f.film_id
             LIMIT %s OFFSET %s
         """
-        films = self._execute_query(query, (f"%{keyword}%", page_size, offset))
+        films = self._execute_query(
+            query, args + (page_size, offset), name=f"search.{search_type}.page"
+        )
         return films or [], total_count
 
+    def _cached_count(self, key: Tuple) -> Optional[int]:
+        """Последнее известное общее количество результатов поиска"""
+        with self._count_cache_lock:
+            total_count = self._count_cache.get(key)
+            if total_count is not None:
+                self._count_cache.move_to_end(key)
+            return total_count
+
+    def _store_count(self, key: Tuple, total_count: int) -> None:
+        """Сохранение общего количества результатов поиска (LRU)"""
+        with self._count_cache_lock:
+            self._count_cache[key] = total_count
+            self._count_cache.move_to_end(key)
+            if len(self._count_cache) > COUNT_CACHE_SIZE:
+                self._count_cache.popitem(last=False)
+
+    def invalidate_counts(self, event) -> int:
+        """
+        Сброс закэшированных количеств, затронутых изменением данных
+
+        Подписчик событий ChangeWatcher: сбрасываются только записи
+        с изменёнными жанрами, актёрами или таблицами.
+
+        Args:
+            event (ChangeEvent): Изменения данных
+
+        Returns:
+            int: Количество сброшенных записей
+        """
+        with self._count_cache_lock:
+            stale = [
+                key for key in self._count_cache
+                if self._count_affected(key[0], dict(key[1]), event)
+            ]
+            for key in stale:
+                del self._count_cache[key]
+        if stale:
+            logger.info(f"Сброшено закэшированных количеств: {len(stale)}")
+        return len(stale)
+
+    @staticmethod
+    def _count_affected(search_type: str, params: Dict, event) -> bool:
+        """Может ли изменение данных поменять количество результатов поиска"""
+        if "film" in event.full_tables:
+            # Удалены фильмы: меняются количества всех поисков
+            return True
+        if search_type == 'keyword':
+            return event.affects("film")
+        if search_type in ('genre', 'genre__years_range'):
+            if event.affects("category") or "film_category" in event.full_tables:
+                return True
+            if search_type == 'genre__years_range' and event.affects("film"):
+                # Мог измениться год выпуска
+                return True
+            return params['genre'] in event.genres
+        if search_type == 'actor':
+            return "film_actor" in event.full_tables or params['actor_id'] in event.actor_ids
+        if search_type == 'actor_name':
+            return event.affects("actor") or event.affects("film_actor")
+        if search_type == 'actor_ids':
+            return "film_actor" in event.full_tables or bool(event.actor_ids & set(params['actor_ids']))
+        return True
+
+    def stream_search(self, search_type: str, params: Dict,
+                      batch_size: int = 500) -> Iterator[List[Dict]]:
+        """
+        Потоковое чтение всех результатов поиска пачками
+
+        Используется небуферизованный курсор: строки читаются с сервера
+        по мере выборки, поэтому память не зависит от размера результата.
+        Пока курсор не прочитан, подключение занято - используйте
+        отдельное подключение (см. dedicated()).
+
+        Args:
+            search_type (str): Тип поиска
+            params (Dict): Параметры поиска
+            batch_size (int): Количество строк в пачке
+
+        Yields:
+            List[Dict]: Очередная пачка фильмов
+        """
+        clause, args = self._search_clause(search_type, params)
+        query = f"""
+            SELECT DISTINCT {FILM_COLUMNS}
+            {clause}
+            ORDER BY f.release_year DESC, f.film_id
+        """
+        if not self.is_ready:
+            logger.error("Нет подключения к БД для выгрузки")
+            return
+        cursor = self.connection.cursor(dictionary=True)
+        try:
+            cursor.execute(query, args)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            try:
+                cursor.close()
+            except Error as err:
+                logger.warning(f"Ошибка при закрытии курсора выгрузки: {err}")
+
+    # ===== ПОИСК ПО КЛЮЧЕВОМУ СЛОВУ =====
+    def search_by_keyword(self, keyword: str, page: int = 1, page_size: int = 10,
+                          use_cached_count: bool = False,
+                          with_description: bool = True) -> Tuple[List[Dict], int]:
+        """
+        Поиск фильмов по названию (ключевому слову)
+
+        Args:
+            keyword (str): Ключевое слово для поиска
+            page (int): Номер страницы
+            page_size (int): Количество результатов на странице
+            use_cached_count (bool): Взять общее количество из кэша, если оно там есть
+            with_description (bool): Выбирать ли описание фильма
+
+        Returns:
+            Tuple[List[Dict], int]: Кортеж (список фильмов, общее количество)
+        """
+        return self._search('keyword', {'keyword': keyword}, page, page_size, use_cached_count, with_description)
+
     # ===== ПОИСК ПО ЖАНРУ И ГОДУ =====
     def search_by_genre_and_year(
         self,
@@ -121,7 +646,9 @@ class MySQLConnector:
         year_from: int,
         year_to: int,
         page: int = 1,
-        page_size: int = 10
+        page_size: int = 10,
+        use_cached_count: bool = False,
+        with_description: bool = True
     ) -> Tuple[List[Dict], int]:
         """
         Поиск фильмов по жанру и диапазону лет выпуска
@@ -132,46 +659,26 @@ class MySQLConnector:
             year_to (int): Год конца диапазона
             page (int): Номер страницы
             page_size (int): Количество результатов на странице
+            use_cached_count (bool): Взять общее количество из кэша, если оно там есть
+            with_description (bool): Выбирать ли описание фильма
 
         Returns:
             Tuple[List[Dict], int]: Кортеж (список фильмов, общее количество)
         """
-        offset = (page - 1) * page_size
-
-        # Получение общего количества результатов
-        count_query = """
-            SELECT COUNT(DISTINCT f.film_id) as total
-            FROM film f
-            JOIN film_category fc ON f.film_id = fc.film_id
-            JOIN category c ON fc.category_id = c.category_id
-            WHERE c.name = %s AND f.release_year BETWEEN %s AND %s
-        """
-        count_result = self._execute_query(count_query, (genre, year_from, year_to))
-        total_count = count_result[0]['total'] if count_result else 0
-
-        # Получение фильмов
-        query = """
-            SELECT DISTINCT f.film_id, f.title, f.description, f.release_year,
-                   f.length, f.rating, f.language_id
-            FROM film f
-            JOIN film_category fc ON f.film_id = fc.film_id
-            JOIN category c ON fc.category_id = c.category_id
-            WHERE c.name = %s AND f.release_year BETWEEN %s AND %s
-            ORDER BY f.release_year DESC
-            LIMIT %s OFFSET %s
-        """
-        films = self._execute_query(
-            query,
-            (genre, year_from, year_to, page_size, offset)
+        return self._search(
+            'genre__years_range',
+            {'genre': genre, 'year_from': year_from, 'year_to': year_to},
+            page, page_size, use_cached_count, with_description
         )
-        return films or [], total_count
 
     # ===== ПОИСК ТОЛЬКО ПО ЖАНРУ =====
     def search_by_genre(
         self,
         genre: str,
         page: int = 1,
-        page_size: int = 10
+        page_size: int = 10,
+        use_cached_count: bool = False,
+        with_description: bool = True
     ) -> Tuple[List[Dict], int]:
         """
         Поиск фильмов только по жанру
@@ -180,36 +687,13 @@ class MySQLConnector:
             genre (str): Название жанра
             page (int): Номер страницы
             page_size (int): Количество результатов на странице
+            use_cached_count (bool): Взять общее количество из кэша, если оно там есть
+            with_description (bool): Выбирать ли описание фильма
 
         Returns:
             Tuple[List[Dict], int]: Кортеж (список фильмов, общее количество)
         """
-        offset = (page - 1) * page_size
-
-        # Получение общего количества результатов
-        count_query = """
-            SELECT COUNT(DISTINCT f.film_id) as total
-            FROM film f
-            JOIN film_category fc ON f.film_id = fc.film_id
-            JOIN category c ON fc.category_id = c.category_id
-            WHERE c.name = %s
-        """
-        count_result = self._execute_query(count_query, (genre,))
-        total_count = count_result[0]['total'] if count_result else 0
-
-        # Получение фильмов
-        query = """
-            SELECT DISTINCT f.film_id, f.title, f.description, f.release_year,
-                   f.length, f.rating, f.language_id
-            FROM film f
-            JOIN film_category fc ON f.film_id = fc.film_id
-            JOIN category c ON fc.category_id = c.category_id
-            WHERE c.name = %s
-            ORDER BY f.release_year DESC
-            LIMIT %s OFFSET %s
-        """
-        films = self._execute_query(query, (genre, page_size, offset))
-        return films or [], total_count
+        return self._search('genre', {'genre': genre}, page, page_size, use_cached_count, with_description)
 
     # ===== ПОЛУЧЕНИЕ ДИАПАЗОНА ЛЕТ ДЛЯ ЖАНРА =====
     def get_year_range_for_genre(self, genre: str) -> Dict[str, int]:
@@ -229,7 +713,7 @@ class MySQLConnector:
             JOIN category c ON fc.category_id = c.category_id
             WHERE c.name = %s
         """
-        result = self._execute_query(query, (genre,))
+        result = self._execute_query(query, (genre,), name="year_range_for_genre")
         if result and result[0]['min_year'] is not None:
             return {
                 'min_year': result[0]['min_year'],
@@ -242,7 +726,9 @@ class MySQLConnector:
         self,
         actor_id: int,
         page: int = 1,
-        page_size: int = 10
+        page_size: int = 10,
+        use_cached_count: bool = False,
+        with_description: bool = True
     ) -> Tuple[List[Dict], int]:
         """
         Поиск фильмов по актёру
@@ -251,34 +737,209 @@ class MySQLConnector:
             actor_id (int): ID актёра
             page (int): Номер страницы
             page_size (int): Количество результатов на странице
+            use_cached_count (bool): Взять общее количество из кэша, если оно там есть
+            with_description (bool): Выбирать ли описание фильма
+
+        Returns:
+            Tuple[List[Dict], int]: Кортеж (список фильмов, общее количество)
+        """
+        return self._search('actor', {'actor_id': actor_id}, page, page_size, use_cached_count, with_description)
+
+    # ===== ПОИСК ПО ИМЕНИ АКТЁРА =====
+    def search_by_actor_name(
+        self,
+        actor_name: str,
+        page: int = 1,
+        page_size: int = 10,
+        use_cached_count: bool = False,
+        with_description: bool = True
+    ) -> Tuple[List[Dict], int]:
+        """
+        Поиск фильмов по части имени или фамилии актёра
+
+        Args:
+            actor_name (str): Часть полного имени актёра
+            page (int): Номер страницы
+            page_size (int): Количество результатов на странице
+            use_cached_count (bool): Взять общее количество из кэша, если оно там есть
+            with_description (bool): Выбирать ли описание фильма
+
+        Returns:
+            Tuple[List[Dict], int]: Кортеж (список фильмов, общее количество)
+        """
+        return self._search(
+            'actor_name', {'actor_name': actor_name}, page, page_size, use_cached_count, with_description
+        )
+
+    def search_by_actor_ids(
+        self,
+        actor_ids: List[int],
+        page: int = 1,
+        page_size: int = 10,
+        use_cached_count: bool = False,
+        with_description: bool = True
+    ) -> Tuple[List[Dict], int]:
+        """
+        Поиск фильмов, в которых снимался любой из актёров
+
+        Args:
+            actor_ids (List[int]): ID актёров (например, найденные с опечатками)
+            page (int): Номер страницы
+            page_size (int): Количество результатов на странице
+            use_cached_count (bool): Взять общее количество из кэша, если оно там есть
+            with_description (bool): Выбирать ли описание фильма
+
+        Returns:
+            Tuple[List[Dict], int]: Кортеж (список фильмов, общее количество)
+        """
+        if not actor_ids:
+            return [], 0
+        return self._search(
+            'actor_ids', {'actor_ids': list(actor_ids)}, page, page_size, use_cached_count, with_description
+        )
+
+    # ===== ФИЛЬМЫ ПО СПИСКУ ID =====
+    def search_by_film_ids(
+        self,
+        film_ids: List[int],
+        page: int = 1,
+        page_size: int = 10,
+        use_cached_count: bool = False,
+        with_description: bool = True
+    ) -> Tuple[List[Dict], int]:
+        """
+        Страница фильмов из заранее упорядоченного списка ID
+
+        Используется для результатов, найденных без MySQL (поиск с опечатками):
+        порядок фильмов совпадает с порядком film_ids.
+
+        Args:
+            film_ids (List[int]): Упорядоченный список ID фильмов
+            page (int): Номер страницы
+            page_size (int): Количество результатов на странице
+            use_cached_count (bool): Не используется (количество известно заранее)
+            with_description (bool): Выбирать ли описание фильма
 
         Returns:
             Tuple[List[Dict], int]: Кортеж (список фильмов, общее количество)
         """
         offset = (page - 1) * page_size
+        return self.get_films_by_ids(film_ids[offset:offset + page_size], with_description), len(film_ids)
 
-        # Получение общего количества результатов
-        count_query = """
-            SELECT COUNT(DISTINCT f.film_id) as total
-            FROM film f
-            JOIN film_actor fa ON f.film_id = fa.film_id
-            WHERE fa.actor_id = %s
+    def get_films_by_ids(self, film_ids: List[int], with_description: bool = True) -> List[Dict]:
         """
-        count_result = self._execute_query(count_query, (actor_id,))
-        total_count = count_result[0]['total'] if count_result else 0
+        Фильмы по списку ID одним запросом
 
-        # Получение фильмов
-        query = """
-            SELECT DISTINCT f.film_id, f.title, f.description, f.release_year,
-                   f.length, f.rating, f.language_id
+        Args:
+            film_ids (List[int]): Список ID фильмов
+            with_description (bool): Выбирать ли описание фильма
+
+        Returns:
+            List[Dict]: Фильмы в порядке film_ids (отсутствующие пропускаются)
+        """
+        if not film_ids:
+            return []
+        columns = FILM_COLUMNS if with_description else FILM_COLUMNS_LITE
+        placeholders = ', '.join(['%s'] * len(film_ids))
+        query = f"""
+            SELECT {columns}
             FROM film f
-            JOIN film_actor fa ON f.film_id = fa.film_id
-            WHERE fa.actor_id = %s
-            ORDER BY f.release_year DESC
-            LIMIT %s OFFSET %s
+            WHERE f.film_id IN ({placeholders})
         """
-        films = self._execute_query(query, (actor_id, page_size, offset))
-        return films or [], total_count
+        result = self._execute_query(query, tuple(film_ids), name="films_by_ids")
+        by_id = {row['film_id']: row for row in result or []}
+        return [by_id[film_id] for film_id in film_ids if film_id in by_id]
+
+    def get_film_titles(self, film_ids: Optional[List[int]] = None) -> Optional[List[Dict]]:
+        """
+        Названия фильмов для индекса поиска с опечатками
+
+        Args:
+            film_ids (Optional[List[int]]): ID фильмов (None - все фильмы)
+
+        Returns:
+            Optional[List[Dict]]: Список (film_id, title) или None при ошибке
+        """
+        if film_ids is None:
+            return self._execute_query("SELECT film_id, title FROM film", name="film_titles")
+        if not film_ids:
+            return []
+        placeholders = ', '.join(['%s'] * len(film_ids))
+        query = f"SELECT film_id, title FROM film WHERE film_id IN ({placeholders})"
+        return self._execute_query(query, tuple(film_ids), name="film_titles")
+
+    def get_actor_names(self, actor_ids: Optional[List[int]] = None) -> Optional[List[Dict]]:
+        """
+        Имена актёров для индекса поиска с опечатками
+
+        Args:
+            actor_ids (Optional[List[int]]): ID актёров (None - все актёры)
+
+        Returns:
+            Optional[List[Dict]]: Список (actor_id, first_name, last_name) или None при ошибке
+        """
+        query = "SELECT actor_id, first_name, last_name FROM actor"
+        if actor_ids is None:
+            return self._execute_query(query, name="actor_names")
+        if not actor_ids:
+            return []
+        placeholders = ', '.join(['%s'] * len(actor_ids))
+        query = f"{query} WHERE actor_id IN ({placeholders})"
+        return self._execute_query(query, tuple(actor_ids), name="actor_names")
+
+    def _select_for_films(self, query: str, film_ids: Optional[List[int]],
+                          name: str) -> Optional[List[Dict]]:
+        """Запрос по всем фильмам или только по film_ids (условие на колонку film_id)"""
+        if film_ids is None:
+            return self._execute_query(query, name=name)
+        if not film_ids:
+            return []
+        placeholders = ', '.join(['%s'] * len(film_ids))
+        return self._execute_query(
+            f"{query} WHERE film_id IN ({placeholders})", tuple(film_ids), name=name
+        )
+
+    def get_film_attributes(self, film_ids: Optional[List[int]] = None) -> Optional[List[Dict]]:
+        """
+        Рейтинг и длительность фильмов для векторов похожести
+
+        Args:
+            film_ids (Optional[List[int]]): ID фильмов (None - все фильмы)
+
+        Returns:
+            Optional[List[Dict]]: Список (film_id, rating, length) или None при ошибке
+        """
+        return self._select_for_films(
+            "SELECT film_id, rating, length FROM film", film_ids, "film_attributes"
+        )
+
+    def get_film_actor_pairs(self, film_ids: Optional[List[int]] = None) -> Optional[List[Dict]]:
+        """
+        Связи фильм-актёр
+
+        Args:
+            film_ids (Optional[List[int]]): ID фильмов (None - все фильмы)
+
+        Returns:
+            Optional[List[Dict]]: Список (film_id, actor_id) или None при ошибке
+        """
+        return self._select_for_films(
+            "SELECT film_id, actor_id FROM film_actor", film_ids, "film_actor_pairs"
+        )
+
+    def get_film_category_pairs(self, film_ids: Optional[List[int]] = None) -> Optional[List[Dict]]:
+        """
+        Связи фильм-жанр
+
+        Args:
+            film_ids (Optional[List[int]]): ID фильмов (None - все фильмы)
+
+        Returns:
+            Optional[List[Dict]]: Список (film_id, category_id) или None при ошибке
+        """
+        return self._select_for_films(
+            "SELECT film_id, category_id FROM film_category", film_ids, "film_category_pairs"
+        )
 
     # ===== ПОЛУЧЕНИЕ ЖАНРОВ =====
     def get_all_genres(self) -> List[Dict]:
@@ -289,7 +950,7 @@ class MySQLConnector:
             List[Dict]: Список словарей с жанрами (id, name)
         """
         query = "SELECT category_id, name FROM category ORDER BY name"
-        genres = self._execute_query(query)
+        genres = self._execute_query(query, name="all_genres")
         return genres or []
 
     # ===== ПОЛУЧЕНИЕ АКТЁРОВ =====
@@ -306,7 +967,7 @@ class MySQLConnector:
             ORDER BY first_name, last_name
             LIMIT 100
         """
-        actors = self._execute_query(query)
+        actors = self._execute_query(query, name="all_actors")
         return actors or []
 
     # ===== ПОЛУЧЕНИЕ ДИАПАЗОНА ЛЕТ =====
@@ -321,7 +982,7 @@ class MySQLConnector:
             SELECT MIN(release_year) as min_year, MAX(release_year) as max_year
             FROM film
         """
-        result = self._execute_query(query)
+        result = self._execute_query(query, name="year_range")
         if result:
             return {
                 'min_year': result[0]['min_year'],
@@ -346,7 +1007,7 @@ class MySQLConnector:
             FROM film f
             WHERE f.film_id = %s
         """
-        result = self._execute_query(query, (film_id,))
+        result = self._execute_query(query, (film_id,), name="film_details")
         return result[0] if result else None
 
     def get_film_actors(self, film_id: int) -> List[str]:
@@ -365,7 +1026,7 @@ class MySQLConnector:
             JOIN film_actor fa ON a.actor_id = fa.actor_id
             WHERE fa.film_id = %s
         """
-        result = self._execute_query(query, (film_id,))
+        result = self._execute_query(query, (film_id,), name="film_actors")
         return [row['actor_name'] for row in result] if result else []
 
     def get_film_categories(self, film_id: int) -> List[str]:
@@ -384,9 +1045,59 @@ class MySQLConnector:
             JOIN film_category fc ON c.category_id = fc.category_id
             WHERE fc.film_id = %s
         """
-        result = self._execute_query(query, (film_id,))
+        result = self._execute_query(query, (film_id,), name="film_categories")
         return [row['name'] for row in result] if result else []
 
+    def get_actors_for_films(self, film_ids: List[int]) -> Dict[int, List[str]]:
+        """
+        Получение актёров сразу для нескольких фильмов одним запросом
+
+        Args:
+            film_ids (List[int]): Список ID фильмов
+
+        Returns:
+            Dict[int, List[str]]: Словарь {film_id: список имён актёров}
+        """
+        actors = {film_id: [] for film_id in film_ids}
+        if not film_ids:
+            return actors
+        placeholders = ', '.join(['%s'] * len(film_ids))
+        query = f"""
+            SELECT fa.film_id, CONCAT(a.first_name, ' ', a.last_name) as actor_name
+            FROM actor a
+            JOIN film_actor fa ON a.actor_id = fa.actor_id
+            WHERE fa.film_id IN ({placeholders})
+        """
+        result = self._execute_query(query, tuple(film_ids), name="actors_for_films")
+        for row in result or []:
+            actors[row['film_id']].append(row['actor_name'])
+        return actors
+
+    def get_categories_for_films(self, film_ids: List[int]) -> Dict[int, List[str]]:
+        """
+        Получение жанров сразу для нескольких фильмов одним запросом
+
+        Args:
+            film_ids (List[int]): Список ID фильмов
+
+        Returns:
+            Dict[int, List[str]]: Словарь {film_id: список названий жанров}
+        """
+        categories = {film_id: [] for film_id in film_ids}
+        if not film_ids:
+            return categories
+        placeholders = ', '.join(['%s'] * len(film_ids))
+        query = f"""
+            SELECT fc.film_id, c.name
+            FROM category c
+            JOIN film_category fc ON c.category_id = fc.category_id
+            WHERE fc.film_id IN ({placeholders})
+        """
+        result = self._execute_query(query, tuple(film_ids), name="categories_for_films")
+        for row in result or []:
+            categories[row['film_id']].append(row['name'])
+        return categories
+
     def get_actor_by_id(self, actor_id: int) -> Optional[Dict]:
         """
         Получение информации об актёре по ID
@@ -402,5 +1113,5 @@ class MySQLConnector:
             FROM actor
             WHERE actor_id = %s
         """
-        result = self._execute_query(query, (actor_id,))
+        result = self._execute_query(query, (actor_id,), name="actor_by_id")
         return result[0] if result else None
@@ -0,0 +1,193 @@
+"""
+Учёт выполнения SQL запросов: время по именам запросов, журнал медленных запросов
+и проверка планов выполнения (EXPLAIN)
+"""
+
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+# Отдельный логгер: журнал медленных запросов можно направить в свой файл
+slow_query_logger = logging.getLogger("app.database.slow_queries")
+
+# Верхние границы интервалов гистограммы времени выполнения, мс (последний - бесконечность)
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Длина значения параметра в журнале медленных запросов
+PARAM_PREVIEW_LENGTH = 100
+
+
+class _StatementStats:
+    """Счётчики одного именованного запроса"""
+
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def as_dict(self) -> Dict:
+        histogram = {
+            f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets)
+        }
+        histogram["le_inf"] = self.buckets[-1]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0,
+            "max_ms": round(self.max_ms, 2),
+            "histogram": histogram,
+        }
+
+
+def _preview_params(params: Optional[Tuple]) -> List:
+    """Параметры запроса для журнала (длинные строки обрезаются)"""
+    preview = []
+    for value in params or ():
+        if isinstance(value, str) and len(value) > PARAM_PREVIEW_LENGTH:
+            value = value[:PARAM_PREVIEW_LENGTH] + "..."
+        preview.append(value)
+    return preview
+
+
+def plan_warnings(plan: List[Dict]) -> List[str]:
+    """
+    Проблемы плана выполнения: полный просмотр таблицы, отсутствие индекса,
+    временная таблица и сортировка без индекса
+
+    Args:
+        plan (List[Dict]): Строки результата EXPLAIN
+
+    Returns:
+        List[str]: Описание найденных проблем
+    """
+    warnings = []
+    for row in plan:
+        table = row.get("table")
+        if not table or table.startswith("<"):
+            # Производные таблицы и подзапросы (<derived2>, <union1,2>)
+            continue
+        extra = row.get("Extra") or ""
+        if row.get("type") == "ALL":
+            warnings.append(f"{table}: полный просмотр таблицы (строк: {row.get('rows')})")
+        elif row.get("key") is None and row.get("type") not in ("const", "system", None):
+            warnings.append(f"{table}: индекс не используется")
+        if "Using temporary" in extra:
+            warnings.append(f"{table}: временная таблица")
+        if "Using filesort" in extra:
+            warnings.append(f"{table}: сортировка без индекса (filesort)")
+    return warnings
+
+
+class QueryStats:
+    """
+    Время выполнения запросов по именам и журнал медленных запросов
+
+    Общий для primary, реплик и отдельных подключений одного MySQLConnector.
+    """
+
+    def __init__(self, slow_query_ms: float = 200.0, slow_log_size: int = 100,
+                 explain_slow: bool = True, explain_interval: float = 60.0):
+        """
+        Args:
+            slow_query_ms (float): Порог медленного запроса, мс (None - журнал выключен)
+            slow_log_size (int): Количество хранимых записей журнала медленных запросов
+            explain_slow (bool): Выполнять EXPLAIN для медленных запросов
+            explain_interval (float): EXPLAIN одного запроса не чаще раза за интервал, сек
+        """
+        self.slow_query_ms = slow_query_ms
+        self.explain_slow = explain_slow
+        self.explain_interval = explain_interval
+        self._lock = threading.Lock()
+        self._statements: Dict[str, _StatementStats] = {}
+        self._slow_log = deque(maxlen=slow_log_size)
+        # Последний план медленного запроса: имя -> (момент EXPLAIN, план)
+        self._plans: Dict[str, Tuple[float, List[Dict]]] = {}
+        self.plan_check: Dict[str, Dict] = {}
+
+    def record(self, name: str, duration_ms: float, error: bool = False) -> None:
+        """
+        Учёт выполнения запроса
+
+        Args:
+            name (str): Имя запроса
+            duration_ms (float): Время выполнения, мс
+            error (bool): Запрос завершился ошибкой
+        """
+        with self._lock:
+            stats = self._statements.get(name)
+            if stats is None:
+                stats = self._statements[name] = _StatementStats()
+            stats.count += 1
+            stats.errors += error
+            stats.total_ms += duration_ms
+            stats.max_ms = max(stats.max_ms, duration_ms)
+            stats.buckets[bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+
+    def is_slow(self, duration_ms: float) -> bool:
+        return self.slow_query_ms is not None and duration_ms >= self.slow_query_ms
+
+    def needs_explain(self, name: str) -> bool:
+        """Нужно ли выполнить EXPLAIN медленного запроса (план устарел или отсутствует)"""
+        if not self.explain_slow:
+            return False
+        with self._lock:
+            explained = self._plans.get(name)
+        return explained is None or time.monotonic() - explained[0] >= self.explain_interval
+
+    def record_slow(self, name: str, duration_ms: float, query: str,
+                    params: Optional[Tuple], plan: Optional[List[Dict]] = None) -> None:
+        """
+        Запись медленного запроса в журнал
+
+        Args:
+            name (str): Имя запроса
+            duration_ms (float): Время выполнения, мс
+            query (str): SQL запрос
+            params (Optional[Tuple]): Параметры запроса
+            plan (Optional[List[Dict]]): Свежий результат EXPLAIN (иначе - последний известный)
+        """
+        with self._lock:
+            if plan is not None:
+                self._plans[name] = (time.monotonic(), plan)
+            elif name in self._plans:
+                plan = self._plans[name][1]
+            entry = {
+                "timestamp": datetime.now(timezone.utc),
+                "name": name,
+                "duration_ms": round(duration_ms, 2),
+                "query": " ".join(query.split()),
+                "params": _preview_params(params),
+                "plan": plan,
+                "plan_warnings": plan_warnings(plan) if plan else [],
+            }
+            self._slow_log.appendleft(entry)
+        slow_query_logger.warning(
+            f"Медленный запрос {name}: {duration_ms:.1f} мс, параметры: {entry['params']}"
+            + (f", план: {'; '.join(entry['plan_warnings'])}" if entry["plan_warnings"] else "")
+        )
+
+    def snapshot(self) -> Dict:
+        """
+        Состояние для отладочного маршрута
+
+        Returns:
+            Dict: statements (счётчики и гистограммы), slow_queries, plan_check
+        """
+        with self._lock:
+            return {
+                "slow_query_ms": self.slow_query_ms,
+                "statements": {
+                    name: stats.as_dict() for name, stats in sorted(self._statements.items())
+                },
+                "slow_queries": list(self._slow_log),
+                "plan_check": dict(self.plan_check),
+            }
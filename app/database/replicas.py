@@ -0,0 +1,135 @@
+"""
+Пул реплик MySQL для чтения: балансировка нагрузки и отслеживание здоровья
+"""
+
+from contextlib import contextmanager
+from typing import List, Dict, Iterator
+import itertools
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Политики балансировки
+ROUND_ROBIN = "round_robin"
+LEAST_OUTSTANDING = "least_outstanding"
+POLICIES = (ROUND_ROBIN, LEAST_OUTSTANDING)
+
+
+class ReplicaHealth:
+    """Состояние одной реплики"""
+
+    def __init__(self):
+        self.outstanding = 0        # Выполняющихся сейчас запросов
+        self.failures = 0           # Ошибок подряд
+        self.evicted_until = 0.0    # Момент повторного допуска (0 - не исключена)
+        self.queries = 0            # Всего запросов
+
+
+class ReplicaPool:
+    """
+    Набор реплик с выбором по политике балансировки
+
+    Реплика, на которой подряд произошло failure_threshold ошибок подключения,
+    исключается на eviction_seconds секунд, после чего снова допускается к запросам.
+    """
+
+    def __init__(self, replicas: List, policy: str = ROUND_ROBIN,
+                 failure_threshold: int = 3, eviction_seconds: float = 30.0):
+        """
+        Args:
+            replicas (List[MySQLConnector]): Подключения к репликам
+            policy (str): round_robin или least_outstanding
+            failure_threshold (int): Количество ошибок подряд до исключения
+            eviction_seconds (float): Длительность исключения, сек
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Неизвестная политика балансировки: {policy}")
+        self.replicas = replicas
+        self.policy = policy
+        self.failure_threshold = failure_threshold
+        self.eviction_seconds = eviction_seconds
+        self._health = {id(replica): ReplicaHealth() for replica in replicas}
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+
+    def candidates(self) -> List:
+        """
+        Реплики, допущенные к запросам, в порядке выбора политикой
+
+        Returns:
+            List[MySQLConnector]: Упорядоченный список реплик
+        """
+        now = time.monotonic()
+        with self._lock:
+            healthy = [
+                replica for replica in self.replicas
+                if self._health[id(replica)].evicted_until <= now
+            ]
+            if not healthy:
+                return []
+            if self.policy == LEAST_OUTSTANDING:
+                return sorted(healthy, key=lambda r: self._health[id(r)].outstanding)
+            start = next(self._counter) % len(healthy)
+            return healthy[start:] + healthy[:start]
+
+    @contextmanager
+    def track(self, replica) -> Iterator[None]:
+        """Учёт выполняющегося на реплике запроса"""
+        health = self._health[id(replica)]
+        with self._lock:
+            health.outstanding += 1
+            health.queries += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                health.outstanding -= 1
+
+    def report_success(self, replica) -> None:
+        """Успешный запрос: сброс счётчика ошибок и повторный допуск"""
+        health = self._health[id(replica)]
+        with self._lock:
+            if health.evicted_until:
+                logger.info(f"Реплика {replica.config.get('host')} снова допущена к запросам")
+            health.failures = 0
+            health.evicted_until = 0.0
+
+    def report_failure(self, replica) -> None:
+        """Ошибка подключения: исключение реплики после failure_threshold ошибок подряд"""
+        health = self._health[id(replica)]
+        with self._lock:
+            health.failures += 1
+            if health.failures >= self.failure_threshold:
+                health.evicted_until = time.monotonic() + self.eviction_seconds
+                logger.warning(
+                    f"Реплика {replica.config.get('host')} исключена на {self.eviction_seconds} с "
+                    f"после {health.failures} ошибок подряд"
+                )
+
+    def status(self) -> List[Dict]:
+        """
+        Состояние реплик для /health
+
+        Returns:
+            List[Dict]: host, ready, evicted, outstanding, failures, queries
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "host": replica.config.get("host"),
+                    "ready": replica.is_ready,
+                    "evicted": self._health[id(replica)].evicted_until > now,
+                    "outstanding": self._health[id(replica)].outstanding,
+                    "failures": self._health[id(replica)].failures,
+                    "queries": self._health[id(replica)].queries,
+                }
+                for replica in self.replicas
+            ]
+
+    def close(self) -> None:
+        """Закрытие подключений ко всем репликам"""
+        for replica in self.replicas:
+            replica.close()
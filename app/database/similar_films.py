@@ -0,0 +1,235 @@
+"""
+Похожие фильмы: векторы из MySQL и заранее вычисленные списки соседей
+
+Матрицы признаков и списки TOP-K соседей каждого фильма хранятся в файле .npz
+(python -m tools.similar_films build) и загружаются при запуске, поэтому
+ответ /api/films/{film_id}/similar - чтение одной строки массива, O(k).
+По событиям ChangeWatcher пересчитываются только затронутые строки.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import os
+import threading
+import time
+import logging
+
+import numpy as np
+
+from app.utils.similarity import (
+    FEATURE_ARRAYS, empty_features, update_features, build_neighbors, refresh_neighbors,
+    neighbor_count
+)
+
+logger = logging.getLogger(__name__)
+
+# Таблицы, от которых зависят векторы фильмов
+SOURCE_TABLES = ("film", "film_actor", "film_category")
+
+
+class SimilarFilms:
+    """Списки похожих фильмов с загрузкой из файла и точечным обновлением"""
+
+    def __init__(self, mysql_db, path: Optional[str] = None, top_k: int = 20):
+        """
+        Args:
+            mysql_db (MySQLConnector): Источник фильмов, актёров и жанров
+            path (Optional[str]): Файл .npz (None - только в памяти)
+            top_k (int): Количество соседей в списке фильма
+        """
+        self.mysql_db = mysql_db
+        self.path = path
+        self.top_k = top_k
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._features = empty_features()
+        self._neighbors = np.zeros((0, 0), dtype=np.int32)
+        self._scores = np.zeros((0, 0), dtype=np.float32)
+        self._rows: Dict[int, int] = {}
+        self.loaded = False
+        self.build_time_ms = None
+        self.refreshes = 0
+
+    # ===== ПОСТРОЕНИЕ =====
+    def _fetch(self, film_ids: Optional[List[int]] = None) -> Optional[Tuple[List, List, List]]:
+        """Рейтинг/длительность, актёры и жанры фильмов из MySQL (None при ошибке)"""
+        films = self.mysql_db.get_film_attributes(film_ids)
+        actor_pairs = self.mysql_db.get_film_actor_pairs(film_ids)
+        category_pairs = self.mysql_db.get_film_category_pairs(film_ids)
+        if films is None or actor_pairs is None or category_pairs is None:
+            return None
+        return films, actor_pairs, category_pairs
+
+    def _install(self, features: Dict[str, np.ndarray], neighbors: np.ndarray,
+                 scores: np.ndarray) -> None:
+        rows = {int(film_id): row for row, film_id in enumerate(features["film_ids"])}
+        with self._lock:
+            self._features, self._neighbors, self._scores = features, neighbors, scores
+            self._rows = rows
+            self.loaded = True
+
+    def rebuild(self, save: bool = True) -> bool:
+        """
+        Построение векторов и списков соседей по всем фильмам
+
+        Args:
+            save (bool): Сохранить результат в файл
+
+        Returns:
+            bool: True если данные загружены
+        """
+        start_time = time.time()
+        data = self._fetch()
+        if data is None:
+            logger.warning("Похожие фильмы не построены: нет данных MySQL")
+            return False
+        features, _ = update_features(empty_features(), *data)
+        neighbors, scores = build_neighbors(features, self.top_k)
+        self._install(features, neighbors, scores)
+        self.build_time_ms = round((time.time() - start_time) * 1000, 1)
+        logger.info(
+            f"Похожие фильмы: {len(features['film_ids'])} фильмов, "
+            f"{neighbors.shape[1]} соседей, {self.build_time_ms} мс"
+        )
+        if save:
+            self.save()
+        return True
+
+    def load(self) -> bool:
+        """
+        Загрузка из файла, а если его нет (или он повреждён) - построение из MySQL
+
+        Returns:
+            bool: True если данные загружены
+        """
+        if self.path and os.path.exists(self.path):
+            try:
+                with np.load(self.path) as data:
+                    features = {name: data[name] for name in FEATURE_ARRAYS}
+                    neighbors, scores = data["neighbors"], data["scores"]
+                if neighbors.shape[1] == neighbor_count(len(features["film_ids"]), self.top_k):
+                    self._install(features, neighbors, scores)
+                    logger.info(f"Похожие фильмы загружены из {self.path}: {len(features['film_ids'])} фильмов")
+                    return True
+                logger.info("Размер списков соседей в файле не совпадает с SIMILAR_FILMS_TOP_K")
+            except (OSError, KeyError, ValueError) as err:
+                logger.warning(f"Не удалось прочитать {self.path}: {err}")
+        return self.rebuild()
+
+    def ensure_loaded(self) -> bool:
+        """Загрузка при первом обращении (если не загружено при запуске)"""
+        if self.loaded:
+            return True
+        with self._load_lock:
+            return self.loaded or self.load()
+
+    def save(self) -> None:
+        """Атомарная запись матриц и списков соседей в файл"""
+        if not self.path:
+            return
+        with self._lock:
+            arrays = dict(self._features, neighbors=self._neighbors, scores=self._scores)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "wb") as target:
+                np.savez(target, **arrays)
+            os.replace(temporary, self.path)
+        except OSError as err:
+            logger.error(f"Ошибка при сохранении похожих фильмов: {err}")
+
+    # ===== ОБНОВЛЕНИЕ =====
+    def refresh(self, film_ids) -> bool:
+        """
+        Пересчёт векторов фильмов film_ids и затронутых списков соседей
+
+        Удалённый фильм или изменение количества соседей приводит к полному построению.
+
+        Args:
+            film_ids: ID изменённых фильмов
+
+        Returns:
+            bool: True если данные обновлены
+        """
+        film_ids = sorted(film_ids)
+        data = self._fetch(film_ids)
+        if data is None:
+            return False
+        films = data[0]
+        if len(films) < len(film_ids):
+            return self.rebuild()
+        start_time = time.time()
+        with self._lock:
+            features, neighbors, scores = self._features, self._neighbors, self._scores
+        features, changed = update_features(features, *data)
+        size = len(features["film_ids"])
+        if neighbor_count(size, self.top_k) != neighbors.shape[1]:
+            return self.rebuild()
+        if size > len(neighbors):
+            padding = ((0, size - len(neighbors)), (0, 0))
+            neighbors, scores = np.pad(neighbors, padding), np.pad(scores, padding)
+        neighbors, scores = refresh_neighbors(features, neighbors, scores, changed)
+        self._install(features, neighbors, scores)
+        self.refreshes += 1
+        logger.info(
+            f"Похожие фильмы обновлены: {len(film_ids)} фильмов, "
+            f"{(time.time() - start_time) * 1000:.1f} мс"
+        )
+        self.save()
+        return True
+
+    def on_change(self, event) -> None:
+        """
+        Обновление по событию ChangeWatcher
+
+        Args:
+            event (ChangeEvent): Изменения данных
+        """
+        if not self.loaded or not any(event.affects(table) for table in SOURCE_TABLES):
+            return
+        if any(table in event.full_tables for table in SOURCE_TABLES):
+            self.rebuild()
+        elif event.film_ids:
+            self.refresh(event.film_ids)
+
+    # ===== ПОИСК =====
+    def similar(self, film_id: int, limit: int = 10) -> Optional[List[Tuple[int, float]]]:
+        """
+        Самые похожие фильмы
+
+        Args:
+            film_id (int): ID фильма
+            limit (int): Количество фильмов (не больше top_k)
+
+        Returns:
+            Optional[List[Tuple[int, float]]]: (film_id, оценка 0..1) по убыванию;
+            None, если фильм неизвестен
+        """
+        if not self.ensure_loaded():
+            return None
+        with self._lock:
+            row = self._rows.get(film_id)
+            if row is None:
+                return None
+            film_ids = self._features["film_ids"]
+            neighbors = self._neighbors[row, :limit]
+            scores = self._scores[row, :limit]
+            return [
+                (int(film_ids[neighbor]), round(float(score), 4))
+                for neighbor, score in zip(neighbors, scores)
+            ]
+
+    def stats(self) -> Dict:
+        """Состояние индекса"""
+        with self._lock:
+            return {
+                "films": len(self._rows),
+                "top_k": int(self._neighbors.shape[1]) if self._neighbors.ndim == 2 else 0,
+                "build_time_ms": self.build_time_ms,
+                "refreshes": self.refreshes,
+                "memory_bytes": int(
+                    sum(array.nbytes for array in self._features.values())
+                    + self._neighbors.nbytes + self._scores.nbytes
+                ),
+            }
@@ -0,0 +1,300 @@
+"""
+Жизненный цикл клиентов БД и зависимости FastAPI для их получения
+
+Клиенты создаются в lifespan приложения (а не при импорте модулей),
+подключаются в фоне с повторными попытками и закрываются при остановке.
+В тестах клиентов можно подменить через app.dependency_overrides.
+"""
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from typing import Any, Dict
+import anyio
+import logging
+
+from app.database.change_watcher import ChangeWatcher
+from app.database.costar_index import CoStarIndex
+from app.database.fuzzy_index import FuzzyIndex
+from app.database.mysql_connector import MySQLConnector
+from app.database.query_stats import QueryStats
+from app.database.similar_films import SimilarFilms
+from app.logging.log_writer import LogWriter
+from app.logging.log_stats import LogStats
+from app.logging.live_stats import LiveStats
+from app.logging.popular_sketch import (
+    PopularSketch, FileSketchStore, MongoSketchStore, FILE_STORE, MONGODB_STORE
+)
+from app.logging.search_log import MONGODB, SQLITE, FILE
+from app.utils.poster_store import PosterStore, HTTPFetcher, LocalFetcher
+from app.settings import (
+    DB_RETRY_INTERVAL, STARTUP_CONNECT_TIMEOUT, MYSQL_REPLICAS, MYSQL_REPLICA_POLICY,
+    MYSQL_REPLICA_FAILURE_THRESHOLD, MYSQL_REPLICA_EVICTION_SECONDS,
+    LOG_RETENTION_DAYS, LOG_ARCHIVE_DIR, LOG_ARCHIVE_GRACE_DAYS,
+    LOG_SAMPLE_RATE, LOG_DEDUP_WINDOW_SECONDS, LOG_DEDUP_MAX_KEYS, LOG_QUEUE_MAX_SIZE,
+    SEARCH_LOG_BACKEND, SEARCH_LOG_PATH,
+    LIVE_STATS_TOP_K, LIVE_STATS_RECENT_SIZE, POPULAR_SKETCH_ERROR, POPULAR_SKETCH_STORE,
+    POPULAR_SKETCH_PATH, POPULAR_SKETCH_CHECKPOINT_SECONDS,
+    SLOW_QUERY_MS, SLOW_QUERY_LOG_SIZE, SLOW_QUERY_EXPLAIN, SLOW_QUERY_EXPLAIN_INTERVAL,
+    QUERY_PLAN_CHECK, CHANGE_WATCH_INTERVAL, FUZZY_SEARCH_MAX_DISTANCE, FUZZY_SEARCH_LIMIT,
+    POSTER_CACHE_DIR, POSTER_LOCAL_DIR, POSTER_FETCH_TIMEOUT, SIMILAR_FILMS_PATH, SIMILAR_FILMS_TOP_K
+)
+
+logger = logging.getLogger(__name__)
+
+CLIENT_NAMES = ("mysql_db", "log_writer", "log_stats")
+
+
+def create_log_backends() -> tuple:
+    """
+    Создание хранилищ логов поиска по SEARCH_LOG_BACKEND
+
+    MongoDB использует разные подключения для записи и чтения;
+    локальные хранилища - один общий экземпляр.
+
+    Returns:
+        tuple: (хранилище для записи, хранилище для статистики)
+    """
+    if SEARCH_LOG_BACKEND == MONGODB:
+        from local_settings import MONGODB_URL_READ, MONGODB_URL_WRITE
+        from app.logging.mongo_log import MongoSearchLog
+
+        writer = MongoSearchLog(
+            MONGODB_URL_WRITE, connect=False, manage_retention=True,
+            retention_days=LOG_RETENTION_DAYS, archive_dir=LOG_ARCHIVE_DIR,
+            archive_grace_days=LOG_ARCHIVE_GRACE_DAYS
+        )
+        return writer, MongoSearchLog(MONGODB_URL_READ, connect=False)
+    if SEARCH_LOG_BACKEND == SQLITE:
+        from app.logging.sqlite_log import SQLiteSearchLog
+
+        backend = SQLiteSearchLog(f"{SEARCH_LOG_PATH}.sqlite3", LOG_RETENTION_DAYS)
+        return backend, backend
+    if SEARCH_LOG_BACKEND == FILE:
+        from app.logging.file_log import FileSearchLog
+
+        backend = FileSearchLog(f"{SEARCH_LOG_PATH}.ndjson")
+        return backend, backend
+    raise ValueError(f"Неизвестное хранилище логов: {SEARCH_LOG_BACKEND}")
+
+
+def create_clients() -> dict:
+    """
+    Создание клиентов БД без подключения (подключение выполняется в фоне)
+
+    Returns:
+        dict: Клиенты {имя: экземпляр}
+    """
+    from local_settings import dbconfig
+
+    write_backend, read_backend = create_log_backends()
+    return {
+        "mysql_db": MySQLConnector(
+            dbconfig, connect=False, retry_interval=DB_RETRY_INTERVAL,
+            replicas=MYSQL_REPLICAS, replica_policy=MYSQL_REPLICA_POLICY,
+            replica_failure_threshold=MYSQL_REPLICA_FAILURE_THRESHOLD,
+            replica_eviction_seconds=MYSQL_REPLICA_EVICTION_SECONDS,
+            query_stats=QueryStats(
+                SLOW_QUERY_MS, SLOW_QUERY_LOG_SIZE, SLOW_QUERY_EXPLAIN, SLOW_QUERY_EXPLAIN_INTERVAL
+            )
+        ),
+        "log_writer": LogWriter(
+            write_backend, sample_rate=LOG_SAMPLE_RATE,
+            dedup_window_seconds=LOG_DEDUP_WINDOW_SECONDS, dedup_max_keys=LOG_DEDUP_MAX_KEYS,
+            queue_max_size=LOG_QUEUE_MAX_SIZE
+        ),
+        "log_stats": LogStats(read_backend),
+    }
+
+
+def create_popular_sketch(log_writer: LogWriter) -> PopularSketch:
+    """
+    Создание общего для worker процессов top-k популярных поисков
+
+    Args:
+        log_writer (LogWriter): Запись логов (для checkpoint в MongoDB используется её подключение)
+
+    Returns:
+        PopularSketch: Структура с хранилищем checkpoint по POPULAR_SKETCH_STORE
+    """
+    store = None
+    if POPULAR_SKETCH_STORE == FILE_STORE:
+        store = FileSketchStore(POPULAR_SKETCH_PATH)
+    elif POPULAR_SKETCH_STORE == MONGODB_STORE:
+        backend = getattr(log_writer, "backend", None)
+        if hasattr(backend, "db"):
+            store = MongoSketchStore(backend)
+        else:
+            logger.warning(
+                "Checkpoint популярных поисков в MongoDB требует SEARCH_LOG_BACKEND = 'mongodb'"
+            )
+    return PopularSketch(store, POPULAR_SKETCH_ERROR, LIVE_STATS_TOP_K)
+
+
+def create_poster_store() -> PosterStore:
+    """
+    Создание локального кэша постеров
+
+    Returns:
+        PosterStore: Кэш в POSTER_CACHE_DIR; изображения из POSTER_LOCAL_DIR или из TMDB по HTTP
+    """
+    if POSTER_LOCAL_DIR:
+        fetcher = LocalFetcher(POSTER_LOCAL_DIR)
+    else:
+        fetcher = HTTPFetcher(POSTER_FETCH_TIMEOUT)
+    return PosterStore(POSTER_CACHE_DIR, fetcher)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Запуск и остановка клиентов БД
+
+    Подключения запускаются в фоне; приложение ждёт MySQL не дольше
+    STARTUP_CONNECT_TIMEOUT секунд, чтобы успеть выполнить прогрев.
+    Клиенты, заранее установленные в app.state (например, в тестах), не пересоздаются.
+    """
+    from app.routes.films import warm_up
+
+    clients = {}
+    if not all(hasattr(app.state, name) for name in CLIENT_NAMES):
+        clients = {
+            name: client for name, client in create_clients().items()
+            if not hasattr(app.state, name)
+        }
+    for name, client in clients.items():
+        client.connect_in_background()
+        setattr(app.state, name, client)
+
+    # Популярные и последние поиски по событиям LogWriter (/api/stats/popular, /api/stats/stream)
+    unsubscribe_live_stats = None
+    popular_sketch = None
+    if not hasattr(app.state, "live_stats"):
+        popular_sketch = create_popular_sketch(app.state.log_writer)
+        popular_sketch.start(POPULAR_SKETCH_CHECKPOINT_SECONDS)
+        app.state.live_stats = LiveStats(popular_sketch, LIVE_STATS_RECENT_SIZE)
+    log_events = getattr(app.state.log_writer, "events", None)
+    if log_events is not None:
+        unsubscribe_live_stats = log_events.subscribe(app.state.live_stats.on_search)
+
+    mysql_db = app.state.mysql_db
+    if not hasattr(app.state, "fuzzy_index"):
+        app.state.fuzzy_index = FuzzyIndex(mysql_db, FUZZY_SEARCH_MAX_DISTANCE, FUZZY_SEARCH_LIMIT)
+    if not hasattr(app.state, "similar_films"):
+        app.state.similar_films = SimilarFilms(mysql_db, SIMILAR_FILMS_PATH, SIMILAR_FILMS_TOP_K)
+    if not hasattr(app.state, "costar_index"):
+        app.state.costar_index = CoStarIndex(mysql_db)
+    if not hasattr(app.state, "poster_store"):
+        app.state.poster_store = create_poster_store()
+
+    # Изменения данных Sakila: точечный сброс кэшей вместо TTL
+    change_watcher = None
+    if CHANGE_WATCH_INTERVAL and not hasattr(app.state, "change_watcher"):
+        change_watcher = ChangeWatcher(mysql_db, CHANGE_WATCH_INTERVAL)
+        change_watcher.events.subscribe(mysql_db.invalidate_counts)
+        change_watcher.events.subscribe(app.state.fuzzy_index.on_change)
+        change_watcher.events.subscribe(app.state.similar_films.on_change)
+        change_watcher.events.subscribe(app.state.costar_index.on_change)
+        change_watcher.start()
+        app.state.change_watcher = change_watcher
+
+    if await anyio.to_thread.run_sync(mysql_db.wait_ready, STARTUP_CONNECT_TIMEOUT):
+        await anyio.to_thread.run_sync(warm_up, mysql_db)
+        await anyio.to_thread.run_sync(app.state.fuzzy_index.ensure_loaded)
+        await anyio.to_thread.run_sync(app.state.similar_films.ensure_loaded)
+        await anyio.to_thread.run_sync(app.state.costar_index.ensure_loaded)
+        if QUERY_PLAN_CHECK:
+            await anyio.to_thread.run_sync(mysql_db.check_query_plans)
+    else:
+        logger.warning("MySQL недоступен при запуске, прогрев пропущен")
+
+    try:
+        yield
+    finally:
+        if unsubscribe_live_stats is not None:
+            unsubscribe_live_stats()
+        if popular_sketch is not None:
+            popular_sketch.stop()
+        if change_watcher is not None:
+            change_watcher.stop()
+        for client in clients.values():
+            client.close()
+        for handler in logging.getLogger().handlers:
+            handler.flush()
+
+
+def get_mysql_db(request: Request) -> MySQLConnector:
+    """Зависимость: клиент MySQL"""
+    return request.app.state.mysql_db
+
+
+def get_log_writer(request: Request) -> LogWriter:
+    """Зависимость: запись логов поиска"""
+    return request.app.state.log_writer
+
+
+def get_log_stats(request: Request) -> LogStats:
+    """Зависимость: статистика поиска"""
+    return request.app.state.log_stats
+
+
+def get_live_stats(request: Request) -> LiveStats:
+    """Зависимость: статистика поиска в реальном времени"""
+    return request.app.state.live_stats
+
+
+def get_fuzzy_index(request: Request) -> FuzzyIndex:
+    """Зависимость: индекс поиска с опечатками"""
+    return request.app.state.fuzzy_index
+
+
+def get_similar_films(request: Request) -> SimilarFilms:
+    """Зависимость: списки похожих фильмов"""
+    return request.app.state.similar_films
+
+
+def get_costar_index(request: Request) -> CoStarIndex:
+    """Зависимость: граф партнёров по фильмам"""
+    return request.app.state.costar_index
+
+
+def get_poster_store(request: Request) -> PosterStore:
+    """Зависимость: локальный кэш постеров"""
+    return request.app.state.poster_store
+
+
+def get_change_watcher(request: Request):
+    """Зависимость: отслеживание изменений данных MySQL (None, если выключено)"""
+    return getattr(request.app.state, "change_watcher", None)
+
+
+def is_degraded(request: Request) -> bool:
+    """Зависимость: облегчённый режим, выставленный AdmissionControlMiddleware"""
+    return getattr(request.state, "degraded", False)
+
+
+def mysql_replicas_status(mysql_db: MySQLConnector) -> list:
+    """
+    Состояние реплик MySQL
+
+    Args:
+        mysql_db (MySQLConnector): Клиент MySQL
+
+    Returns:
+        list: Состояние каждой реплики (пустой список, если реплики не настроены)
+    """
+    if getattr(mysql_db, "replica_pool", None) is None:
+        return []
+    return mysql_db.replica_pool.status()
+
+
+def backends_readiness(clients: Dict[str, Any]) -> Dict[str, bool]:
+    """
+    Готовность подключений к БД
+
+    Args:
+        clients (Dict[str, Any]): {имя клиента: клиент} (клиенты из зависимостей)
+
+    Returns:
+        Dict[str, bool]: {имя клиента: подключение установлено}
+    """
+    return {name: bool(client.is_ready) for name, client in clients.items()}
@@ -0,0 +1,192 @@
+"""
+Локальное хранилище логов поиска: файл NDJSON только на дозапись и индекс в памяти
+
+Каждое событие - строка JSON; объединённые повторы дописываются отдельной
+строкой {"id", "add_weight", "timestamp"}. Статистика считается по индексу
+в памяти, который строится чтением файла и перед каждым запросом статистики
+дополняется новыми строками - файл может быть общим для нескольких worker
+процессов: строки дописываются под межпроцессной блокировкой, а идентификаторы
+событий (uuid) не совпадают между процессами.
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+import heapq
+import json
+import logging
+import os
+import threading
+import uuid
+
+from app.logging.search_log import SearchLogBackend, params_key, group_id, sort_popular
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: блокировка файла между процессами недоступна
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Сколько последних событий помнить для add_weight (повторы приходят в пределах окна)
+RECENT_IDS_LIMIT = 100000
+
+
+class _SearchSummary:
+    """Сводка по одному поиску (тип + параметры)"""
+
+    __slots__ = ("search_type", "params", "count", "last_timestamp",
+                 "results_count", "execution_time_ms")
+
+    def __init__(self, search_type: str, params: Dict):
+        self.search_type = search_type
+        self.params = params
+        self.count = 0.0
+        self.last_timestamp = None
+        self.results_count = None
+        self.execution_time_ms = None
+
+
+class FileSearchLog(SearchLogBackend):
+    """Логи поиска в локальном файле с индексом в памяти"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Путь к файлу NDJSON
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._summaries: Dict[Tuple[str, str], _SearchSummary] = {}
+        self._by_type: Dict[str, float] = {}
+        self._entry_keys: "OrderedDict[Any, Tuple[str, str]]" = OrderedDict()
+        # Прочитанная часть файла: байты и строки
+        self._offset = 0
+        self._line_number = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "ab")
+        self._catch_up()
+        logger.info(f"Хранилище логов (файл): {path}, поисков в индексе: {len(self._summaries)}")
+
+    @property
+    def is_ready(self) -> bool:
+        return self._file is not None
+
+    def _catch_up(self) -> None:
+        """Учёт в индексе строк, дописанных после последнего чтения (любым процессом)"""
+        with open(self.path, "rb") as source:
+            source.seek(self._offset)
+            for line in source:
+                if not line.endswith(b"\n"):
+                    # Строка ещё дописывается
+                    break
+                self._offset += len(line)
+                self._line_number += 1
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Недописанная строка при аварийной остановке
+                    logger.warning(f"{self.path}:{self._line_number}: повреждённая строка пропущена")
+                    continue
+                timestamp = datetime.fromisoformat(record["timestamp"])
+                if "add_weight" in record:
+                    self._apply_weight(record["id"], record["add_weight"], timestamp)
+                else:
+                    record["timestamp"] = timestamp
+                    self._apply_entry(record["id"], record)
+
+    def _apply_entry(self, entry_id: Any, entry: Dict) -> None:
+        """Учёт события в индексе"""
+        key = (entry["search_type"], params_key(entry["params"]))
+        summary = self._summaries.get(key)
+        if summary is None:
+            summary = self._summaries[key] = _SearchSummary(entry["search_type"], entry["params"])
+        weight = entry.get("weight", 1)
+        summary.count += weight
+        if summary.last_timestamp is None or entry["timestamp"] >= summary.last_timestamp:
+            summary.last_timestamp = entry["timestamp"]
+            summary.results_count = entry["results_count"]
+            summary.execution_time_ms = entry["execution_time_ms"]
+        self._by_type[entry["search_type"]] = self._by_type.get(entry["search_type"], 0) + weight
+
+        self._entry_keys[entry_id] = key
+        if len(self._entry_keys) > RECENT_IDS_LIMIT:
+            self._entry_keys.popitem(last=False)
+
+    def _apply_weight(self, entry_id: Any, weight: float, timestamp: datetime) -> None:
+        """Учёт объединённых повторов в индексе"""
+        key = self._entry_keys.get(entry_id)
+        if key is None:
+            return
+        summary = self._summaries[key]
+        summary.count += weight
+        if timestamp > summary.last_timestamp:
+            summary.last_timestamp = timestamp
+        self._by_type[summary.search_type] += weight
+
+    def _append(self, record: Dict) -> None:
+        """Дозапись строки целиком под межпроцессной блокировкой (в индекс попадёт при _catch_up)"""
+        line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        try:
+            self._file.write(line)
+            self._file.flush()
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def insert(self, entry: Dict) -> Any:
+        entry_id = uuid.uuid4().hex
+        with self._lock:
+            self._append({**entry, "id": entry_id, "timestamp": entry["timestamp"].isoformat()})
+        return entry_id
+
+    def add_weight(self, entry_id: Any, weight: float, timestamp: datetime) -> None:
+        with self._lock:
+            self._append({"id": entry_id, "add_weight": weight, "timestamp": timestamp.isoformat()})
+
+    def get_popular_searches(self, limit: int = 5) -> List[Dict]:
+        with self._lock:
+            self._catch_up()
+            rows = [
+                (summary.count, summary.last_timestamp,
+                 group_id(summary.search_type, summary.params))
+                for summary in self._summaries.values()
+            ]
+        return sort_popular(rows, limit)
+
+    def get_recent_searches(self, limit: int = 5) -> List[Dict]:
+        with self._lock:
+            self._catch_up()
+            recent = heapq.nlargest(
+                limit, self._summaries.values(), key=lambda summary: summary.last_timestamp
+            )
+            return [
+                {
+                    "_id": group_id(summary.search_type, summary.params),
+                    "timestamp": summary.last_timestamp,
+                    "results_count": summary.results_count,
+                    "execution_time_ms": summary.execution_time_ms,
+                    "search_type": summary.search_type,
+                    "params": summary.params
+                }
+                for summary in recent
+            ]
+
+    def get_stats_by_type(self) -> Dict[str, int]:
+        with self._lock:
+            self._catch_up()
+            return {search_type: round(count) for search_type, count in self._by_type.items()}
+
+    def close(self) -> None:
+        """Закрытие файла (повторный вызов допустим)"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                logger.info(f"Хранилище логов (файл) закрыто: {self.path}")
@@ -0,0 +1,155 @@
+"""
+Статистика поиска в реальном времени для /api/stats/stream
+
+LiveStats подписан на события LogWriter, учитывает их в PopularSketch
+(top-k популярных поисков) и в кольцевом буфере последних поисков.
+Изменения рассылаются подписчикам SSE через asyncio очереди, поэтому
+открытые панели статистики не выполняют запросов к хранилищу логов.
+"""
+
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import threading
+import logging
+
+from app.logging.popular_sketch import PopularSketch
+from app.logging.search_log import params_key
+
+logger = logging.getLogger(__name__)
+
+
+class LiveStats:
+    """Top-k и последние поиски, обновляемые по событиям LogWriter"""
+
+    def __init__(self, popular: PopularSketch, recent_size: int = 20, queue_size: int = 100):
+        """
+        Args:
+            popular (PopularSketch): Популярные поиски (общие для worker процессов)
+            recent_size (int): Размер буфера последних поисков
+            queue_size (int): Размер очереди подписчика; при переполнении
+                очередь сбрасывается и подписчик получает полный снимок
+        """
+        self.top_k = popular.top_k
+        self.popular = popular
+        self.recent = deque(maxlen=recent_size)
+        self.queue_size = queue_size
+        self.seeded = False
+        self._lock = threading.Lock()
+        self._subscribers: Dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+        # Топ меняется и после загрузки checkpoint с поисками других процессов
+        self.popular.refreshed.subscribe(self._on_popular_refreshed)
+
+    # ===== ОБНОВЛЕНИЕ =====
+    def on_search(self, event: Dict) -> None:
+        """
+        Обработчик события поиска (подписчик PubSub LogWriter)
+
+        Args:
+            event (Dict): timestamp, search_type, params, results_count, execution_time_ms
+        """
+        key = PopularSketch.key(event["search_type"], event["params"])
+        with self._lock:
+            top_changed = self.popular.add(key)
+            self.recent.appendleft(event)
+            delta = {"search": event}
+            if top_changed:
+                delta["popular"] = self.popular.top()
+        self._broadcast(("update", delta))
+
+    def _on_popular_refreshed(self, popular: List[Dict]) -> None:
+        """Рассылка топа после загрузки общего checkpoint"""
+        self._broadcast(("update", {"popular": popular}))
+
+    def _broadcast(self, message: Tuple[str, Dict]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        for queue, loop in subscribers:
+            loop.call_soon_threadsafe(self._deliver, queue, message)
+
+    def seed(self, popular: List[Dict], recent: List[Dict]) -> None:
+        """
+        Начальное заполнение из хранилища логов (один раз после запуска)
+
+        Args:
+            popular (List[Dict]): Результат LogStats.get_popular_searches
+            recent (List[Dict]): Результат LogStats.get_recent_searches
+        """
+        if self.seeded:
+            return
+        self.popular.seed(popular)
+        with self._lock:
+            # Записи хранилища старше событий, полученных после запуска
+            for item in recent:
+                if len(self.recent) == self.recent.maxlen:
+                    break
+                self.recent.append({
+                    "timestamp": item["timestamp"],
+                    "search_type": item["search_type"],
+                    "params": item["params"],
+                    "results_count": item["results_count"],
+                    "execution_time_ms": item["execution_time_ms"],
+                })
+            self.seeded = True
+
+    # ===== ЧТЕНИЕ =====
+    def _recent_locked(self, limit: int) -> List[Dict]:
+        """Последние уникальные поиски из буфера"""
+        seen = set()
+        results = []
+        for event in self.recent:
+            key = (event["search_type"], params_key(event["params"]))
+            if key in seen:
+                continue
+            seen.add(key)
+            results.append(event)
+            if len(results) == limit:
+                break
+        return results
+
+    def snapshot(self, limit: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """
+        Текущее состояние
+
+        Args:
+            limit (Optional[int]): Количество последних поисков (по умолчанию top_k)
+
+        Returns:
+            Dict: {"popular": [...], "recent": [...]}
+        """
+        with self._lock:
+            return {
+                "popular": self.popular.top(),
+                "recent": self._recent_locked(limit or self.top_k),
+            }
+
+    # ===== ПОДПИСЧИКИ SSE =====
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Подписка на изменения (вызывается в event loop)
+
+        Returns:
+            asyncio.Queue: Очередь сообщений (тип события, данные)
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def _deliver(self, queue: asyncio.Queue, message: Tuple[str, Dict]) -> None:
+        """Постановка сообщения в очередь подписчика (в его event loop)"""
+        if not queue.full():
+            queue.put_nowait(message)
+            return
+        # Подписчик не успевает: вместо накопленных изменений - полный снимок
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(("snapshot", self.snapshot()))
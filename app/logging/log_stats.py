@@ -1,19 +1,32 @@
 """
-Модуль для получения статистики поисков из MongoDB
+Модуль для получения статистики поисков из хранилища логов
 """
 
-from app.database.mongo_connection import MongoConnection
+from app.logging.search_log import SearchLogBackend
 from typing import List, Dict
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class LogStats(MongoConnection):
-    """Класс для получения статистики поисковых запросов из MongoDB"""
+class LogStats:
+    """Класс для получения статистики поисковых запросов"""
 
-    def __init__(self, mongodb_url: str, database_name: str = 'ich_edit'):
-        super().__init__(mongodb_url, database_name)
+    def __init__(self, backend: SearchLogBackend):
+        """
+        Args:
+            backend (SearchLogBackend): Хранилище логов (MongoDB, SQLite, файл)
+        """
+        self.backend = backend
+
+    @property
+    def is_ready(self) -> bool:
+        """Готово ли хранилище логов"""
+        return self.backend.is_ready
+
+    def connect_in_background(self) -> None:
+        """Фоновое подключение хранилища логов"""
+        self.backend.connect_in_background()
 
     def get_popular_searches(self, limit: int = 5) -> List[Dict]:
         """
@@ -26,33 +39,10 @@ class LogStats(MongoConnection):
             List[Dict]: Список популярных запросов с указанием типа и количества
         """
         try:
-            if self.db is None:
-                logger.warning("Нет подключения к MongoDB")
+            if not self.backend.is_ready:
+                logger.warning("Хранилище логов недоступно")
                 return []
-
-            collection = self.db.final_project_010825_ptm_al
-            
-            # Простая группировка по типу поиска и параметрам
-            pipeline = [
-                {
-                    "$group": {
-                        "_id": {
-                            "search_type": "$search_type",
-                            "params": "$params"
-                        },
-                        "count": {"$sum": 1},
-                        "last_timestamp": {"$max": "$timestamp"}
-                    }
-                },
-                {
-                    "$sort": {"count": -1, "last_timestamp": -1}
-                },
-                {
-                    "$limit": limit
-                }
-            ]
-            results = list(collection.aggregate(pipeline))
-            return results
+            return self.backend.get_popular_searches(limit)
         except Exception as err:
             logger.error(f"Ошибка при получении популярных запросов: {err}")
             return []
@@ -68,39 +58,10 @@ class LogStats(MongoConnection):
             List[Dict]: Список последних уникальных поисков
         """
         try:
-            if self.db is None:
-                logger.warning("Нет подключения к MongoDB")
+            if not self.backend.is_ready:
+                logger.warning("Хранилище логов недоступно")
                 return []
-
-            collection = self.db.final_project_010825_ptm_al
-            
-            # Простая сортировка по времени с группировкой
-            pipeline = [
-                {
-                    "$sort": {"timestamp": -1}
-                },
-                {
-                    "$group": {
-                        "_id": {
-                            "search_type": "$search_type",
-                            "params": "$params"
-                        },
-                        "timestamp": {"$first": "$timestamp"},
-                        "results_count": {"$first": "$results_count"},
-                        "execution_time_ms": {"$first": "$execution_time_ms"},
-                        "search_type": {"$first": "$search_type"},
-                        "params": {"$first": "$params"}
-                    }
-                },
-                {
-                    "$sort": {"timestamp": -1}
-                },
-                {
-                    "$limit": limit
-                }
-            ]
-            results = list(collection.aggregate(pipeline))
-            return results
+            return self.backend.get_recent_searches(limit)
         except Exception as err:
             logger.error(f"Ошибка при получении последних поисков: {err}")
             return []
@@ -113,28 +74,14 @@ class LogStats(MongoConnection):
             Dict[str, int]: Словарь с количеством поисков по каждому типу
         """
         try:
-            if self.db is None:
-                logger.warning("Нет подключения к MongoDB")
+            if not self.backend.is_ready:
+                logger.warning("Хранилище логов недоступно")
                 return {}
-
-            collection = self.db.final_project_010825_ptm_al
-            pipeline = [
-                {
-                    "$group": {
-                        "_id": "$search_type",
-                        "count": {"$sum": 1}
-                    }
-                }
-            ]
-            results = list(collection.aggregate(pipeline))
-            stats = {result['_id']: result['count'] for result in results}
-            return stats
+            return self.backend.get_stats_by_type()
         except Exception as err:
             logger.error(f"Ошибка при получении статистики по типам: {err}")
             return {}
 
     def close(self) -> None:
-        """Закрытие подключения к MongoDB"""
-        if self.client:
-            self.client.close()
-            logger.info("Подключение к MongoDB (статистика) закрыто")
+        """Закрытие хранилища логов"""
+        self.backend.close()
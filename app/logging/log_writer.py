@@ -1,46 +1,235 @@
 """
-Модуль для логирования поисковых запросов в MongoDB
+Модуль для логирования поисковых запросов (MongoDB или локальное хранилище)
+
+Маршруты только ставят событие в очередь; запись в хранилище, объединение
+повторов и запись накопленных повторов по истечении окна выполняет фоновый
+поток, поэтому медленное хранилище не задерживает event loop.
 """
 
-from app.database.mongo_connection import MongoConnection
-from typing import Dict
-from datetime import datetime
+from app.logging.search_log import SearchLogBackend
+from app.utils.pubsub import PubSub
+from collections import OrderedDict
+from typing import Dict, Tuple
+from datetime import datetime, timezone
 import logging
+import queue
+import random
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
-class LogWriter(MongoConnection):
-    """Класс для записи логов поисковых запросов в MongoDB"""
+# Сигнал остановки фонового потока записи
+_STOP = object()
+
+
+class _DedupEntry:
+    """Недавно записанный поиск, повторы которого складываются в weight"""
+
+    def __init__(self, document_id, expires_at: float):
+        self.document_id = document_id
+        self.expires_at = expires_at
+        self.pending_weight = 0       # Ещё не записанные в хранилище повторы
+        self.last_timestamp = None    # Время последнего повтора
+
 
-    def __init__(self, mongodb_url: str, database_name: str = 'ich_edit',
-                 collection_name: str = "final_project_010825_ptm_al"):
-        self.collection_name = collection_name
-        super().__init__(mongodb_url, database_name)
+class LogWriter:
+    """Класс для записи логов поисковых запросов в хранилище логов"""
+
+    def __init__(self, backend: SearchLogBackend, sample_rate: float = 1.0,
+                 dedup_window_seconds: float = 0, dedup_max_keys: int = 10000,
+                 queue_max_size: int = 10000):
+        """
+        Args:
+            backend (SearchLogBackend): Хранилище логов (MongoDB, SQLite, файл)
+            sample_rate (float): Доля записываемых поисков (0..1]; каждый записанный
+                поиск получает weight = 1 / sample_rate, поэтому суммы weight
+                остаются несмещённой оценкой количества поисков
+            dedup_window_seconds (float): Окно, в котором одинаковые поиски
+                складываются в weight одного документа (0 - без объединения)
+            dedup_max_keys (int): Максимум одновременно отслеживаемых поисков
+            queue_max_size (int): Максимум событий, ожидающих записи (сверх - отбрасываются)
+        """
+        self.backend = backend
+        self.sample_rate = sample_rate
+        self.dedup_window_seconds = dedup_window_seconds
+        self.dedup_max_keys = dedup_max_keys
+        self._recent: "OrderedDict[Tuple, _DedupEntry]" = OrderedDict()
+        self._recent_lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_max_size)
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        # События поиска для подписчиков в процессе (LiveStats); публикуются до выборки
+        self.events = PubSub()
+
+    @property
+    def is_ready(self) -> bool:
+        """Готово ли хранилище логов"""
+        return self.backend.is_ready
+
+    def connect_in_background(self) -> None:
+        """Фоновое подключение хранилища логов"""
+        self.backend.connect_in_background()
 
     def log_search(self, search_type: str, params: Dict,
                    results_count: int, execution_time_ms: float) -> bool:
-        """Логирование поискового запроса в MongoDB (только первая страница)"""
+        """
+        Логирование поискового запроса (только первая страница)
+
+        Событие публикуется подписчикам сразу, а в хранилище записывается
+        фоновым потоком.
+
+        Returns:
+            bool: False если хранилище недоступно или очередь записи переполнена
+        """
         try:
             # Логируем только первую страницу для избежания дублей в статистике
             if params.get('page', 1) != 1:
                 return True  # Не логируем, но возвращаем успех
-                
-            if self.db is None:
-                logger.warning("Нет подключения к MongoDB")
+
+            now = datetime.now(timezone.utc)
+            self.events.publish({
+                "timestamp": now,
+                "search_type": search_type,
+                "params": params,
+                "results_count": results_count,
+                "execution_time_ms": execution_time_ms
+            })
+
+            # Выборка: пропущенные поиски учитываются весом записанных
+            if self.sample_rate < 1 and random.random() >= self.sample_rate:
+                return True
+            weight = 1 if self.sample_rate >= 1 else 1 / self.sample_rate
+
+            if not self.backend.is_ready:
+                logger.warning("Хранилище логов недоступно")
                 return False
 
             log_entry = {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now,
                 "search_type": search_type,
                 "params": params,
                 "results_count": results_count,
-                "execution_time_ms": execution_time_ms
+                "execution_time_ms": execution_time_ms,
+                "weight": weight
             }
-
-            collection = self.db[self.collection_name]
-            result = collection.insert_one(log_entry)
-            logger.info(f"Лог сохранён в коллекцию '{self.collection_name}': {result.inserted_id}")
+            self._ensure_thread()
+            self._queue.put_nowait(((search_type, tuple(sorted(params.items()))), log_entry))
             return True
+        except queue.Full:
+            logger.warning("Очередь записи логов переполнена, поиск не записан")
+            return False
         except Exception as err:
             logger.error(f"Ошибка при сохранении лога: {err}")
             return False
+
+    def _ensure_thread(self) -> None:
+        """Запуск фонового потока записи (если он ещё не запущен)"""
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="LogWriter", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        """Фоновая запись событий из очереди до сигнала остановки"""
+        # Повторы с истёкшим окном записываются и без новых событий
+        timeout = self.dedup_window_seconds if self.dedup_window_seconds > 0 else None
+        while True:
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._flush_expired()
+                continue
+            try:
+                if item is _STOP:
+                    return
+                self._write(*item)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, key: Tuple, log_entry: Dict) -> None:
+        """Запись события в хранилище или объединение с недавним таким же поиском"""
+        try:
+            if self.dedup_window_seconds > 0:
+                self._flush_expired()
+                if self._fold_repeat(key, log_entry["weight"], log_entry["timestamp"]):
+                    return
+
+            entry_id = self.backend.insert(log_entry)
+            logger.info(f"Лог сохранён: {entry_id}")
+            if self.dedup_window_seconds > 0:
+                self._remember(key, entry_id)
+        except Exception as err:
+            logger.error(f"Ошибка при сохранении лога: {err}")
+
+    def _fold_repeat(self, key: Tuple, weight: float, now: datetime) -> bool:
+        """
+        Учёт повтора недавнего поиска без записи нового документа
+
+        Returns:
+            bool: True если поиск сложен с уже записанным документом
+        """
+        with self._recent_lock:
+            entry = self._recent.get(key)
+            if entry is None:
+                return False
+            entry.pending_weight += weight
+            entry.last_timestamp = now
+            return True
+
+    def _remember(self, key: Tuple, document_id) -> None:
+        """Запоминание записанного поиска на время окна объединения"""
+        expires_at = time.monotonic() + self.dedup_window_seconds
+        evicted = []
+        with self._recent_lock:
+            self._recent[key] = _DedupEntry(document_id, expires_at)
+            self._recent.move_to_end(key)
+            while len(self._recent) > self.dedup_max_keys:
+                evicted.append(self._recent.popitem(last=False)[1])
+        for entry in evicted:
+            self._write_pending(entry)
+
+    def _flush_expired(self) -> None:
+        """Запись накопленных повторов поисков с истёкшим окном"""
+        now = time.monotonic()
+        expired = []
+        with self._recent_lock:
+            # Записи упорядочены по времени первого поиска
+            while self._recent:
+                key, entry = next(iter(self._recent.items()))
+                if entry.expires_at > now:
+                    break
+                expired.append(self._recent.pop(key))
+        for entry in expired:
+            self._write_pending(entry)
+
+    def _write_pending(self, entry: _DedupEntry) -> None:
+        """Увеличение weight документа на число накопленных повторов"""
+        if not entry.pending_weight or not self.backend.is_ready:
+            return
+        try:
+            self.backend.add_weight(entry.document_id, entry.pending_weight, entry.last_timestamp)
+        except Exception as err:
+            logger.error(f"Ошибка при сохранении повторов поиска: {err}")
+
+    def flush(self) -> None:
+        """Ожидание записи событий из очереди и запись всех накопленных повторов"""
+        if self._thread is not None:
+            self._queue.join()
+        with self._recent_lock:
+            entries = list(self._recent.values())
+            self._recent.clear()
+        for entry in entries:
+            self._write_pending(entry)
+
+    def close(self) -> None:
+        """Запись очереди и накопленных повторов, закрытие хранилища логов"""
+        self.flush()
+        with self._thread_lock:
+            if self._thread is not None:
+                self._queue.put(_STOP)
+                self._thread.join(timeout=5)
+                self._thread = None
+        self.backend.close()
@@ -0,0 +1,140 @@
+"""
+Хранилище логов поиска в MongoDB
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import logging
+
+from app.database.mongo_connection import MongoConnection
+from app.logging.retention import SEARCH_LOG_COLLECTION, apply_retention_policy
+from app.logging.search_log import SearchLogBackend
+
+logger = logging.getLogger(__name__)
+
+
+class MongoSearchLog(MongoConnection, SearchLogBackend):
+    """Логи поиска в коллекции MongoDB"""
+
+    def __init__(self, mongodb_url: str, database_name: str = 'ich_edit',
+                 collection_name: str = SEARCH_LOG_COLLECTION, connect: bool = True,
+                 manage_retention: bool = False, retention_days: Optional[float] = None,
+                 archive_dir: Optional[str] = None, archive_grace_days: float = 1):
+        """
+        Args:
+            mongodb_url (str): Строка подключения
+            database_name (str): База данных
+            collection_name (str): Коллекция логов
+            connect (bool): Подключиться сразу (иначе - connect_in_background())
+            manage_retention (bool): Создавать TTL индекс и индексы статистики
+                при подключении (для клиента записи)
+            retention_days (Optional[float]): Срок хранения событий, дней
+            archive_dir (Optional[str]): Каталог архива устаревших событий
+            archive_grace_days (float): Запас TTL для архивирования, дней
+        """
+        self.collection_name = collection_name
+        self.manage_retention = manage_retention
+        self.retention_days = retention_days
+        self.archive_dir = archive_dir
+        self.archive_grace_days = archive_grace_days
+        super().__init__(mongodb_url, database_name, connect)
+
+    def _on_connect(self) -> None:
+        """
+        Применение политики хранения (TTL и индексы) до отметки о готовности
+
+        Миграция и архивирование выполняются отдельно (python -m tools.search_logs).
+        """
+        if self.manage_retention:
+            apply_retention_policy(
+                self.db, self.retention_days, self.archive_dir, self.archive_grace_days
+            )
+
+    @property
+    def collection(self):
+        return self.db[self.collection_name]
+
+    def insert(self, entry: Dict) -> Any:
+        return self.collection.insert_one(entry).inserted_id
+
+    def add_weight(self, entry_id: Any, weight: float, timestamp: datetime) -> None:
+        self.collection.update_one(
+            {"_id": entry_id},
+            {"$inc": {"weight": weight}, "$max": {"timestamp": timestamp}}
+        )
+
+    def get_popular_searches(self, limit: int = 5) -> List[Dict]:
+        # Простая группировка по типу поиска и параметрам
+        pipeline = [
+            {
+                "$group": {
+                    "_id": {
+                        "search_type": "$search_type",
+                        "params": "$params"
+                    },
+                    # weight - оценка числа поисков (выборка и объединение повторов),
+                    # у старых документов поля нет
+                    "count": {"$sum": {"$ifNull": ["$weight", 1]}},
+                    "last_timestamp": {"$max": "$timestamp"}
+                }
+            },
+            {
+                "$set": {"count": {"$round": ["$count", 0]}}
+            },
+            {
+                "$sort": {"count": -1, "last_timestamp": -1}
+            },
+            {
+                "$limit": limit
+            }
+        ]
+        return list(self.collection.aggregate(pipeline))
+
+    def get_recent_searches(self, limit: int = 5) -> List[Dict]:
+        # Простая сортировка по времени с группировкой
+        pipeline = [
+            {
+                "$sort": {"timestamp": -1}
+            },
+            {
+                "$group": {
+                    "_id": {
+                        "search_type": "$search_type",
+                        "params": "$params"
+                    },
+                    "timestamp": {"$first": "$timestamp"},
+                    "results_count": {"$first": "$results_count"},
+                    "execution_time_ms": {"$first": "$execution_time_ms"},
+                    "search_type": {"$first": "$search_type"},
+                    "params": {"$first": "$params"}
+                }
+            },
+            {
+                "$sort": {"timestamp": -1}
+            },
+            {
+                "$limit": limit
+            }
+        ]
+        return list(self.collection.aggregate(pipeline))
+
+    def get_stats_by_type(self) -> Dict[str, int]:
+        pipeline = [
+            {
+                "$group": {
+                    "_id": "$search_type",
+                    "count": {"$sum": {"$ifNull": ["$weight", 1]}}
+                }
+            }
+        ]
+        results = self.collection.aggregate(pipeline)
+        return {result['_id']: round(result['count']) for result in results}
+
+    def close(self) -> None:
+        """Закрытие подключения к MongoDB (повторный вызов допустим)"""
+        self._stop_background_connect()
+        if self.client:
+            self.client.close()
+            self.client = None
+            self.db = None
+            logger.info(f"Подключение к MongoDB ({self.collection_name}) закрыто")
@@ -0,0 +1,278 @@
+"""
+Популярные поиски по потоковой структуре Space-Saving, общей для всех worker процессов
+
+Каждый процесс учитывает поиски в локальной структуре изменений (delta) и
+периодически добавляет её в общий checkpoint (файл или документ MongoDB).
+Чтение топа выполняется из памяти за O(k): общий checkpoint на момент последнего
+сохранения плюс локальные изменения после него.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+import json
+import logging
+import os
+import threading
+
+from app.logging.search_log import params_key, group_id
+from app.utils.heavy_hitters import SpaceSaving
+from app.utils.pubsub import PubSub
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: блокировка файла между процессами недоступна
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Хранилища checkpoint (параметр POPULAR_SKETCH_STORE)
+FILE_STORE = "file"
+MONGODB_STORE = "mongodb"
+
+
+class FileSketchStore:
+    """Checkpoint в JSON файле; изменения выполняются под межпроцессной блокировкой"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def update(self, change: Callable[[Optional[Dict]], Dict]) -> Dict:
+        """
+        Атомарное изменение checkpoint
+
+        Args:
+            change (Callable): Функция (текущее состояние или None) -> новое состояние
+
+        Returns:
+            Dict: Новое состояние
+        """
+        with open(f"{self.path}.lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            current = None
+            if os.path.exists(self.path):
+                with open(self.path, encoding="utf-8") as source:
+                    current = json.load(source)
+            updated = change(current)
+            temporary = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary, "w", encoding="utf-8") as target:
+                json.dump(updated, target, ensure_ascii=False)
+            os.replace(temporary, self.path)
+            return updated
+
+
+class MongoSketchStore:
+    """Checkpoint в документе MongoDB; конкурентные изменения - через номер версии"""
+
+    DOCUMENT_ID = "popular_searches"
+
+    def __init__(self, mongo, collection_name: str = "popular_sketch", attempts: int = 5):
+        """
+        Args:
+            mongo (MongoConnection): Подключение к MongoDB (используется mongo.db)
+            collection_name (str): Коллекция checkpoint
+            attempts (int): Попыток при конкурентном изменении
+        """
+        self.mongo = mongo
+        self.collection_name = collection_name
+        self.attempts = attempts
+
+    def update(self, change: Callable[[Optional[Dict]], Dict]) -> Dict:
+        from pymongo.errors import DuplicateKeyError
+
+        if self.mongo.db is None:
+            raise ConnectionError("Нет подключения к MongoDB")
+        collection = self.mongo.db[self.collection_name]
+        for _ in range(self.attempts):
+            document = collection.find_one({"_id": self.DOCUMENT_ID})
+            version = document["version"] if document else 0
+            updated = change(document["sketch"] if document else None)
+            try:
+                result = collection.replace_one(
+                    {"_id": self.DOCUMENT_ID, "version": version},
+                    {"_id": self.DOCUMENT_ID, "version": version + 1, "sketch": updated},
+                    upsert=document is None
+                )
+            except DuplicateKeyError:
+                continue
+            if result.matched_count or result.upserted_id is not None:
+                return updated
+        raise RuntimeError("Не удалось сохранить checkpoint: конкурентные изменения")
+
+
+class PopularSketch:
+    """Top-k популярных поисков: общий checkpoint + локальные изменения процесса"""
+
+    def __init__(self, store=None, epsilon: float = 0.001, top_k: int = 5):
+        """
+        Args:
+            store: FileSketchStore, MongoSketchStore или None (только память процесса)
+            epsilon (float): Максимальная переоценка как доля от общего количества
+            top_k (int): Размер топа
+        """
+        self.store = store
+        self.epsilon = epsilon
+        self.top_k = top_k
+        self._lock = threading.Lock()
+        self._delta = SpaceSaving.for_error(epsilon, top_k)
+        self._view = SpaceSaving.for_error(epsilon, top_k)
+        # Уведомление об обновлении топа после загрузки checkpoint
+        self.refreshed = PubSub()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def key(search_type: str, params: Dict) -> Tuple[str, str]:
+        return (search_type, params_key(params))
+
+    def add(self, key: Tuple[str, str], weight: float = 1) -> bool:
+        """
+        Учёт поиска
+
+        Returns:
+            bool: Изменился ли top-k
+        """
+        with self._lock:
+            self._delta.add(key, weight)
+            return self._view.add(key, weight)
+
+    def top(self, k: Optional[int] = None) -> List[Dict]:
+        """
+        Популярные поиски в формате LogStats.get_popular_searches
+
+        Returns:
+            List[Dict]: [{"_id": {"search_type", "params"}, "count", "error"}]
+        """
+        with self._lock:
+            items = self._view.top(k)
+        return [
+            {
+                "_id": group_id(search_type, json.loads(params)),
+                "count": round(count),
+                "error": round(error)
+            }
+            for (search_type, params), count, error in items
+        ]
+
+    def stats(self) -> Dict:
+        """Параметры структуры и граница погрешности"""
+        with self._lock:
+            return {
+                "total": round(self._view.total),
+                "counters": len(self._view),
+                "capacity": self._view.capacity,
+                "error_bound": round(self._view.error_bound, 2),
+                "pending": round(self._delta.total),
+                "store": type(self.store).__name__ if self.store else None,
+            }
+
+    def _from_state(self, state: Optional[Dict]) -> SpaceSaving:
+        capacity = SpaceSaving.for_error(self.epsilon, self.top_k).capacity
+        if not state:
+            return SpaceSaving(capacity, self.top_k)
+        return SpaceSaving.from_dict(state, capacity, self.top_k)
+
+    # ===== CHECKPOINT =====
+    def checkpoint(self) -> bool:
+        """
+        Добавление локальных изменений в общий checkpoint и загрузка общего состояния
+
+        Returns:
+            bool: True если checkpoint сохранён
+        """
+        if self.store is None:
+            return False
+        with self._lock:
+            delta = self._delta
+            self._delta = SpaceSaving(delta.capacity, self.top_k)
+
+        merged_state = {}
+
+        def merge(current: Optional[Dict]) -> Dict:
+            merged = self._from_state(current).merge(delta)
+            merged_state["sketch"] = merged
+            return merged.to_dict()
+
+        try:
+            self.store.update(merge)
+        except Exception as err:
+            logger.error(f"Ошибка при сохранении популярных поисков: {err}")
+            with self._lock:
+                # Изменения не потеряны: вернутся в следующий checkpoint
+                self._delta = delta.merge(self._delta)
+            return False
+
+        with self._lock:
+            # Поиски, учтённые во время сохранения, остаются в представлении
+            self._view = merged_state["sketch"].merge(self._delta)
+        self.refreshed.publish(self.top())
+        return True
+
+    def seed(self, popular: List[Dict]) -> None:
+        """
+        Начальное заполнение точными данными хранилища логов, если checkpoint пуст
+
+        Заполнение выполняется внутри изменения checkpoint, поэтому при
+        одновременном запуске нескольких worker процессов данные не удваиваются.
+
+        Args:
+            popular (List[Dict]): Результат LogStats.get_popular_searches
+        """
+        def fill(sketch: SpaceSaving) -> SpaceSaving:
+            for item in popular:
+                sketch.add(self.key(item["_id"]["search_type"], item["_id"]["params"]), item["count"])
+            return sketch
+
+        if self.store is None:
+            with self._lock:
+                if not self._view.total:
+                    fill(self._view)
+            return
+
+        seeded = {}
+
+        def change(current: Optional[Dict]) -> Dict:
+            sketch = self._from_state(current)
+            if not sketch.total:
+                fill(sketch)
+            seeded["sketch"] = sketch
+            return sketch.to_dict()
+
+        try:
+            self.store.update(change)
+        except Exception as err:
+            logger.error(f"Ошибка при начальном заполнении популярных поисков: {err}")
+            return
+        with self._lock:
+            self._view = seeded["sketch"].merge(self._delta)
+
+    def start(self, interval: float) -> None:
+        """
+        Запуск периодического checkpoint в фоновом потоке
+
+        Args:
+            interval (float): Интервал между checkpoint, сек
+        """
+        if self.store is None or self._thread is not None:
+            return
+
+        def run() -> None:
+            # Первый checkpoint сразу: загрузка общего состояния после запуска
+            self.checkpoint()
+            while not self._stopped.wait(interval):
+                self.checkpoint()
+
+        self._thread = threading.Thread(target=run, name="PopularSketch-checkpoint", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Остановка фонового потока и сохранение оставшихся изменений"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self.store is not None and self._delta.total:
+            self.checkpoint()
@@ -0,0 +1,202 @@
+"""
+Восстановление запросов /api/search/* из логов поиска для воспроизведения нагрузки
+
+Источники - коллекция MongoDB или файлы NDJSON (архив retention *.ndjson.gz,
+файл хранилища FILE, выгрузка mongoexport). LogWriter пишет только первую
+страницу поиска, поэтому все восстановленные запросы - page=1. Запись с
+weight > 1 (выборка LOG_SAMPLE_RATE или объединённые повторы) воспроизводится
+соответствующее число раз в момент своего timestamp.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import gzip
+import json
+import logging
+
+from app.logging.retention import parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Разделитель имён в логе поиска по нескольким актёрам (/api/search/actors)
+ACTORS_SEPARATOR = " & "
+# Имя актёра в логе, если актёр не найден в БД
+ACTOR_ID_PREFIX = "ID: "
+
+
+class ReplayRequest(NamedTuple):
+    """Запрос для воспроизведения"""
+    offset: float           # Секунды от первого поиска в логе
+    search_type: str        # Тип поиска из лога
+    path: str               # Путь API
+    params: Dict[str, str]  # Query параметры
+
+
+# ===== ЧТЕНИЕ ЛОГОВ =====
+def read_ndjson(paths: Iterable[str]) -> Iterator[Dict]:
+    """
+    События поиска из файлов NDJSON (.gz - сжатые)
+
+    Строки {"id", "add_weight"} хранилища FILE прибавляются к весу своего события.
+
+    Args:
+        paths (Iterable[str]): Пути к файлам
+
+    Yields:
+        Dict: События с timestamp (datetime), search_type, params, weight
+    """
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        entries: Dict[object, Dict] = {}
+        with opener(path, "rt", encoding="utf-8") as source:
+            for line_number, line in enumerate(source, 1):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning(f"{path}:{line_number}: повреждённая строка пропущена")
+                    continue
+                if "add_weight" in record:
+                    entry = entries.get(record.get("id"))
+                    if entry is not None:
+                        entry["weight"] = entry.get("weight", 1) + record["add_weight"]
+                    continue
+                record["timestamp"] = _timestamp(record.get("timestamp"))
+                if record.get("id") is not None:
+                    entries[record["id"]] = record
+                else:
+                    yield record
+        yield from entries.values()
+
+
+def read_mongo(collection, since: Optional[datetime] = None, until: Optional[datetime] = None,
+               limit: int = 0) -> Iterator[Dict]:
+    """
+    События поиска из коллекции MongoDB по возрастанию времени
+
+    Args:
+        collection: Коллекция логов поиска
+        since (Optional[datetime]): Начало интервала (включительно)
+        until (Optional[datetime]): Конец интервала (не включительно)
+        limit (int): Максимум событий (0 - все)
+
+    Yields:
+        Dict: События с timestamp (datetime), search_type, params, weight
+    """
+    interval = {}
+    if since is not None:
+        interval["$gte"] = since
+    if until is not None:
+        interval["$lt"] = until
+    query = {"timestamp": interval} if interval else {}
+    projection = {"_id": 0, "timestamp": 1, "search_type": 1, "params": 1, "weight": 1}
+    for record in collection.find(query, projection).sort("timestamp", 1).limit(limit):
+        record["timestamp"] = _timestamp(record.get("timestamp"))
+        yield record
+
+
+def _timestamp(value) -> Optional[datetime]:
+    """
+    timestamp события: BSON дата, ISO строка или дата mongoexport
+
+    mongoexport (Extended JSON) записывает дату как {"$date": "<ISO>"} или
+    {"$date": {"$numberLong": "<мс от эпохи>"}}.
+    """
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, dict) and "$date" in value:
+        value = value["$date"]
+        if isinstance(value, dict):
+            value = value.get("$numberLong")
+        if isinstance(value, (int, float)) or (isinstance(value, str) and value.lstrip("-").isdigit()):
+            return datetime.fromtimestamp(int(value) / 1000, tz=timezone.utc)
+    return parse_timestamp(value)
+
+
+# ===== ПРЕОБРАЗОВАНИЕ В ЗАПРОСЫ =====
+def to_request(search_type: str, params: Dict,
+               actor_ids: Optional[Dict[str, int]] = None) -> Optional[Tuple[str, Dict[str, str]]]:
+    """
+    Запрос /api/search/*, записавший событие поиска
+
+    Поиск по актёру записывается по имени: полное имя из справочника
+    воспроизводится как /search/actor (выбор в списке), несколько имён -
+    как /search/actors, остальное - как /search/actor-by-name.
+
+    Args:
+        search_type (str): Тип поиска из лога
+        params (Dict): Параметры поиска из лога
+        actor_ids (Optional[Dict[str, int]]): Справочник {полное имя: actor_id}
+
+    Returns:
+        Optional[Tuple[str, Dict[str, str]]]: (путь, query параметры) или None,
+        если событие не соответствует ни одному маршруту
+    """
+    actor_ids = actor_ids or {}
+    mode = params.get("mode")
+    if search_type == "keyword" and params.get("keyword"):
+        query = {"q": params["keyword"]}
+        if mode:
+            query["mode"] = mode
+        return "/api/search/keyword", query
+    if search_type == "genre" and params.get("genre"):
+        return "/api/search/genre", {"genre": params["genre"]}
+    if search_type == "genre__years_range" and params.get("genre"):
+        year_from, _, year_to = str(params.get("years_range", "")).partition("-")
+        if not (year_from.isdigit() and year_to.isdigit()):
+            return None
+        return "/api/search/genre-year", {
+            "genre": params["genre"], "year_from": year_from, "year_to": year_to
+        }
+    if search_type == "actor" and params.get("actor_name"):
+        name = params["actor_name"]
+        if mode:
+            return "/api/search/actor-by-name", {"name": name, "mode": mode}
+        if name.startswith(ACTOR_ID_PREFIX) and name[len(ACTOR_ID_PREFIX):].isdigit():
+            return "/api/search/actor", {"actor_id": name[len(ACTOR_ID_PREFIX):]}
+        names = name.split(ACTORS_SEPARATOR)
+        if all(item in actor_ids for item in names):
+            if len(names) > 1:
+                ids = sorted(actor_ids[item] for item in names)
+                return "/api/search/actors", {"actor_ids": ",".join(map(str, ids))}
+            return "/api/search/actor", {"actor_id": str(actor_ids[name])}
+        return "/api/search/actor-by-name", {"name": name}
+    return None
+
+
+def build_schedule(records: Iterable[Dict], actor_ids: Optional[Dict[str, int]] = None,
+                   use_weights: bool = True) -> Tuple[List[ReplayRequest], Dict[str, int]]:
+    """
+    Расписание воспроизведения по событиям поиска
+
+    Дробные веса накапливаются, поэтому сумма воспроизведённых запросов
+    совпадает с суммой weight с точностью до одного запроса.
+
+    Args:
+        records (Iterable[Dict]): События поиска
+        actor_ids (Optional[Dict[str, int]]): Справочник {полное имя: actor_id}
+        use_weights (bool): Повторять событие weight раз (иначе - один раз)
+
+    Returns:
+        Tuple[List[ReplayRequest], Dict[str, int]]: (запросы по возрастанию offset,
+        пропущенные события по типам)
+    """
+    timed = []
+    skipped: Dict[str, int] = {}
+    for record in records:
+        search_type = record.get("search_type") or "unknown"
+        request = to_request(search_type, record.get("params") or {}, actor_ids)
+        if request is None or record.get("timestamp") is None:
+            skipped[search_type] = skipped.get(search_type, 0) + 1
+            continue
+        timed.append((record["timestamp"], search_type, request, record.get("weight") or 1))
+
+    timed.sort(key=lambda item: item[0])
+    schedule = []
+    carry = 0.0
+    for timestamp, search_type, (path, params), weight in timed:
+        offset = (timestamp - timed[0][0]).total_seconds()
+        carry += weight if use_weights else 1
+        repeats = int(carry)
+        carry -= repeats
+        schedule.extend(ReplayRequest(offset, search_type, path, params) for _ in range(repeats))
+    return schedule, skipped
@@ -0,0 +1,223 @@
+"""
+Политика хранения логов поисковых запросов в MongoDB
+
+- timestamp хранится как BSON дата (datetime), а не ISO строка
+- TTL индекс удаляет события старше срока хранения
+- составные индексы соответствуют запросам LogStats
+- перевод старых строковых timestamp в даты пачками
+- архивирование устаревших событий в сжатые файлы NDJSON перед удалением
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict
+import gzip
+import json
+import logging
+import os
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Коллекция логов поиска
+SEARCH_LOG_COLLECTION = "final_project_010825_ptm_al"
+
+# Имя TTL индекса по полю timestamp
+TTL_INDEX_NAME = "timestamp_ttl"
+
+# Составные индексы под запросы статистики: {имя: ключи}
+STATS_INDEXES = {
+    # Популярные запросы и статистика по типам: группировка по типу и параметрам
+    "search_type_params_timestamp": [
+        ("search_type", ASCENDING), ("params", ASCENDING), ("timestamp", DESCENDING)
+    ],
+}
+
+
+def ttl_seconds(retention_days: Optional[float], archive_grace_days: float = 0) -> Optional[int]:
+    """
+    Время жизни события для TTL индекса
+
+    Если включено архивирование, TTL увеличивается на archive_grace_days,
+    чтобы архиватор успел выгрузить события до их удаления MongoDB.
+
+    Args:
+        retention_days (Optional[float]): Срок хранения, дней (None - бессрочно)
+        archive_grace_days (float): Запас для архивирования, дней
+
+    Returns:
+        Optional[int]: expireAfterSeconds или None
+    """
+    if retention_days is None:
+        return None
+    return int((retention_days + archive_grace_days) * 86400)
+
+
+def ensure_indexes(db, retention_days: Optional[float] = None,
+                   archive_grace_days: float = 0,
+                   collection_name: str = SEARCH_LOG_COLLECTION) -> None:
+    """
+    Создание TTL индекса и индексов статистики (идемпотентно)
+
+    Если TTL индекс уже существует с другим сроком, срок меняется через collMod.
+    При бессрочном хранении создаётся обычный индекс по timestamp.
+
+    Args:
+        db: База данных MongoDB
+        retention_days (Optional[float]): Срок хранения событий, дней
+        archive_grace_days (float): Запас для архивирования, дней
+        collection_name (str): Коллекция логов
+    """
+    collection = db[collection_name]
+    expire_after = ttl_seconds(retention_days, archive_grace_days)
+    existing = collection.index_information().get(TTL_INDEX_NAME)
+
+    if existing is not None and existing.get("expireAfterSeconds") != expire_after:
+        if expire_after is not None and "expireAfterSeconds" in existing:
+            db.command("collMod", collection_name, index={
+                "name": TTL_INDEX_NAME, "expireAfterSeconds": expire_after
+            })
+            logger.info(f"Срок хранения логов изменён: {expire_after} с")
+            existing = {"expireAfterSeconds": expire_after}
+        else:
+            collection.drop_index(TTL_INDEX_NAME)
+            existing = None
+
+    if existing is None:
+        options = {"expireAfterSeconds": expire_after} if expire_after is not None else {}
+        collection.create_index([("timestamp", DESCENDING)], name=TTL_INDEX_NAME, **options)
+
+    for name, keys in STATS_INDEXES.items():
+        collection.create_index(keys, name=name)
+    logger.info(f"Индексы коллекции '{collection_name}' проверены")
+
+
+def parse_timestamp(value: str) -> Optional[datetime]:
+    """
+    Разбор строкового timestamp старого формата (datetime.isoformat())
+
+    Args:
+        value (str): ISO строка
+
+    Returns:
+        Optional[datetime]: Дата в UTC или None, если строку не разобрать
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        # Старые записи писались в локальном времени сервера
+        parsed = parsed.astimezone()
+    return parsed.astimezone(timezone.utc)
+
+
+def migrate_string_timestamps(db, batch_size: int = 1000,
+                              collection_name: str = SEARCH_LOG_COLLECTION) -> Dict[str, int]:
+    """
+    Перевод строковых timestamp в BSON даты пачками
+
+    Args:
+        db: База данных MongoDB
+        batch_size (int): Количество документов в пачке
+        collection_name (str): Коллекция логов
+
+    Returns:
+        Dict[str, int]: {"converted": ..., "skipped": ...}
+    """
+    collection = db[collection_name]
+    converted = skipped = 0
+    last_id = None
+
+    while True:
+        query = {"timestamp": {"$type": "string"}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        batch = list(
+            collection.find(query, {"timestamp": 1}).sort("_id", ASCENDING).limit(batch_size)
+        )
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+
+        updates = []
+        for document in batch:
+            timestamp = parse_timestamp(document["timestamp"])
+            if timestamp is None:
+                skipped += 1
+                continue
+            updates.append(UpdateOne({"_id": document["_id"]}, {"$set": {"timestamp": timestamp}}))
+        if updates:
+            converted += collection.bulk_write(updates, ordered=False).modified_count
+        logger.info(f"Миграция timestamp: переведено {converted}, пропущено {skipped}")
+
+    return {"converted": converted, "skipped": skipped}
+
+
+def archive_expired(db, archive_dir: str, retention_days: float,
+                    collection_name: str = SEARCH_LOG_COLLECTION,
+                    now: Optional[datetime] = None) -> Dict[str, object]:
+    """
+    Выгрузка событий старше срока хранения в сжатый файл и их удаление
+
+    Файл archive_dir/search_logs_<дата>.ndjson.gz дописывается, если уже существует.
+    Удаляются только выгруженные документы.
+
+    Args:
+        db: База данных MongoDB
+        archive_dir (str): Каталог архива
+        retention_days (float): Срок хранения, дней
+        collection_name (str): Коллекция логов
+        now (Optional[datetime]): Текущее время (по умолчанию - сейчас)
+
+    Returns:
+        Dict[str, object]: {"archived": количество, "file": путь или None}
+    """
+    collection = db[collection_name]
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=retention_days)
+    query = {"timestamp": {"$type": "date", "$lt": cutoff}}
+    if collection.count_documents(query, limit=1) == 0:
+        return {"archived": 0, "file": None}
+
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"search_logs_{cutoff:%Y%m%d}.ndjson.gz")
+    archived = 0
+    with gzip.open(path, "at", encoding="utf-8") as archive:
+        batch_ids = []
+        for document in collection.find(query).sort("timestamp", ASCENDING):
+            batch_ids.append(document["_id"])
+            document["_id"] = str(document["_id"])
+            document["timestamp"] = document["timestamp"].isoformat()
+            archive.write(json.dumps(document, ensure_ascii=False) + "\n")
+            if len(batch_ids) >= 1000:
+                archive.flush()
+                archived += collection.delete_many({"_id": {"$in": batch_ids}}).deleted_count
+                batch_ids = []
+        archive.flush()
+        if batch_ids:
+            archived += collection.delete_many({"_id": {"$in": batch_ids}}).deleted_count
+
+    logger.info(f"В архив {path} выгружено {archived} событий")
+    return {"archived": archived, "file": path}
+
+
+def apply_retention_policy(db, retention_days: Optional[float],
+                           archive_dir: Optional[str] = None,
+                           archive_grace_days: float = 1) -> None:
+    """
+    Применение политики хранения при подключении LogWriter
+
+    Ошибки (например, нет прав на создание индексов) только логируются:
+    запись логов продолжает работать и без индексов.
+
+    Args:
+        db: База данных MongoDB
+        retention_days (Optional[float]): Срок хранения, дней (None - бессрочно)
+        archive_dir (Optional[str]): Каталог архива (None - без архивирования)
+        archive_grace_days (float): Запас TTL для архивирования, дней
+    """
+    try:
+        ensure_indexes(db, retention_days, archive_grace_days if archive_dir else 0)
+    except OperationFailure as err:
+        logger.warning(f"Не удалось создать индексы логов: {err}")
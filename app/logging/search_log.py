@@ -0,0 +1,129 @@
+"""
+Интерфейс хранилища логов поисковых запросов
+
+LogWriter и LogStats работают с хранилищем только через этот интерфейс,
+поэтому MongoDB можно заменить локальным хранилищем (SQLite или файл).
+Результаты запросов статистики имеют одинаковую структуру во всех хранилищах.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+import json
+
+# Типы хранилищ (параметр SEARCH_LOG_BACKEND)
+MONGODB = "mongodb"
+SQLITE = "sqlite"
+FILE = "file"
+BACKENDS = (MONGODB, SQLITE, FILE)
+
+
+def params_key(params: Dict) -> str:
+    """
+    Каноническое представление параметров поиска для группировки
+
+    Args:
+        params (Dict): Параметры поиска
+
+    Returns:
+        str: JSON с отсортированными ключами
+    """
+    return json.dumps(params, ensure_ascii=False, sort_keys=True, default=str)
+
+
+class SearchLogBackend(ABC):
+    """
+    Хранилище логов поиска: запись событий и запросы статистики
+
+    Событие - словарь с полями timestamp, search_type, params, results_count,
+    execution_time_ms и weight (оценка числа поисков, которые представляет событие).
+    """
+
+    @property
+    def is_ready(self) -> bool:
+        """Готово ли хранилище (локальным хранилищам подключение не требуется)"""
+        return True
+
+    def connect_in_background(self) -> None:
+        """Запуск подключения (для хранилищ с внешним сервером)"""
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Ожидание готовности хранилища"""
+        return self.is_ready
+
+    @abstractmethod
+    def insert(self, entry: Dict) -> Any:
+        """
+        Запись события
+
+        Args:
+            entry (Dict): Событие поиска
+
+        Returns:
+            Any: Идентификатор записанного события
+        """
+
+    @abstractmethod
+    def add_weight(self, entry_id: Any, weight: float, timestamp: datetime) -> None:
+        """
+        Увеличение веса события на число объединённых с ним повторов
+
+        Args:
+            entry_id (Any): Идентификатор события
+            weight (float): Добавляемый вес
+            timestamp (datetime): Время последнего повтора
+        """
+
+    @abstractmethod
+    def get_popular_searches(self, limit: int = 5) -> List[Dict]:
+        """
+        Популярные поиски
+
+        Returns:
+            List[Dict]: [{"_id": {"search_type", "params"}, "count", "last_timestamp"}]
+        """
+
+    @abstractmethod
+    def get_recent_searches(self, limit: int = 5) -> List[Dict]:
+        """
+        Последние уникальные поиски
+
+        Returns:
+            List[Dict]: [{"_id", "timestamp", "results_count", "execution_time_ms",
+                          "search_type", "params"}]
+        """
+
+    @abstractmethod
+    def get_stats_by_type(self) -> Dict[str, int]:
+        """
+        Количество поисков по типам
+
+        Returns:
+            Dict[str, int]: {тип поиска: количество}
+        """
+
+    def close(self) -> None:
+        """Закрытие хранилища (повторный вызов допустим)"""
+
+
+def group_id(search_type: str, params: Dict) -> Dict:
+    """Ключ группировки в формате результатов MongoDB"""
+    return {"search_type": search_type, "params": params}
+
+
+def sort_popular(rows: List[Tuple[float, datetime, Dict]], limit: int) -> List[Dict]:
+    """
+    Сортировка популярных поисков: по количеству, затем по времени последнего поиска
+
+    Args:
+        rows (List[Tuple]): (count, last_timestamp, {"search_type", "params"})
+        limit (int): Количество результатов
+
+    Returns:
+        List[Dict]: Результат в формате get_popular_searches
+    """
+    rows = sorted(rows, key=lambda row: (row[0], row[1]), reverse=True)[:limit]
+    return [
+        {"_id": key, "count": round(count), "last_timestamp": last_timestamp}
+        for count, last_timestamp, key in rows
+    ]
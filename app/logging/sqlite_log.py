@@ -0,0 +1,153 @@
+"""
+Локальное хранилище логов поиска в SQLite (без внешнего сервера)
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+from app.logging.search_log import SearchLogBackend, params_key, group_id
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS search_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        search_type TEXT NOT NULL,
+        params TEXT NOT NULL,
+        results_count INTEGER,
+        execution_time_ms REAL,
+        weight REAL NOT NULL DEFAULT 1
+    );
+    CREATE INDEX IF NOT EXISTS search_log_type_params
+        ON search_log (search_type, params, timestamp);
+    CREATE INDEX IF NOT EXISTS search_log_timestamp ON search_log (timestamp);
+"""
+
+
+class SQLiteSearchLog(SearchLogBackend):
+    """
+    Логи поиска в файле SQLite
+
+    timestamp хранится ISO строкой в UTC, поэтому строковое сравнение
+    совпадает с хронологическим. Одно подключение используется из
+    нескольких потоков под блокировкой.
+    """
+
+    def __init__(self, path: str, retention_days: Optional[float] = None):
+        """
+        Args:
+            path (str): Путь к файлу базы данных
+            retention_days (Optional[float]): Срок хранения событий, дней
+                (устаревшие события удаляются при открытии)
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        if retention_days is not None:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+            with self.connection:
+                deleted = self.connection.execute(
+                    "DELETE FROM search_log WHERE timestamp < ?", (cutoff.isoformat(),)
+                ).rowcount
+            if deleted:
+                logger.info(f"Удалено устаревших событий из {path}: {deleted}")
+        logger.info(f"Хранилище логов SQLite: {path}")
+
+    @property
+    def is_ready(self) -> bool:
+        return self.connection is not None
+
+    def _query(self, query: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self.connection.execute(query, params).fetchall()
+
+    def insert(self, entry: Dict) -> Any:
+        with self._lock, self.connection:
+            cursor = self.connection.execute(
+                """INSERT INTO search_log
+                   (timestamp, search_type, params, results_count, execution_time_ms, weight)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (
+                    entry["timestamp"].isoformat(), entry["search_type"],
+                    params_key(entry["params"]), entry["results_count"],
+                    entry["execution_time_ms"], entry.get("weight", 1)
+                )
+            )
+            return cursor.lastrowid
+
+    def add_weight(self, entry_id: Any, weight: float, timestamp: datetime) -> None:
+        with self._lock, self.connection:
+            self.connection.execute(
+                "UPDATE search_log SET weight = weight + ?, timestamp = MAX(timestamp, ?) "
+                "WHERE id = ?",
+                (weight, timestamp.isoformat(), entry_id)
+            )
+
+    def get_popular_searches(self, limit: int = 5) -> List[Dict]:
+        rows = self._query(
+            """SELECT search_type, params, SUM(weight) AS count, MAX(timestamp) AS last_timestamp
+               FROM search_log
+               GROUP BY search_type, params
+               ORDER BY count DESC, last_timestamp DESC
+               LIMIT ?""",
+            (limit,)
+        )
+        return [
+            {
+                "_id": group_id(row["search_type"], json.loads(row["params"])),
+                "count": round(row["count"]),
+                "last_timestamp": datetime.fromisoformat(row["last_timestamp"])
+            }
+            for row in rows
+        ]
+
+    def get_recent_searches(self, limit: int = 5) -> List[Dict]:
+        # Остальные колонки SQLite берёт из строки с MAX(timestamp)
+        rows = self._query(
+            """SELECT search_type, params, MAX(timestamp) AS timestamp,
+                      results_count, execution_time_ms
+               FROM search_log
+               GROUP BY search_type, params
+               ORDER BY timestamp DESC
+               LIMIT ?""",
+            (limit,)
+        )
+        results = []
+        for row in rows:
+            params = json.loads(row["params"])
+            results.append({
+                "_id": group_id(row["search_type"], params),
+                "timestamp": datetime.fromisoformat(row["timestamp"]),
+                "results_count": row["results_count"],
+                "execution_time_ms": row["execution_time_ms"],
+                "search_type": row["search_type"],
+                "params": params
+            })
+        return results
+
+    def get_stats_by_type(self) -> Dict[str, int]:
+        rows = self._query(
+            "SELECT search_type, SUM(weight) AS count FROM search_log GROUP BY search_type"
+        )
+        return {row["search_type"]: round(row["count"]) for row in rows}
+
+    def close(self) -> None:
+        """Закрытие базы данных (повторный вызов допустим)"""
+        with self._lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+                logger.info(f"Хранилище логов SQLite закрыто: {self.path}")
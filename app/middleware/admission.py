@@ -0,0 +1,210 @@
+"""
+Адаптивное ограничение числа одновременных запросов (admission control)
+
+Для каждого маршрута (шаблона пути) поддерживается лимит одновременных
+запросов, который подстраивается под наблюдаемую задержку по схеме AIMD:
+пока задержка ниже целевой, лимит растёт на 1 за "окно" запросов, при
+превышении - уменьшается умножением на коэффициент, но не чаще раза за окно
+(limit завершённых запросов): медленные ответы одной волны перегрузки
+уменьшают лимит один раз. Запросы сверх лимита сразу получают 503
+с Retry-After. При высокой загрузке запросу выставляется
+request.state.degraded = True, и маршруты переходят в облегчённый режим.
+"""
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Dict, Optional, Tuple
+import json
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AIMDLimiter:
+    """Лимит одновременных запросов с адаптацией по задержке (AIMD)"""
+
+    def __init__(self, initial_limit: float = 20, min_limit: float = 2,
+                 max_limit: float = 200, latency_target_ms: float = 300,
+                 backoff: float = 0.9):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target_ms = latency_target_ms
+        self.backoff = backoff
+        self.in_flight = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.completed = 0
+        # Значение completed при последнем уменьшении лимита
+        self._decreased_at: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        """
+        Попытка занять слот для запроса
+
+        Returns:
+            bool: True если запрос допущен
+        """
+        with self._lock:
+            if self.in_flight >= int(self.limit):
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            self.accepted += 1
+            return True
+
+    def release(self, latency_ms: float, ok: bool) -> None:
+        """
+        Освобождение слота и адаптация лимита
+
+        Args:
+            latency_ms (float): Время обработки запроса, мс
+            ok (bool): Запрос завершился без ошибки сервера
+        """
+        with self._lock:
+            utilized = self.in_flight >= self.limit / 2
+            self.in_flight -= 1
+            self.completed += 1
+            if not ok or latency_ms > self.latency_target_ms:
+                # Не чаще раза за окно из limit завершённых запросов
+                window_passed = (self._decreased_at is None
+                                 or self.completed - self._decreased_at >= self.limit)
+                if window_passed:
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self._decreased_at = self.completed
+            elif utilized:
+                # +1 за каждые limit успешных запросов
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    @property
+    def pressure(self) -> float:
+        """Загрузка: доля занятых слотов (0..1)"""
+        return self.in_flight / self.limit
+
+    def stats(self) -> Dict:
+        """Текущее состояние лимита"""
+        with self._lock:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+            }
+
+
+class AdmissionControlMiddleware:
+    """
+    Admission control для маршрутов с заданными префиксами
+
+    Лимит ведётся отдельно для каждого маршрута приложения (шаблона пути,
+    например /api/search/actor/{actor_id}); запросы, не совпавшие ни с одним
+    маршрутом (404), делят общий лимит своего префикса.
+    """
+
+    def __init__(self, app: ASGIApp, path_prefixes: Tuple[str, ...] = ("/api/search/",),
+                 initial_limit: float = 20, min_limit: float = 2, max_limit: float = 200,
+                 latency_target_ms: float = 300, degrade_at: float = 0.8,
+                 retry_after: int = 1):
+        self.app = app
+        self.path_prefixes = path_prefixes
+        self.limiter_options = {
+            "initial_limit": initial_limit,
+            "min_limit": min_limit,
+            "max_limit": max_limit,
+            "latency_target_ms": latency_target_ms,
+        }
+        self.degrade_at = degrade_at
+        self.retry_after = retry_after
+        self.limiters: Dict[str, AIMDLimiter] = {}
+        ADMISSION_REGISTRY.append(self)
+
+    def _limiter_key(self, scope: Scope) -> str:
+        """
+        Ключ лимита: шаблон пути маршрута или префикс для неизвестных путей
+
+        Args:
+            scope (Scope): ASGI scope запроса (scope["app"] выставляет Starlette)
+
+        Returns:
+            str: Ключ лимита
+        """
+        app = scope.get("app")
+        for route in getattr(getattr(app, "router", None), "routes", ()):
+            match, _ = route.matches(scope)
+            if match != Match.NONE and hasattr(route, "path"):
+                return route.path
+        path = scope["path"]
+        return next(prefix for prefix in self.path_prefixes if path.startswith(prefix))
+
+    def _limiter(self, key: str) -> AIMDLimiter:
+        limiter = self.limiters.get(key)
+        if limiter is None:
+            limiter = self.limiters.setdefault(key, AIMDLimiter(**self.limiter_options))
+        return limiter
+
+    async def _reject(self, send: Send) -> None:
+        """Быстрый отказ 503 с Retry-After"""
+        body = json.dumps({
+            "error": "Сервер перегружен",
+            "message": "Слишком много одновременных запросов, повторите позже"
+        }, ensure_ascii=False).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self._limiter(self._limiter_key(scope))
+        if not limiter.try_acquire():
+            await self._reject(send)
+            return
+
+        scope.setdefault("state", {})["degraded"] = limiter.pressure >= self.degrade_at
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            latency_ms = (time.perf_counter() - start_time) * 1000
+            limiter.release(latency_ms, status_code < 500)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Состояние лимитов по маршрутам"""
+        return {path: limiter.stats() for path, limiter in self.limiters.items()}
+
+
+# Экземпляры middleware (создаются Starlette при сборке приложения)
+ADMISSION_REGISTRY = []
+
+
+def admission_stats() -> Dict[str, Dict]:
+    """
+    Состояние лимитов всех экземпляров AdmissionControlMiddleware
+
+    Returns:
+        Dict[str, Dict]: {маршрут: {limit, in_flight, accepted, rejected}}
+    """
+    stats = {}
+    for middleware in ADMISSION_REGISTRY:
+        stats.update(middleware.stats())
+    return stats
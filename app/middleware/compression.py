@@ -0,0 +1,134 @@
+"""
+Middleware сжатия JSON ответов (brotli/gzip)
+"""
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Optional, Tuple
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def parse_accept_encoding(header: str) -> set:
+    """
+    Разбор заголовка Accept-Encoding
+
+    Args:
+        header (str): Значение заголовка
+
+    Returns:
+        set: Множество допустимых кодировок (без кодировок с q=0)
+    """
+    encodings = set()
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        params = params.replace(" ", "")
+        if params.startswith("q=") and float(params[2:] or 0) == 0:
+            continue
+        encodings.add(name)
+    return encodings
+
+
+def choose_encoding(header: str) -> Optional[str]:
+    """
+    Выбор лучшей поддерживаемой кодировки сжатия для клиента
+
+    Args:
+        header (str): Значение заголовка Accept-Encoding
+
+    Returns:
+        Optional[str]: "br", "gzip" или None
+    """
+    try:
+        accepted = parse_accept_encoding(header)
+    except ValueError:
+        return None
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Сжатие ответов с типом application/json, размер которых превышает порог
+
+    Потоковые ответы (more_body) и ответы, уже имеющие Content-Encoding,
+    передаются без изменений.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024,
+                 gzip_level: int = 6, brotli_quality: int = 4,
+                 media_types: Tuple[str, ...] = ("application/json",)):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.media_types = media_types
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        """Сжатие тела ответа выбранным алгоритмом"""
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    def _is_compressible(self, headers: Headers) -> bool:
+        """Проверка, нужно ли сжимать ответ с такими заголовками"""
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.split(";")[0].strip() in self.media_types
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, passthrough
+
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                if self._is_compressible(Headers(raw=message["headers"])):
+                    # Откладываем заголовки до получения тела ответа
+                    start_message = message
+                else:
+                    passthrough = True
+                    await send(message)
+                return
+
+            body = message.get("body", b"")
+            passthrough = True
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = self._compress(body, encoding)
+            headers = MutableHeaders(scope=start_message)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
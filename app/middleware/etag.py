@@ -0,0 +1,121 @@
+"""
+Middleware условных GET запросов для JSON ответов API (ETag / If-None-Match)
+"""
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Optional, Tuple
+import hashlib
+
+
+def body_etag(body: bytes) -> str:
+    """
+    Слабый ETag по содержимому тела ответа
+
+    Слабый, потому что CompressionMiddleware меняет байты ответа, но не его смысл.
+
+    Args:
+        body (bytes): Тело ответа
+
+    Returns:
+        str: Значение заголовка ETag
+    """
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """
+    Проверка заголовка If-None-Match (слабое сравнение)
+
+    Args:
+        header (str): Значение If-None-Match
+        etag (str): Текущий ETag ответа
+
+    Returns:
+        bool: True если клиент уже имеет это содержимое
+    """
+    opaque = etag[2:]
+    for item in header.split(","):
+        item = item.strip()
+        if item == "*" or item.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+class ETagMiddleware:
+    """
+    ETag для успешных JSON ответов на GET запросы и 304 при совпадении If-None-Match
+
+    Обработчик выполняется как обычно, но клиенту с актуальной копией (кеш
+    веб-интерфейса) вместо тела передаётся 304. Потоковые ответы (more_body)
+    и ответы с собственным ETag передаются без изменений.
+    """
+
+    def __init__(self, app: ASGIApp, path_prefixes: Tuple[str, ...] = ("/api/",),
+                 media_types: Tuple[str, ...] = ("application/json",)):
+        self.app = app
+        self.path_prefixes = path_prefixes
+        self.media_types = media_types
+
+    def _applies(self, scope: Scope) -> bool:
+        """Проверка метода и пути запроса"""
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return False
+        return scope["path"].startswith(self.path_prefixes)
+
+    def _is_taggable(self, message: Message) -> bool:
+        """Проверка, нужно ли ставить ETag ответу с такими заголовками"""
+        headers = Headers(raw=message["headers"])
+        if message["status"] != 200 or "etag" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.split(";")[0].strip() in self.media_types
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self._applies(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match", "")
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, passthrough
+
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                if self._is_taggable(message):
+                    # Откладываем заголовки до получения тела ответа
+                    start_message = message
+                else:
+                    passthrough = True
+                    await send(message)
+                return
+
+            passthrough = True
+            if message.get("more_body", False):
+                await send(start_message)
+                await send(message)
+                return
+
+            etag = body_etag(message.get("body", b""))
+            headers = MutableHeaders(scope=start_message)
+            headers["ETag"] = etag
+            if "cache-control" not in headers:
+                # Клиент может хранить ответ, но перед использованием проверяет его
+                headers["Cache-Control"] = "no-cache"
+            if if_none_match and etag_matches(if_none_match, etag):
+                start_message["status"] = 304
+                for name in ("content-length", "content-type"):
+                    del headers[name]
+                await send(start_message)
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+                return
+            await send(start_message)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,92 @@
+"""
+Middleware управления запросами к БД: отмена при отключении клиента и лимит времени
+
+Для каждого HTTP запроса создаётся токен отмены (app/utils/cancellation.py).
+Сообщения receive читаются отдельной задачей: как только приходит http.disconnect
+до отправки ответа, токен отменяется - MySQLConnector прерывает выполняющийся
+запрос (KILL QUERY) и не начинает следующие, поиск постеров останавливается.
+Лимит времени SELECT запросов (MAX_EXECUTION_TIME) выбирается по префиксу пути.
+"""
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Dict, Optional, Tuple
+import asyncio
+import logging
+
+from app.utils.cancellation import CancelToken, QueryCancelled, use_token, time_limit
+
+logger = logging.getLogger(__name__)
+
+# Ответ на отменённый запрос (nginx: 499 Client Closed Request) - клиент его уже не получит,
+# но admission control не считает отмену ошибкой сервера
+CLIENT_CLOSED_STATUS = 499
+
+
+class QueryControlMiddleware:
+    """
+    Отмена работы запросов с отключившимся клиентом и лимиты времени запросов к БД
+
+    Токен отмены создаётся для путей с префиксами cancel_prefixes, лимит времени -
+    для путей из time_limits (самый длинный подходящий префикс, 0 - без лимита).
+    """
+
+    def __init__(self, app: ASGIApp, cancel_prefixes: Tuple[str, ...] = ("/api/search/",),
+                 time_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.cancel_prefixes = cancel_prefixes
+        # Длинные префиксы проверяются первыми
+        self.time_limits = sorted((time_limits or {}).items(), key=lambda item: -len(item[0]))
+
+    def _time_limit(self, path: str) -> Optional[int]:
+        """Лимит времени запросов к БД для пути, мс"""
+        for prefix, limit_ms in self.time_limits:
+            if path.startswith(prefix):
+                return limit_ms or None
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with time_limit(self._time_limit(scope["path"])):
+            if scope["path"].startswith(self.cancel_prefixes):
+                await self._call_cancellable(scope, receive, send)
+            else:
+                await self.app(scope, receive, send)
+
+    async def _call_cancellable(self, scope: Scope, receive: Receive, send: Send) -> None:
+        token = CancelToken()
+        messages: asyncio.Queue = asyncio.Queue()
+        response_started = False
+        response_complete = False
+
+        async def watch_disconnect() -> None:
+            # Все сообщения передаются приложению через очередь, http.disconnect - и токену
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    if not response_complete:
+                        token.cancel()
+                    return
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started, response_complete
+            if message["type"] == "http.response.start":
+                response_started = True
+            elif not message.get("more_body", False):
+                response_complete = True
+            await send(message)
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            with use_token(token):
+                await self.app(scope, messages.get, send_wrapper)
+        except QueryCancelled:
+            logger.info(f"Клиент отключился, обработка {scope['path']} прервана")
+            if not response_started:
+                await send({"type": "http.response.start", "status": CLIENT_CLOSED_STATUS, "headers": []})
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            watcher.cancel()
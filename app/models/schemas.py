@@ -2,8 +2,11 @@
 Модуль для работы с Pydantic схемами и валидацией данных
 """
 
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional
+
+from app.database.fuzzy_index import EXACT, MODE_PATTERN
+from app.settings import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, BATCH_SEARCH_MAX_ITEMS
 
 
 class FilmBase(BaseModel):
@@ -12,7 +15,8 @@ class FilmBase(BaseModel):
     title: str
     description: Optional[str] = None
     release_year: int
-    language_id: int
+    # В ответах поиска не передаётся
+    language_id: Optional[int] = None
 
 
 class FilmDetail(FilmBase):
@@ -56,3 +60,41 @@ class YearRangeResponse(BaseModel):
     """Модель ответа для диапазона годов"""
     min_year: int
     max_year: int
+
+
+# Обязательные параметры каждого типа пакетного поиска
+BATCH_REQUIRED_FIELDS = {
+    "keyword": ("q",),
+    "genre-year": ("genre",),
+    "genre": ("genre",),
+    "actor": ("actor_id",),
+    "actor-by-name": ("name",),
+}
+
+
+class BatchSearchItem(BaseModel):
+    """Один поиск пакета: тип и параметры как у /api/search/{type}"""
+    type: Literal["keyword", "genre-year", "genre", "actor", "actor-by-name"]
+    q: Optional[str] = Field(None, min_length=1, max_length=100)
+    name: Optional[str] = Field(None, min_length=1, max_length=100)
+    genre: Optional[str] = None
+    year_from: int = Field(2000, ge=1895, le=2030)
+    year_to: int = Field(2023, ge=1895, le=2030)
+    actor_id: Optional[int] = Field(None, ge=1)
+    mode: str = Field(EXACT, pattern=MODE_PATTERN)
+    page: int = Field(1, ge=1)
+    page_size: int = Field(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX)
+
+    @model_validator(mode="after")
+    def check_required(self) -> "BatchSearchItem":
+        missing = [name for name in BATCH_REQUIRED_FIELDS[self.type] if getattr(self, name) is None]
+        if missing:
+            raise ValueError(f"Для поиска {self.type} нужны параметры: {', '.join(missing)}")
+        return self
+
+
+class BatchSearchRequest(BaseModel):
+    """Модель запроса пакетного поиска"""
+    searches: List[BatchSearchItem] = Field(..., min_length=1, max_length=BATCH_SEARCH_MAX_ITEMS)
+    # Части ответа через запятую, как параметр include у /api/search/*
+    include: Optional[str] = None
@@ -0,0 +1,180 @@
+"""
+API маршруты по графу партнёров: общие фильмы актёров, партнёры, цепочки партнёров
+
+Все запросы выполняются по графу в памяти (CoStarIndex); MySQL используется
+только для имён актёров, названий и страницы найденных фильмов.
+"""
+
+from fastapi import APIRouter, Query, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from typing import Dict, FrozenSet, List
+import time
+import logging
+
+from app.database.costar_index import CoStarIndex
+from app.database.mysql_connector import MySQLConnector
+from app.dependencies import get_mysql_db, get_log_writer, get_costar_index, is_degraded
+from app.logging.log_writer import LogWriter
+from app.routes.films import coalesced_search, degraded_headers, film_fields
+from app.settings import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, COSTAR_PATH_MAX_DEPTH, COSTAR_ACTORS_MAX
+from app.utils.responses import FastJSONResponse
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Инициализация маршрутизатора
+router = APIRouter(prefix="/api", tags=["actors"], default_response_class=FastJSONResponse)
+
+
+def actor_names(mysql_db: MySQLConnector, actor_ids: List[int]) -> Dict[int, str]:
+    """Полные имена актёров {actor_id: имя} (ID без имени - "ID: n")"""
+    rows = mysql_db.get_actor_names(sorted(set(actor_ids))) or []
+    names = {row['actor_id']: f"{row['first_name']} {row['last_name']}" for row in rows}
+    return {actor_id: names.get(actor_id, f"ID: {actor_id}") for actor_id in actor_ids}
+
+
+# ===== ФИЛЬМЫ С НЕСКОЛЬКИМИ АКТЁРАМИ =====
+@router.get("/search/actors")
+async def search_by_actors(
+    actor_ids: str = Query(..., pattern=r"^\d+(,\d+)*$", description="ID актёров через запятую"),
+    page: int = Query(1, ge=1, description="Номер страницы"),
+    page_size: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX, description="Размер страницы"),
+    mysql_db: MySQLConnector = Depends(get_mysql_db),
+    log_writer: LogWriter = Depends(get_log_writer),
+    costar_index: CoStarIndex = Depends(get_costar_index),
+    degraded: bool = Depends(is_degraded),
+    fields: FrozenSet[str] = Depends(film_fields)
+):
+    """
+    Фильмы, в которых снимались все указанные актёры
+
+    Query Parameters:
+    - actor_ids: ID актёров через запятую: ?actor_ids=1,2 (до COSTAR_ACTORS_MAX)
+    - page: Номер страницы
+    - page_size: Размер страницы
+    - include (fields): Части ответа через запятую (по умолчанию все)
+
+    Returns:
+    - total_count: Количество общих фильмов
+    - actors: Актёры запроса
+    - films: Общие фильмы по возрастанию film_id
+    """
+    start_time = time.time()
+    actor_ids = sorted({int(item) for item in actor_ids.split(",")})
+    if len(actor_ids) > COSTAR_ACTORS_MAX:
+        raise HTTPException(status_code=422, detail=f"Не больше {COSTAR_ACTORS_MAX} актёров")
+
+    try:
+        film_ids = await run_in_threadpool(costar_index.shared_films, actor_ids)
+        enriched_films, total_count = await coalesced_search(
+            ("actors", tuple(actor_ids), page, page_size),
+            mysql_db, mysql_db.search_by_film_ids, film_ids, page, page_size,
+            degraded=degraded, fields=fields
+        )
+        names = await run_in_threadpool(actor_names, mysql_db, actor_ids)
+
+        execution_time = time.time() - start_time
+
+        log_writer.log_search(
+            search_type="actor",
+            params={"actor_name": " & ".join(names[item] for item in actor_ids), "page": page},
+            results_count=total_count,
+            execution_time_ms=execution_time * 1000
+        )
+
+        return FastJSONResponse({
+            "total_count": total_count,
+            "page": page,
+            "page_size": page_size,
+            "actors": [{"actor_id": item, "full_name": names[item]} for item in actor_ids],
+            "films": enriched_films
+        }, headers=degraded_headers(degraded))
+
+    except Exception as e:
+        logger.error(f"Ошибка при поиске по нескольким актёрам: {e}")
+        return FastJSONResponse({
+            "error": "Ошибка при поиске",
+            "message": str(e)
+        }, status_code=500)
+
+
+# ===== ЦЕПОЧКА ПАРТНЁРОВ =====
+@router.get("/actors/path")
+async def get_costar_path(
+    from_id: int = Query(..., ge=1, description="ID первого актёра"),
+    to_id: int = Query(..., ge=1, description="ID второго актёра"),
+    max_depth: int = Query(COSTAR_PATH_MAX_DEPTH, ge=1, le=COSTAR_PATH_MAX_DEPTH,
+                           description="Максимальное число фильмов в цепочке"),
+    mysql_db: MySQLConnector = Depends(get_mysql_db),
+    costar_index: CoStarIndex = Depends(get_costar_index)
+):
+    """
+    Кратчайшая цепочка партнёров между двумя актёрами
+
+    Каждый следующий актёр цепочки снимался с предыдущим в указанном фильме.
+
+    Query Parameters:
+    - from_id: ID первого актёра
+    - to_id: ID второго актёра
+    - max_depth: Максимальное число фильмов в цепочке
+
+    Returns:
+    - degrees: Число фильмов в цепочке (null, если цепочки нет)
+    - path: [{actor_id, full_name, film: {film_id, title} | null}]
+    """
+    path = await run_in_threadpool(costar_index.shortest_path, from_id, to_id, max_depth)
+    if path is None:
+        return FastJSONResponse({"from_id": from_id, "to_id": to_id, "degrees": None, "path": []})
+
+    def describe() -> List[Dict]:
+        names = actor_names(mysql_db, [item for item, _ in path])
+        film_ids = [film_id for _, film_id in path if film_id is not None]
+        titles = {row['film_id']: row['title'] for row in mysql_db.get_film_titles(film_ids) or []}
+        return [
+            {
+                "actor_id": item,
+                "full_name": names[item],
+                "film": None if film_id is None else {"film_id": film_id, "title": titles.get(film_id)}
+            }
+            for item, film_id in path
+        ]
+
+    return FastJSONResponse({
+        "from_id": from_id,
+        "to_id": to_id,
+        "degrees": len(path) - 1,
+        "path": await run_in_threadpool(describe)
+    })
+
+
+# ===== ПАРТНЁРЫ АКТЁРА =====
+@router.get("/actors/{actor_id}/costars")
+async def get_costars(
+    actor_id: int,
+    limit: int = Query(20, ge=1, le=200, description="Количество партнёров"),
+    mysql_db: MySQLConnector = Depends(get_mysql_db),
+    costar_index: CoStarIndex = Depends(get_costar_index)
+):
+    """
+    Партнёры актёра по числу общих фильмов
+
+    Path Parameters:
+    - actor_id: ID актёра
+
+    Query Parameters:
+    - limit: Количество партнёров
+
+    Returns:
+    - costars: [{actor_id, full_name, shared_films}] по убыванию shared_films
+    """
+    costars = await run_in_threadpool(costar_index.costars, actor_id, limit)
+    if costars is None:
+        raise HTTPException(status_code=404, detail="Актёр не найден")
+    names = await run_in_threadpool(actor_names, mysql_db, [item for item, _ in costars])
+    return FastJSONResponse({
+        "actor_id": actor_id,
+        "costars": [
+            {"actor_id": item, "full_name": names[item], "shared_films": shared}
+            for item, shared in costars
+        ]
+    })
@@ -0,0 +1,170 @@
+"""
+API маршруты для потоковой выгрузки полных результатов поиска (NDJSON/CSV)
+"""
+
+from fastapi import APIRouter, Query, Depends
+from fastapi.responses import StreamingResponse
+from typing import Dict, Iterator
+import logging
+
+from app.database.mysql_connector import MySQLConnector
+from app.dependencies import get_mysql_db
+from app.routes.films import enrich_films_data
+from app.settings import EXPORT_BATCH_SIZE, EXPORT_GZIP_LEVEL
+from app.utils.exporter import (
+    MEDIA_TYPES, serialize_ndjson, serialize_csv, csv_header, gzip_stream
+)
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Инициализация маршрутизатора
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+FORMAT_PATTERN = "^(ndjson|csv)$"
+
+
+def stream_export(mysql_db: MySQLConnector, search_type: str, params: Dict,
+                  fmt: str, with_poster: bool) -> Iterator[bytes]:
+    """
+    Генератор выгрузки: чтение пачками из курсора, обогащение и сериализация
+
+    Курсор и запросы обогащения используют отдельные подключения,
+    поэтому выгрузка не блокирует основное подключение приложения.
+
+    Args:
+        mysql_db (MySQLConnector): Основное подключение (источник конфигурации)
+        search_type (str): Тип поиска
+        params (Dict): Параметры поиска
+        fmt (str): Формат выгрузки (ndjson или csv)
+        with_poster (bool): Добавлять ли постеры
+
+    Yields:
+        bytes: Сериализованные пачки фильмов
+    """
+    serialize = serialize_csv if fmt == "csv" else serialize_ndjson
+    if fmt == "csv":
+        yield csv_header()
+
+    exported = 0
+    with mysql_db.dedicated() as stream_db, mysql_db.dedicated() as enrich_db:
+        for batch in stream_db.stream_search(search_type, params, EXPORT_BATCH_SIZE):
+            films = enrich_films_data(batch, enrich_db, with_poster)
+            exported += len(films)
+            yield serialize(films)
+    logger.info(f"Выгрузка '{search_type}' завершена: {exported} фильмов")
+
+
+def export_response(mysql_db: MySQLConnector, search_type: str, params: Dict,
+                    fmt: str, compress: bool, with_poster: bool) -> StreamingResponse:
+    """
+    Формирование потокового ответа с выгрузкой
+
+    Args:
+        mysql_db (MySQLConnector): Основное подключение (источник конфигурации)
+        search_type (str): Тип поиска
+        params (Dict): Параметры поиска
+        fmt (str): Формат выгрузки (ndjson или csv)
+        compress (bool): Сжимать ли ответ gzip
+        with_poster (bool): Добавлять ли постеры
+
+    Returns:
+        StreamingResponse: Потоковый ответ
+    """
+    chunks = stream_export(mysql_db, search_type, params, fmt, with_poster)
+    headers = {
+        "Content-Disposition": f'attachment; filename="films_{search_type}.{fmt}"'
+    }
+    if compress:
+        chunks = gzip_stream(chunks, EXPORT_GZIP_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+
+# ===== ВЫГРУЗКА ПО КЛЮЧЕВОМУ СЛОВУ =====
+@router.get("/keyword")
+async def export_by_keyword(
+    q: str = Query(..., min_length=1, max_length=100, description="Ключевое слово"),
+    fmt: str = Query("ndjson", alias="format", pattern=FORMAT_PATTERN, description="Формат выгрузки"),
+    compress: bool = Query(False, alias="gzip", description="Сжатие gzip"),
+    posters: bool = Query(False, description="Добавлять постеры"),
+    mysql_db: MySQLConnector = Depends(get_mysql_db)
+):
+    """
+    Выгрузка всех фильмов, найденных по названию
+
+    Query Parameters:
+    - q: Ключевое слово для поиска
+    - format: ndjson или csv
+    - gzip: Сжимать ли ответ
+    - posters: Добавлять ли постеры (запросы к TMDB API)
+    """
+    return export_response(mysql_db, "keyword", {"keyword": q}, fmt, compress, posters)
+
+
+# ===== ВЫГРУЗКА ПО ЖАНРУ И ГОДУ =====
+@router.get("/genre-year")
+async def export_by_genre_and_year(
+    genre: str = Query(..., description="Название жанра"),
+    year_from: int = Query(2000, ge=1895, le=2030, description="Год начала диапазона"),
+    year_to: int = Query(2023, ge=1895, le=2030, description="Год конца диапазона"),
+    fmt: str = Query("ndjson", alias="format", pattern=FORMAT_PATTERN, description="Формат выгрузки"),
+    compress: bool = Query(False, alias="gzip", description="Сжатие gzip"),
+    posters: bool = Query(False, description="Добавлять постеры"),
+    mysql_db: MySQLConnector = Depends(get_mysql_db)
+):
+    """
+    Выгрузка всех фильмов по жанру и диапазону лет выпуска
+
+    Query Parameters:
+    - genre: Название жанра
+    - year_from: Начало диапазона лет
+    - year_to: Конец диапазона лет
+    - format: ndjson или csv
+    - gzip: Сжимать ли ответ
+    - posters: Добавлять ли постеры (запросы к TMDB API)
+    """
+    params = {"genre": genre, "year_from": year_from, "year_to": year_to}
+    return export_response(mysql_db, "genre__years_range", params, fmt, compress, posters)
+
+
+# ===== ВЫГРУЗКА ПО ЖАНРУ =====
+@router.get("/genre")
+async def export_by_genre(
+    genre: str = Query(..., description="Название жанра"),
+    fmt: str = Query("ndjson", alias="format", pattern=FORMAT_PATTERN, description="Формат выгрузки"),
+    compress: bool = Query(False, alias="gzip", description="Сжатие gzip"),
+    posters: bool = Query(False, description="Добавлять постеры"),
+    mysql_db: MySQLConnector = Depends(get_mysql_db)
+):
+    """
+    Выгрузка всех фильмов жанра
+
+    Query Parameters:
+    - genre: Название жанра
+    - format: ndjson или csv
+    - gzip: Сжимать ли ответ
+    - posters: Добавлять ли постеры (запросы к TMDB API)
+    """
+    return export_response(mysql_db, "genre", {"genre": genre}, fmt, compress, posters)
+
+
+# ===== ВЫГРУЗКА ПО АКТЁРУ =====
+@router.get("/actor")
+async def export_by_actor(
+    actor_id: int = Query(..., ge=1, description="ID актёра"),
+    fmt: str = Query("ndjson", alias="format", pattern=FORMAT_PATTERN, description="Формат выгрузки"),
+    compress: bool = Query(False, alias="gzip", description="Сжатие gzip"),
+    posters: bool = Query(False, description="Добавлять постеры"),
+    mysql_db: MySQLConnector = Depends(get_mysql_db)
+):
+    """
+    Выгрузка всех фильмов с участием актёра
+
+    Query Parameters:
+    - actor_id: ID актёра
+    - format: ndjson или csv
+    - gzip: Сжимать ли ответ
+    - posters: Добавлять ли постеры (запросы к TMDB API)
+    """
+    return export_response(mysql_db, "actor", {"actor_id": actor_id}, fmt, compress, posters)
@@ -2,65 +2,228 @@
 API маршруты для поиска фильмов
 """
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 import time
 import logging
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple, Callable, FrozenSet, AsyncIterator
+import asyncio
 
-# Импорт локальных модулей
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-
-from local_settings import dbconfig, MONGODB_URL_READ, MONGODB_URL_WRITE
 from app.database.mysql_connector import MySQLConnector
+from app.database.fuzzy_index import FuzzyIndex, FUZZY, EXACT, MODE_PATTERN
+from app.database.similar_films import SimilarFilms
 from app.logging.log_writer import LogWriter
 from app.logging.log_stats import LogStats
-from app.models.schemas import FilmDetail, GenreResponse, ActorResponse, YearRangeResponse
-from app.utils.formatter import format_film_response
+from app.dependencies import (
+    get_mysql_db, get_log_writer, get_log_stats, get_live_stats, get_change_watcher,
+    get_fuzzy_index, get_similar_films, is_degraded
+)
+from app.logging.live_stats import LiveStats
+from app.routes.posters import proxy_posters
+from app.models.schemas import (
+    GenreResponse, ActorResponse, YearRangeResponse, BatchSearchItem, BatchSearchRequest
+)
+from app.utils.formatter import (
+    format_film_response, format_film_projection, FILM_FIELDS, POSTER_FLIGHT
+)
+from app.utils.single_flight import AsyncSingleFlight
+from app.utils.responses import FastJSONResponse, dumps
+from app.middleware.admission import admission_stats
+from app.settings import (
+    PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, STATS_STREAM_KEEPALIVE_SECONDS, BATCH_SEARCH_CONCURRENCY,
+    SIMILAR_FILMS_TOP_K
+)
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
 
 # Инициализация маршрутизатора
-router = APIRouter(prefix="/api", tags=["films"])
+router = APIRouter(prefix="/api", tags=["films"], default_response_class=FastJSONResponse)
+
 
-# Инициализация подключений к БД (глобальные переменные)
-mysql_db = MySQLConnector(dbconfig)
-log_writer = LogWriter(MONGODB_URL_WRITE)
-log_stats = LogStats(MONGODB_URL_READ)
+def warm_up(mysql_db: MySQLConnector) -> None:
+    """
+    Прогрев worker процесса перед приёмом трафика
 
+    Выполняет справочные запросы, чтобы данные справочников
+    попали в кэш MySQL до первого запроса пользователя.
 
-def enrich_films_data(films: List[Dict]) -> List[Dict]:
+    Args:
+        mysql_db (MySQLConnector): Подключение к MySQL
+    """
+    start_time = time.time()
+    try:
+        mysql_db.get_all_genres()
+        mysql_db.get_all_actors()
+        mysql_db.get_year_range()
+        logger.info(f"Прогрев завершён за {(time.time() - start_time) * 1000:.1f} мс")
+    except Exception as e:
+        logger.warning(f"Ошибка при прогреве: {e}")
+
+
+def enrich_films_data(films: List[Dict], db: MySQLConnector, with_poster: bool = True,
+                      fields: FrozenSet[str] = FILM_FIELDS) -> List[Dict]:
     """
     Обогащение данных фильмов актёрами и категориями
-    
+
+    Актёры и жанры загружаются двумя запросами на всю пачку фильмов,
+    а не двумя запросами на каждый фильм. Незапрошенные в fields части
+    не загружаются и не попадают в ответ.
+
     Args:
         films (List[Dict]): Список фильмов из базы данных
-        
+        db (MySQLConnector): Подключение для запросов
+        with_poster (bool): Получать ли постеры
+        fields (FrozenSet[str]): Необязательные части ответа (по умолчанию все)
+
     Returns:
         List[Dict]: Список обогащённых фильмов с актёрами и категориями
     """
-    enriched_films = []
-    for film in films:
-        actors = mysql_db.get_film_actors(film['film_id'])
-        categories = mysql_db.get_film_categories(film['film_id'])
-        enriched_films.append(format_film_response(film, actors, categories))
-    return enriched_films
+    film_ids = [film['film_id'] for film in films]
+    if fields == FILM_FIELDS:
+        actors = db.get_actors_for_films(film_ids)
+        categories = db.get_categories_for_films(film_ids)
+        return [
+            format_film_response(
+                film, actors[film['film_id']], categories[film['film_id']], with_poster
+            )
+            for film in films
+        ]
+
+    actors = db.get_actors_for_films(film_ids) if "actors" in fields else {}
+    categories = db.get_categories_for_films(film_ids) if "categories" in fields else {}
+    return [
+        format_film_projection(
+            film, fields, actors.get(film['film_id']), categories.get(film['film_id']),
+            with_poster
+        )
+        for film in films
+    ]
+
+
+def film_fields(
+    include: Optional[str] = Query(
+        None, description="Части ответа через запятую: actors, categories, poster, description"
+    ),
+    fields: Optional[str] = Query(None, description="Синоним include")
+) -> FrozenSet[str]:
+    """
+    Зависимость: проекция ответа поиска
+
+    Без параметра возвращаются все части; пустое значение оставляет только
+    основные поля фильма (film_id, title, release_year, length, rating).
+
+    Returns:
+        FrozenSet[str]: Запрошенные части из FILM_FIELDS
+    """
+    return parse_fields(include if include is not None else fields)
+
+
+def parse_fields(value: Optional[str]) -> FrozenSet[str]:
+    """
+    Разбор списка частей ответа ("actors,poster")
+
+    Args:
+        value (Optional[str]): Части через запятую; None - все части
+
+    Returns:
+        FrozenSet[str]: Запрошенные части из FILM_FIELDS
+
+    Raises:
+        HTTPException: 422 при неизвестных частях
+    """
+    if value is None:
+        return FILM_FIELDS
+    requested = frozenset(part.strip() for part in value.split(",") if part.strip())
+    unknown = requested - FILM_FIELDS
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Неизвестные части ответа: {', '.join(sorted(unknown))}"
+        )
+    return requested
+
+
+# Одинаковые одновременные поиски выполняются один раз
+search_flight = AsyncSingleFlight()
+
+
+def run_search(mysql_db: MySQLConnector, search_func: Callable, degraded: bool,
+               fields: FrozenSet[str], *args) -> Tuple[List[Dict], int]:
+    """
+    Поиск и обогащение результатов (выполняется в пуле потоков)
+
+    Args:
+        mysql_db (MySQLConnector): Подключение к MySQL
+        search_func (Callable): Метод поиска MySQLConnector
+        degraded (bool): Облегчённый режим - без постеров, с кэшированным количеством
+        fields (FrozenSet[str]): Необязательные части ответа
+        *args: Аргументы метода поиска
+
+    Returns:
+        Tuple[List[Dict], int]: Кортеж (обогащённые фильмы, общее количество)
+    """
+    films, total_count = search_func(
+        *args, use_cached_count=degraded, with_description="description" in fields
+    )
+    return proxy_posters(enrich_films_data(films, mysql_db, not degraded, fields)), total_count
+
+
+async def coalesced_search(key: Tuple, mysql_db: MySQLConnector, search_func: Callable,
+                           *args, degraded: bool = False,
+                           fields: FrozenSet[str] = FILM_FIELDS) -> Tuple[List[Dict], int]:
+    """
+    Поиск с объединением одинаковых одновременных запросов
+
+    Пока поиск с тем же ключом выполняется, новые запросы ждут
+    его результат вместо повторного выполнения запросов к БД и TMDB.
+
+    Args:
+        key (Tuple): Ключ поиска (тип и все параметры)
+        mysql_db (MySQLConnector): Подключение к MySQL
+        search_func (Callable): Метод поиска MySQLConnector
+        *args: Аргументы метода поиска
+        degraded (bool): Облегчённый режим при перегрузке
+        fields (FrozenSet[str]): Необязательные части ответа
+
+    Returns:
+        Tuple[List[Dict], int]: Кортеж (обогащённые фильмы, общее количество)
+    """
+    return await search_flight.do(
+        key + (degraded, tuple(sorted(fields))),
+        lambda: run_in_threadpool(run_search, mysql_db, search_func, degraded, fields, *args)
+    )
+
+
+def degraded_headers(degraded: bool) -> Dict[str, str]:
+    """Заголовок, сообщающий клиенту об облегчённом ответе"""
+    return {"X-Degraded": "1"} if degraded else {}
 
 
 # ===== ПОИСК ПО КЛЮЧЕВОМУ СЛОВУ =====
 @router.get("/search/keyword")
 async def search_by_keyword(
     q: str = Query(..., min_length=1, max_length=100, description="Ключевое слово"),
-    page: int = Query(1, ge=1, description="Номер страницы")
+    page: int = Query(1, ge=1, description="Номер страницы"),
+    page_size: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX, description="Размер страницы"),
+    mode: str = Query(EXACT, pattern=MODE_PATTERN, description="exact - подстрока, fuzzy - с опечатками"),
+    mysql_db: MySQLConnector = Depends(get_mysql_db),
+    log_writer: LogWriter = Depends(get_log_writer),
+    fuzzy_index: FuzzyIndex = Depends(get_fuzzy_index),
+    degraded: bool = Depends(is_degraded),
+    fields: FrozenSet[str] = Depends(film_fields)
 ):
     """
     Поиск фильмов по названию (ключевому слову)
 
     Query Parameters:
     - q: Ключевое слово для поиска
+    - mode: exact - вхождение подстроки (по умолчанию), fuzzy - слова названия
+      с опечатками (до FUZZY_SEARCH_MAX_DISTANCE правок), по возрастанию числа опечаток
     - page: Номер страницы (по умолчанию 1)
+    - page_size: Размер страницы (по умолчанию 10)
+    - include (fields): Части ответа через запятую (по умолчанию все)
 
     Returns:
     - total_count: Общее количество результатов
@@ -71,35 +234,48 @@ async def search_by_keyword(
     start_time = time.time()
 
     try:
-        # Выполнение поиска в БД
-        films, total_count = mysql_db.search_by_keyword(q, page, page_size=10)
-
-        # Обогащение данных (добавление актёров и жанров)
-        enriched_films = enrich_films_data(films)
+        params = {"keyword": q, "page": page}
+        if mode == FUZZY:
+            # Фильмы находятся по индексу в памяти, из MySQL выбирается только страница
+            film_ids = await run_in_threadpool(fuzzy_index.search_films, q)
+            enriched_films, total_count = await coalesced_search(
+                ("keyword_fuzzy", q, page, page_size),
+                mysql_db, mysql_db.search_by_film_ids, film_ids, page, page_size,
+                degraded=degraded, fields=fields
+            )
+            params["mode"] = FUZZY
+        else:
+            # Выполнение поиска в БД и обогащение данных (добавление актёров и жанров)
+            enriched_films, total_count = await coalesced_search(
+                ("keyword", q, page, page_size),
+                mysql_db, mysql_db.search_by_keyword, q, page, page_size,
+                degraded=degraded, fields=fields
+            )
 
         execution_time = time.time() - start_time
 
         # Логирование запроса
         log_writer.log_search(
             search_type="keyword",
-            params={"keyword": q, "page": page},
+            params=params,
             results_count=total_count,
             execution_time_ms=execution_time * 1000
         )
 
-        return {
+        return FastJSONResponse({
             "total_count": total_count,
             "page": page,
-            "page_size": 10,
+            "page_size": page_size,
+            "mode": mode,
             "films": enriched_films
-        }
+        }, headers=degraded_headers(degraded))
 
     except Exception as e:
         logger.error(f"Ошибка при поиске по ключевому слову: {e}")
-        return {
+        return FastJSONResponse({
             "error": "Ошибка при поиске",
             "message": str(e)
-        }
+        }, status_code=500)
 
 
 # ===== ПОИСК ПО ЖАНРУ И ГОДУ =====
@@ -108,7 +284,12 @@ async def search_by_genre_and_year(
     genre: str = Query(..., description="Название жанра"),
     year_from: int = Query(2000, ge=1895, le=2030, description="Год начала диапазона"),
     year_to: int = Query(2023, ge=1895, le=2030, description="Год конца диапазона"),
-    page: int = Query(1, ge=1, description="Номер страницы")
+    page: int = Query(1, ge=1, description="Номер страницы"),
+    page_size: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX, description="Размер страницы"),
+    mysql_db: MySQLConnector = Depends(get_mysql_db),
+    log_writer: LogWriter = Depends(get_log_writer),
+    degraded: bool = Depends(is_degraded),
+    fields: FrozenSet[str] = Depends(film_fields)
 ):
     """
     Поиск фильмов по жанру и диапазону лет выпуска
@@ -118,6 +299,8 @@ async def search_by_genre_and_year(
     - year_from: Начало диапазона лет
     - year_to: Конец диапазона лет
     - page: Номер страницы
+    - page_size: Размер страницы
+    - include (fields): Части ответа через запятую (по умолчанию все)
 
     Returns:
     - total_count: Общее количество результатов
@@ -127,12 +310,13 @@ async def search_by_genre_and_year(
     start_time = time.time()
 
     try:
-        films, total_count = mysql_db.search_by_genre_and_year(
-            genre, year_from, year_to, page, page_size=10
+        enriched_films, total_count = await coalesced_search(
+            ("genre__years_range", genre, year_from, year_to, page, page_size),
+            mysql_db, mysql_db.search_by_genre_and_year,
+            genre, year_from, year_to, page, page_size,
+            degraded=degraded, fields=fields
         )
 
-        enriched_films = enrich_films_data(films)
-
         execution_time = time.time() - start_time
 
         log_writer.log_search(
@@ -146,26 +330,31 @@ async def search_by_genre_and_year(
             execution_time_ms=execution_time * 1000
         )
 
-        return {
+        return FastJSONResponse({
             "total_count": total_count,
             "page": page,
-            "page_size": 10,
+            "page_size": page_size,
             "films": enriched_films
-        }
+        }, headers=degraded_headers(degraded))
 
     except Exception as e:
         logger.error(f"Ошибка при поиске по жанру и году: {e}")
-        return {
+        return FastJSONResponse({
             "error": "Ошибка при поиске",
             "message": str(e)
-        }
+        }, status_code=500)
 
 
 # ===== ПОИСК ТОЛЬКО ПО ЖАНРУ =====
 @router.get("/search/genre")
 async def search_by_genre(
     genre: str = Query(..., description="Название жанра"),
-    page: int = Query(1, ge=1, description="Номер страницы")
+    page: int = Query(1, ge=1, description="Номер страницы"),
+    page_size: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX, description="Размер страницы"),
+    mysql_db: MySQLConnector = Depends(get_mysql_db),
+    log_writer: LogWriter = Depends(get_log_writer),
+    degraded: bool = Depends(is_degraded),
+    fields: FrozenSet[str] = Depends(film_fields)
 ):
     """
     Поиск фильмов только по жанру
@@ -173,6 +362,8 @@ async def search_by_genre(
     Query Parameters:
     - genre: Название жанра
     - page: Номер страницы
+    - page_size: Размер страницы
+    - include (fields): Части ответа через запятую (по умолчанию все)
 
     Returns:
     - total_count: Общее количество результатов
@@ -182,9 +373,11 @@ async def search_by_genre(
     start_time = time.time()
 
     try:
-        films, total_count = mysql_db.search_by_genre(genre, page, page_size=10)
-
-        enriched_films = enrich_films_data(films)
+        enriched_films, total_count = await coalesced_search(
+            ("genre", genre, page, page_size),
+            mysql_db, mysql_db.search_by_genre, genre, page, page_size,
+            degraded=degraded, fields=fields
+        )
 
         execution_time = time.time() - start_time
 
@@ -195,26 +388,31 @@ async def search_by_genre(
             execution_time_ms=execution_time * 1000
         )
 
-        return {
+        return FastJSONResponse({
             "total_count": total_count,
             "page": page,
-            "page_size": 10,
+            "page_size": page_size,
             "films": enriched_films
-        }
+        }, headers=degraded_headers(degraded))
 
     except Exception as e:
         logger.error(f"Ошибка при поиске по жанру: {e}")
-        return {
+        return FastJSONResponse({
             "error": "Ошибка при поиске",
             "message": str(e)
-        }
+        }, status_code=500)
 
 
 # ===== ПОИСК ПО АКТЁРУ =====
 @router.get("/search/actor")
 async def search_by_actor(
     actor_id: int = Query(..., ge=1, description="ID актёра"),
-    page: int = Query(1, ge=1, description="Номер страницы")
+    page: int = Query(1, ge=1, description="Номер страницы"),
+    page_size: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX, description="Размер страницы"),
+    mysql_db: MySQLConnector = Depends(get_mysql_db),
+    log_writer: LogWriter = Depends(get_log_writer),
+    degraded: bool = Depends(is_degraded),
+    fields: FrozenSet[str] = Depends(film_fields)
 ):
     """
     Поиск фильмов по актёру
@@ -222,6 +420,8 @@ async def search_by_actor(
     Query Parameters:
     - actor_id: ID актёра
     - page: Номер страницы
+    - page_size: Размер страницы
+    - include (fields): Части ответа через запятую (по умолчанию все)
 
     Returns:
     - total_count: Общее количество результатов
@@ -231,14 +431,16 @@ async def search_by_actor(
     start_time = time.time()
 
     try:
-        films, total_count = mysql_db.search_by_actor(actor_id, page, page_size=10)
-
-        enriched_films = enrich_films_data(films)
+        enriched_films, total_count = await coalesced_search(
+            ("actor", actor_id, page, page_size),
+            mysql_db, mysql_db.search_by_actor, actor_id, page, page_size,
+            degraded=degraded, fields=fields
+        )
 
         execution_time = time.time() - start_time
 
         # Получаем имя актёра для логирования
-        actor_info = mysql_db.get_actor_by_id(actor_id)
+        actor_info = await run_in_threadpool(mysql_db.get_actor_by_id, actor_id)
         actor_name = f"{actor_info['first_name']} {actor_info['last_name']}" if actor_info else f"ID: {actor_id}"
         
         log_writer.log_search(
@@ -248,24 +450,342 @@ async def search_by_actor(
             execution_time_ms=execution_time * 1000
         )
 
-        return {
+        return FastJSONResponse({
             "total_count": total_count,
             "page": page,
-            "page_size": 10,
+            "page_size": page_size,
             "films": enriched_films
-        }
+        }, headers=degraded_headers(degraded))
 
     except Exception as e:
         logger.error(f"Ошибка при поиске по актёру: {e}")
-        return {
+        return FastJSONResponse({
             "error": "Ошибка при поиске",
             "message": str(e)
+        }, status_code=500)
+
+
+# ===== ПОИСК ПО ИМЕНИ АКТЁРА =====
+@router.get("/search/actor-by-name")
+async def search_by_actor_name(
+    name: str = Query(..., min_length=1, max_length=100, description="Имя и/или фамилия актёра"),
+    page: int = Query(1, ge=1, description="Номер страницы"),
+    page_size: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX, description="Размер страницы"),
+    mode: str = Query(EXACT, pattern=MODE_PATTERN, description="exact - подстрока, fuzzy - с опечатками"),
+    mysql_db: MySQLConnector = Depends(get_mysql_db),
+    log_writer: LogWriter = Depends(get_log_writer),
+    fuzzy_index: FuzzyIndex = Depends(get_fuzzy_index),
+    degraded: bool = Depends(is_degraded),
+    fields: FrozenSet[str] = Depends(film_fields)
+):
+    """
+    Поиск фильмов по имени актёра
+
+    Query Parameters:
+    - name: Имя, фамилия или полное имя актёра
+    - mode: exact - вхождение в полное имя (по умолчанию), fuzzy - с опечатками
+    - page: Номер страницы
+    - page_size: Размер страницы
+    - include (fields): Части ответа через запятую (по умолчанию все)
+
+    Returns:
+    - total_count: Общее количество результатов
+    - page: Текущая страница
+    - films: Фильмы, в которых снимался любой из найденных актёров
+    - actors: Найденные актёры с числом опечаток (только mode=fuzzy)
+    """
+    start_time = time.time()
+
+    try:
+        params = {"actor_name": name, "page": page}
+        response = {}
+        if mode == FUZZY:
+            actors = await run_in_threadpool(fuzzy_index.search_actors, name)
+            actor_ids = [actor["actor_id"] for actor in actors]
+            enriched_films, total_count = await coalesced_search(
+                ("actor_fuzzy", name, page, page_size),
+                mysql_db, mysql_db.search_by_actor_ids, actor_ids, page, page_size,
+                degraded=degraded, fields=fields
+            )
+            params["mode"] = FUZZY
+            response["actors"] = actors
+        else:
+            enriched_films, total_count = await coalesced_search(
+                ("actor_name", name, page, page_size),
+                mysql_db, mysql_db.search_by_actor_name, name, page, page_size,
+                degraded=degraded, fields=fields
+            )
+
+        execution_time = time.time() - start_time
+
+        log_writer.log_search(
+            search_type="actor",
+            params=params,
+            results_count=total_count,
+            execution_time_ms=execution_time * 1000
+        )
+
+        return FastJSONResponse({
+            "total_count": total_count,
+            "page": page,
+            "page_size": page_size,
+            "mode": mode,
+            **response,
+            "films": enriched_films
+        }, headers=degraded_headers(degraded))
+
+    except Exception as e:
+        logger.error(f"Ошибка при поиске по имени актёра: {e}")
+        return FastJSONResponse({
+            "error": "Ошибка при поиске",
+            "message": str(e)
+        }, status_code=500)
+
+
+# ===== ПАКЕТНЫЙ ПОИСК =====
+async def prepare_batch_search(item: BatchSearchItem, mysql_db: MySQLConnector,
+                               fuzzy_index: FuzzyIndex) -> Tuple[Callable, Tuple, str, Dict, Dict]:
+    """
+    Метод поиска и параметры для одного поиска пакета (как в маршрутах /api/search/*)
+
+    Returns:
+        Tuple: (метод поиска, аргументы, тип для лога, параметры для лога, доп. поля ответа)
+    """
+    paging = (item.page, item.page_size)
+    if item.type == "keyword":
+        params, extra = {"keyword": item.q, "page": item.page}, {"mode": item.mode}
+        if item.mode == FUZZY:
+            film_ids = await run_in_threadpool(fuzzy_index.search_films, item.q)
+            params["mode"] = FUZZY
+            return mysql_db.search_by_film_ids, (film_ids, *paging), "keyword", params, extra
+        return mysql_db.search_by_keyword, (item.q, *paging), "keyword", params, extra
+    if item.type == "genre-year":
+        params = {
+            "genre": item.genre,
+            "years_range": f"{item.year_from}-{item.year_to}",
+            "page": item.page
+        }
+        return (mysql_db.search_by_genre_and_year, (item.genre, item.year_from, item.year_to, *paging),
+                "genre__years_range", params, {})
+    if item.type == "genre":
+        return (mysql_db.search_by_genre, (item.genre, *paging),
+                "genre", {"genre": item.genre, "page": item.page}, {})
+    if item.type == "actor":
+        actor_info = await run_in_threadpool(mysql_db.get_actor_by_id, item.actor_id)
+        actor_name = (
+            f"{actor_info['first_name']} {actor_info['last_name']}" if actor_info else f"ID: {item.actor_id}"
+        )
+        return (mysql_db.search_by_actor, (item.actor_id, *paging),
+                "actor", {"actor_name": actor_name, "page": item.page}, {})
+    params, extra = {"actor_name": item.name, "page": item.page}, {"mode": item.mode}
+    if item.mode == FUZZY:
+        actors = await run_in_threadpool(fuzzy_index.search_actors, item.name)
+        params["mode"] = FUZZY
+        extra["actors"] = actors
+        actor_ids = [actor["actor_id"] for actor in actors]
+        return mysql_db.search_by_actor_ids, (actor_ids, *paging), "actor", params, extra
+    return mysql_db.search_by_actor_name, (item.name, *paging), "actor", params, extra
+
+
+async def run_batch_search(item: BatchSearchItem, mysql_db: MySQLConnector, fuzzy_index: FuzzyIndex,
+                           limiter: asyncio.Semaphore, degraded: bool,
+                           fields: FrozenSet[str]) -> Dict:
+    """
+    Выполнение одного поиска пакета без обогащения
+
+    Returns:
+        Dict: Фильмы из БД, общее количество, время и параметры для лога
+              (или описание ошибки - ошибка одного поиска не прерывает пакет)
+    """
+    async with limiter:
+        start_time = time.time()
+        try:
+            search_func, args, search_type, params, extra = await prepare_batch_search(
+                item, mysql_db, fuzzy_index
+            )
+            films, total_count = await run_in_threadpool(
+                lambda: search_func(
+                    *args, use_cached_count=degraded, with_description="description" in fields
+                )
+            )
+        except Exception as e:
+            logger.error(f"Ошибка при пакетном поиске {item.type}: {e}")
+            return {"error": "Ошибка при поиске", "message": str(e),
+                    "time_ms": round((time.time() - start_time) * 1000, 2)}
+        return {
+            "films": films,
+            "total_count": total_count,
+            "extra": extra,
+            "search_type": search_type,
+            "params": params,
+            "time_ms": round((time.time() - start_time) * 1000, 2)
         }
 
 
+def enrich_unique_films(results: List[Dict], mysql_db: MySQLConnector, with_poster: bool,
+                        fields: FrozenSet[str]) -> Dict[int, Dict]:
+    """
+    Обогащение всех фильмов пакета за один проход (выполняется в пуле потоков)
+
+    Фильм, найденный несколькими поисками, обогащается один раз: актёры и жанры
+    загружаются двумя запросами на все фильмы пакета, постер ищется один раз.
+
+    Returns:
+        Dict[int, Dict]: {film_id: обогащённый фильм}
+    """
+    unique = {}
+    for result in results:
+        for film in result.get("films", ()):
+            unique.setdefault(film['film_id'], film)
+    enriched = proxy_posters(enrich_films_data(list(unique.values()), mysql_db, with_poster, fields))
+    return {film['film_id']: film for film in enriched}
+
+
+@router.post("/search/batch")
+async def search_batch(
+    request: BatchSearchRequest,
+    mysql_db: MySQLConnector = Depends(get_mysql_db),
+    log_writer: LogWriter = Depends(get_log_writer),
+    fuzzy_index: FuzzyIndex = Depends(get_fuzzy_index),
+    degraded: bool = Depends(is_degraded)
+):
+    """
+    Несколько поисков одним запросом
+
+    Поиски выполняются одновременно (не больше BATCH_SEARCH_CONCURRENCY),
+    одинаковые поиски пакета - один раз. Результаты обогащаются вместе:
+    каждый фильм - один раз, даже если он найден несколькими поисками.
+
+    Body:
+    - searches: Список поисков {"type": "keyword" | "genre-year" | "genre" | "actor" |
+      "actor-by-name", ...параметры соответствующего /api/search/{type}}
+    - include: Части ответа через запятую (по умолчанию все)
+
+    Returns:
+    - results: Результаты в порядке поисков (total_count, page, page_size, films, time_ms
+      или error и message)
+    - unique_films: Количество разных фильмов во всех результатах
+    - enrichment_ms: Время общего обогащения
+    - execution_time_ms: Общее время
+    """
+    start_time = time.time()
+    fields = parse_fields(request.include)
+
+    try:
+        limiter = asyncio.Semaphore(BATCH_SEARCH_CONCURRENCY)
+        unique_items = {}
+        for item in request.searches:
+            unique_items.setdefault(tuple(item.model_dump().items()), item)
+        results = dict(zip(unique_items, await asyncio.gather(*(
+            run_batch_search(item, mysql_db, fuzzy_index, limiter, degraded, fields)
+            for item in unique_items.values()
+        ))))
+
+        enrich_start = time.time()
+        enriched = await run_in_threadpool(
+            enrich_unique_films, list(results.values()), mysql_db, not degraded, fields
+        )
+        enrichment_ms = round((time.time() - enrich_start) * 1000, 2)
+
+        for result in results.values():
+            if "error" not in result:
+                log_writer.log_search(
+                    search_type=result["search_type"],
+                    params=result["params"],
+                    results_count=result["total_count"],
+                    execution_time_ms=result["time_ms"]
+                )
+
+        response_items = []
+        for item in request.searches:
+            result = results[tuple(item.model_dump().items())]
+            if "error" in result:
+                response_items.append({
+                    "type": item.type,
+                    "error": result["error"],
+                    "message": result["message"],
+                    "time_ms": result["time_ms"]
+                })
+                continue
+            response_items.append({
+                "type": item.type,
+                "total_count": result["total_count"],
+                "page": item.page,
+                "page_size": item.page_size,
+                **result["extra"],
+                "films": [enriched[film['film_id']] for film in result["films"]],
+                "time_ms": result["time_ms"]
+            })
+
+        return FastJSONResponse({
+            "results": response_items,
+            "unique_films": len(enriched),
+            "enrichment_ms": enrichment_ms,
+            "execution_time_ms": round((time.time() - start_time) * 1000, 2)
+        }, headers=degraded_headers(degraded))
+
+    except Exception as e:
+        logger.error(f"Ошибка при пакетном поиске: {e}")
+        return FastJSONResponse({
+            "error": "Ошибка при поиске",
+            "message": str(e)
+        }, status_code=500)
+
+
+# ===== ПОХОЖИЕ ФИЛЬМЫ =====
+def load_similar_films(mysql_db: MySQLConnector, similar: List[Tuple[int, float]],
+                       fields: FrozenSet[str]) -> List[Dict]:
+    """Фильмы из списка соседей с оценкой похожести (выполняется в пуле потоков)"""
+    scores = dict(similar)
+    films = mysql_db.get_films_by_ids([film_id for film_id, _ in similar], "description" in fields)
+    enriched = proxy_posters(enrich_films_data(films, mysql_db, True, fields))
+    for film in enriched:
+        film["similarity"] = scores[film['film_id']]
+    return enriched
+
+
+@router.get("/films/{film_id}/similar")
+async def get_similar_films_route(
+    film_id: int,
+    limit: int = Query(10, ge=1, le=SIMILAR_FILMS_TOP_K, description="Количество фильмов"),
+    mysql_db: MySQLConnector = Depends(get_mysql_db),
+    similar_films: SimilarFilms = Depends(get_similar_films),
+    fields: FrozenSet[str] = Depends(film_fields)
+):
+    """
+    Фильмы, похожие на данный (общие актёры и жанры, рейтинг, длительность)
+
+    Списки соседей вычислены заранее, поэтому поиск не выполняет запросов
+    к MySQL - загружаются только сами найденные фильмы.
+
+    Path Parameters:
+    - film_id: ID фильма
+
+    Query Parameters:
+    - limit: Количество фильмов (не больше SIMILAR_FILMS_TOP_K)
+    - include (fields): Части ответа через запятую (по умолчанию все)
+
+    Returns:
+    - film_id: ID исходного фильма
+    - films: Похожие фильмы по убыванию similarity (0..1)
+    """
+    similar = await run_in_threadpool(similar_films.similar, film_id, limit)
+    if similar is None:
+        raise HTTPException(status_code=404, detail="Фильм не найден")
+    try:
+        films = await run_in_threadpool(load_similar_films, mysql_db, similar, fields)
+        return FastJSONResponse({"film_id": film_id, "films": films})
+    except Exception as e:
+        logger.error(f"Ошибка при получении похожих фильмов: {e}")
+        return FastJSONResponse({
+            "error": "Ошибка при получении похожих фильмов",
+            "message": str(e)
+        }, status_code=500)
+
+
 # ===== ПОЛУЧЕНИЕ ЖАНРОВ =====
 @router.get("/genres", response_model=List[GenreResponse])
-async def get_genres():
+async def get_genres(mysql_db: MySQLConnector = Depends(get_mysql_db)):
     """
     Получение списка всех доступных жанров
 
@@ -273,11 +793,12 @@ async def get_genres():
     - List[GenreResponse]: Список жанров с ID и названием
     """
     try:
-        genres = mysql_db.get_all_genres()
-        return [
-            GenreResponse(category_id=g['category_id'], name=g['name'])
+        genres = await run_in_threadpool(mysql_db.get_all_genres)
+        # Строки БД уже соответствуют GenreResponse - отдаём без повторной валидации
+        return FastJSONResponse([
+            {"category_id": g['category_id'], "name": g['name']}
             for g in genres
-        ]
+        ])
     except Exception as e:
         logger.error(f"Ошибка при получении жанров: {e}")
         return []
@@ -285,7 +806,7 @@ async def get_genres():
 
 # ===== ПОЛУЧЕНИЕ АКТЁРОВ =====
 @router.get("/actors", response_model=List[ActorResponse])
-async def get_actors():
+async def get_actors(mysql_db: MySQLConnector = Depends(get_mysql_db)):
     """
     Получение списка всех доступных актёров
 
@@ -293,16 +814,16 @@ async def get_actors():
     - List[ActorResponse]: Список актёров с ID и полным именем
     """
     try:
-        actors = mysql_db.get_all_actors()
-        return [
-            ActorResponse(
-                actor_id=a['actor_id'],
-                first_name=a['first_name'],
-                last_name=a['last_name'],
-                full_name=f"{a['first_name']} {a['last_name']}"
-            )
+        actors = await run_in_threadpool(mysql_db.get_all_actors)
+        return FastJSONResponse([
+            {
+                "actor_id": a['actor_id'],
+                "first_name": a['first_name'],
+                "last_name": a['last_name'],
+                "full_name": f"{a['first_name']} {a['last_name']}"
+            }
             for a in actors
-        ]
+        ])
     except Exception as e:
         logger.error(f"Ошибка при получении актёров: {e}")
         return []
@@ -310,7 +831,7 @@ async def get_actors():
 
 # ===== ПОЛУЧЕНИЕ ДИАПАЗОНА ЛЕТ =====
 @router.get("/year-range", response_model=YearRangeResponse)
-async def get_year_range():
+async def get_year_range(mysql_db: MySQLConnector = Depends(get_mysql_db)):
     """
     Получение диапазона лет для фильмов в БД
 
@@ -318,11 +839,11 @@ async def get_year_range():
     - YearRangeResponse: Минимальный и максимальный год
     """
     try:
-        year_range = mysql_db.get_year_range()
-        return YearRangeResponse(
-            min_year=year_range['min_year'],
-            max_year=year_range['max_year']
-        )
+        year_range = await run_in_threadpool(mysql_db.get_year_range)
+        return FastJSONResponse({
+            "min_year": year_range['min_year'],
+            "max_year": year_range['max_year']
+        })
     except Exception as e:
         logger.error(f"Ошибка при получении диапазона лет: {e}")
         return {"min_year": 1990, "max_year": 2025}
@@ -330,7 +851,10 @@ async def get_year_range():
 
 # ===== ПОЛУЧЕНИЕ ДИАПАЗОНА ЛЕТ ДЛЯ ЖАНРА =====
 @router.get("/year-range-for-genre", response_model=YearRangeResponse)
-async def get_year_range_for_genre(genre: str = Query(..., description="Название жанра")):
+async def get_year_range_for_genre(
+    genre: str = Query(..., description="Название жанра"),
+    mysql_db: MySQLConnector = Depends(get_mysql_db)
+):
     """
     Получение диапазона лет для конкретного жанра
 
@@ -341,30 +865,63 @@ async def get_year_range_for_genre(genre: str = Query(..., description="Назв
     - YearRangeResponse: Минимальный и максимальный год для жанра
     """
     try:
-        year_range = mysql_db.get_year_range_for_genre(genre)
-        return YearRangeResponse(
-            min_year=year_range['min_year'],
-            max_year=year_range['max_year']
-        )
+        year_range = await run_in_threadpool(mysql_db.get_year_range_for_genre, genre)
+        return FastJSONResponse({
+            "min_year": year_range['min_year'],
+            "max_year": year_range['max_year']
+        })
     except Exception as e:
         logger.error(f"Ошибка при получении диапазона лет для жанра: {e}")
         return {"min_year": 1990, "max_year": 2025}
 
 
+async def seed_live_stats(live_stats: LiveStats, log_stats: LogStats) -> None:
+    """
+    Однократное начальное заполнение статистики в памяти из хранилища логов
+
+    Args:
+        live_stats (LiveStats): Статистика в памяти процесса
+        log_stats (LogStats): Статистика из хранилища логов
+    """
+    if live_stats.seeded or not log_stats.is_ready:
+        return
+    popular, recent = await run_in_threadpool(
+        lambda: (log_stats.get_popular_searches(live_stats.top_k),
+                 log_stats.get_recent_searches(live_stats.top_k))
+    )
+    await run_in_threadpool(live_stats.seed, popular, recent)
+
+
 # ===== ПОЛУЧЕНИЕ СТАТИСТИКИ - ПОПУЛЯРНЫЕ ЗАПРОСЫ =====
 @router.get("/stats/popular")
-async def get_popular_stats():
+async def get_popular_stats(
+    exact: bool = Query(False, description="Точная агрегация по хранилищу логов (аудит)"),
+    log_stats: LogStats = Depends(get_log_stats),
+    live_stats: LiveStats = Depends(get_live_stats)
+):
     """
     Получение топ 5 популярных поисков
 
+    По умолчанию топ читается из потоковой структуры в памяти (Space-Saving),
+    общей для worker процессов через checkpoint; count - оценка сверху,
+    error - максимальная переоценка. exact=true выполняет точную агрегацию
+    по хранилищу логов для сверки.
+
     Returns:
-    - List[Dict]: Список популярных запросов с указанием типа и количества
+    - popular_searches: Список популярных запросов с указанием типа и количества
+    - source: sketch или exact
     """
     try:
-        popular = log_stats.get_popular_searches(limit=5)
-        return {
-            "popular_searches": popular
-        }
+        if exact:
+            popular = await run_in_threadpool(log_stats.get_popular_searches, 5)
+            return FastJSONResponse({"popular_searches": popular, "source": "exact"})
+
+        await seed_live_stats(live_stats, log_stats)
+        return FastJSONResponse({
+            "popular_searches": live_stats.popular.top(5),
+            "source": "sketch",
+            "sketch": live_stats.popular.stats()
+        })
     except Exception as e:
         logger.error(f"Ошибка при получении статистики: {e}")
         return {"popular_searches": []}
@@ -372,7 +929,7 @@ async def get_popular_stats():
 
 # ===== ПОЛУЧЕНИЕ СТАТИСТИКИ - ПОСЛЕДНИЕ ЗАПРОСЫ =====
 @router.get("/stats/recent")
-async def get_recent_stats():
+async def get_recent_stats(log_stats: LogStats = Depends(get_log_stats)):
     """
     Получение последних 5 уникальных поисков
 
@@ -380,10 +937,126 @@ async def get_recent_stats():
     - List[Dict]: Список последних поисков с временем выполнения
     """
     try:
-        recent = log_stats.get_recent_searches(limit=5)
-        return {
+        recent = await run_in_threadpool(log_stats.get_recent_searches, 5)
+        return FastJSONResponse({
             "recent_searches": recent
-        }
+        })
     except Exception as e:
         logger.error(f"Ошибка при получении последних поисков: {e}")
         return {"recent_searches": []}
+
+
+# ===== СТАТИСТИКА В РЕАЛЬНОМ ВРЕМЕНИ (SSE) =====
+def sse_message(event: str, data: Dict) -> bytes:
+    """Сообщение server-sent events"""
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+async def stats_events(live_stats: LiveStats) -> AsyncIterator[bytes]:
+    """
+    Поток SSE: полный снимок, затем изменения по мере поиска
+
+    Args:
+        live_stats (LiveStats): Статистика в реальном времени
+
+    Yields:
+        bytes: Сообщения SSE
+    """
+    queue = live_stats.subscribe()
+    try:
+        yield sse_message("snapshot", live_stats.snapshot())
+        while True:
+            try:
+                event, data = await asyncio.wait_for(
+                    queue.get(), timeout=STATS_STREAM_KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                # Комментарий не даёт прокси закрыть неактивное соединение
+                yield b": keep-alive\n\n"
+                continue
+            yield sse_message(event, data)
+    finally:
+        live_stats.unsubscribe(queue)
+
+
+@router.get("/stats/stream")
+async def stream_stats(
+    live_stats: LiveStats = Depends(get_live_stats),
+    log_stats: LogStats = Depends(get_log_stats)
+):
+    """
+    Популярные и последние поиски в реальном времени (text/event-stream)
+
+    События:
+    - snapshot: {"popular": [...], "recent": [...]} - при подключении и после переполнения очереди
+    - update: {"search": событие поиска, "popular": [...] (если топ изменился)}
+
+    Статистика считается в памяти процесса по событиям LogWriter;
+    хранилище логов запрашивается только один раз для начального заполнения.
+    """
+    await seed_live_stats(live_stats, log_stats)
+    return StreamingResponse(
+        stats_events(live_stats),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# ===== СТАТИСТИКА ОБЪЕДИНЕНИЯ ОДИНАКОВЫХ ЗАПРОСОВ =====
+@router.get("/stats/single-flight")
+async def get_single_flight_stats():
+    """
+    Счётчики объединения одинаковых одновременных запросов
+
+    Returns:
+    - search: Поисковые запросы
+    - poster: Запросы постеров к TMDB
+    (calls - всего, executions - выполнено, hits - получили чужой результат,
+    waiting - ожидают сейчас, errors - завершились ошибкой)
+    """
+    return FastJSONResponse({
+        "search": search_flight.stats(),
+        "poster": POSTER_FLIGHT.stats()
+    })
+
+
+# ===== СТАТИСТИКА ОГРАНИЧЕНИЯ НАГРУЗКИ =====
+@router.get("/stats/admission")
+async def get_admission_stats():
+    """
+    Текущие адаптивные лимиты одновременных запросов по маршрутам
+
+    Returns:
+    - {путь: {limit, in_flight, accepted, rejected}}
+    """
+    return FastJSONResponse(admission_stats())
+
+
+# ===== ИЗМЕНЕНИЯ ДАННЫХ MYSQL =====
+@router.get("/stats/changes")
+async def get_change_stats(change_watcher=Depends(get_change_watcher)):
+    """
+    Состояние отслеживания изменений данных
+
+    Returns:
+    - enabled: Включено ли отслеживание (CHANGE_WATCH_INTERVAL)
+    - marks: {таблица: max_update, row_count} последнего опроса
+    - last_event: Последнее найденное изменение (film_ids, actor_ids, genres, tables)
+    """
+    if change_watcher is None:
+        return FastJSONResponse({"enabled": False})
+    return FastJSONResponse({"enabled": True, **change_watcher.stats()})
+
+
+# ===== ДИАГНОСТИКА ЗАПРОСОВ К MYSQL =====
+@router.get("/debug/queries")
+async def get_query_stats(mysql_db: MySQLConnector = Depends(get_mysql_db)):
+    """
+    Статистика выполнения SQL запросов
+
+    Returns:
+    - statements: {имя запроса: count, errors, avg_ms, max_ms, histogram (le_<мс>: количество)}
+    - slow_queries: Последние медленные запросы с параметрами и планом (EXPLAIN)
+    - plan_check: Результат проверки планов при запуске (QUERY_PLAN_CHECK)
+    """
+    return FastJSONResponse(mysql_db.query_stats.snapshot())
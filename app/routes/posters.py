@@ -0,0 +1,132 @@
+"""
+API маршруты постеров: локальный кэш изображений TMDB с уменьшенными размерами
+"""
+
+from fastapi import APIRouter, Query, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, RedirectResponse, Response
+from typing import Dict, List
+import logging
+import os
+import re
+
+from app.database.mysql_connector import MySQLConnector
+from app.dependencies import get_mysql_db, get_poster_store
+from app.settings import POSTER_PROXY, POSTER_SIZE
+from app.utils.formatter import get_poster_for_film
+from app.utils.poster_store import PosterStore, SIZE_PATTERN
+from app.utils.single_flight import SingleFlight
+from app.utils.static_files import IMMUTABLE_CACHE_CONTROL
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Инициализация маршрутизатора
+router = APIRouter(prefix="/api/posters", tags=["posters"])
+
+# Перенаправление film_id -> объект кэшируется браузером на сутки
+REDIRECT_CACHE_CONTROL = "public, max-age=86400"
+
+# Имя объекта: SHA-256 содержимого и расширение
+OBJECT_NAME_RE = re.compile(r"^([0-9a-f]{64})\.[a-z0-9]+$")
+
+# Одновременные запросы одного постера загружают изображение один раз
+poster_file_flight = SingleFlight()
+
+
+def proxy_posters(films: List[Dict]) -> List[Dict]:
+    """
+    Замена внешних URL постеров на /api/posters/{film_id} (если включён POSTER_PROXY)
+
+    Эмодзи-постеры не меняются.
+
+    Args:
+        films (List[Dict]): Отформатированные фильмы
+
+    Returns:
+        List[Dict]: Те же фильмы
+    """
+    if not POSTER_PROXY:
+        return films
+    for film in films:
+        poster = film.get("poster")
+        if poster and poster.startswith("http"):
+            film["poster"] = f"{router.prefix}/{film['film_id']}?size={POSTER_SIZE}"
+    return films
+
+
+def resolve_poster(mysql_db: MySQLConnector, poster_store: PosterStore, film_id: int, size: str):
+    """
+    Поиск постера фильма и получение файла из кэша (выполняется в пуле потоков)
+
+    Returns:
+        Optional[PosterFile]: Файл постера или None, если у фильма нет изображения
+    """
+    film = mysql_db.get_film_details(film_id)
+    if film is None:
+        raise HTTPException(status_code=404, detail="Фильм не найден")
+    url = get_poster_for_film(film['title'], film.get('release_year'))
+    if not url.startswith("http"):
+        return None
+    return poster_file_flight.do((url, size), poster_store.get, url, size)
+
+
+@router.get("/objects/{name}")
+async def get_poster_object(name: str, request: Request,
+                            poster_store: PosterStore = Depends(get_poster_store)):
+    """
+    Изображение по хешу содержимого: не меняется, кэшируется навсегда
+
+    Returns:
+    - Файл изображения (ETag - SHA-256 содержимого) или 304 по If-None-Match
+    """
+    match = OBJECT_NAME_RE.match(name)
+    if not match:
+        raise HTTPException(status_code=404, detail="Изображение не найдено")
+    path = os.path.join(poster_store.directory, "objects", name[:2], name)
+    etag = f'"{match.group(1)}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Изображение не найдено")
+    return FileResponse(path, headers=headers)
+
+
+@router.get("/{film_id}")
+async def get_poster(
+    film_id: int,
+    size: str = Query(POSTER_SIZE, pattern=SIZE_PATTERN, description="Размер: w92, w154, w185, w342, w500"),
+    mysql_db: MySQLConnector = Depends(get_mysql_db),
+    poster_store: PosterStore = Depends(get_poster_store)
+):
+    """
+    Постер фильма нужного размера
+
+    Изображение загружается из TMDB один раз и сохраняется в локальный кэш.
+    Ответ - перенаправление на /api/posters/objects/{sha256}, который браузер
+    кэширует навсегда.
+
+    Path Parameters:
+    - film_id: ID фильма
+
+    Query Parameters:
+    - size: Размер постера (по умолчанию POSTER_SIZE)
+
+    Returns:
+    - 307 на файл изображения; 404, если у фильма нет постера
+    """
+    try:
+        poster = await run_in_threadpool(resolve_poster, mysql_db, poster_store, film_id, size)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.warning(f"Ошибка при загрузке постера фильма {film_id}: {e}")
+        raise HTTPException(status_code=502, detail="Постер недоступен")
+    if poster is None:
+        raise HTTPException(status_code=404, detail="У фильма нет постера")
+    return RedirectResponse(
+        f"{router.prefix}/objects/{os.path.basename(poster.path)}",
+        status_code=307,
+        headers={"Cache-Control": REDIRECT_CACHE_CONTROL}
+    )
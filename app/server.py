@@ -0,0 +1,103 @@
+"""
+Production запуск сервера Uvicorn
+
+В отличие от `python main.py` (один процесс, reload=True для разработки),
+запускает несколько worker процессов, выбирает uvloop/httptools при их наличии
+и корректно завершает работу: дожидается обработки текущих запросов.
+
+Запуск:
+    python -m app.server --host 0.0.0.0 --port 8000 --workers 4
+"""
+
+from typing import List, Optional
+import argparse
+import importlib.util
+import logging
+import os
+
+import uvicorn
+
+from app.settings import (
+    SERVER_HOST, SERVER_PORT, SERVER_WORKERS, SERVER_KEEP_ALIVE,
+    SERVER_BACKLOG, SERVER_LIMIT_CONCURRENCY, SERVER_GRACEFUL_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+
+def cpu_count() -> int:
+    """
+    Количество доступных процессу CPU
+
+    Returns:
+        int: Количество CPU (с учётом ограничения affinity, если поддерживается)
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def select_loop() -> str:
+    """Выбор реализации event loop: uvloop, если установлен"""
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def select_http() -> str:
+    """Выбор HTTP парсера: httptools, если установлен"""
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Разбор аргументов командной строки
+
+    Args:
+        argv (Optional[List[str]]): Аргументы (по умолчанию sys.argv)
+
+    Returns:
+        argparse.Namespace: Параметры запуска
+    """
+    parser = argparse.ArgumentParser(description="Production запуск Film Search API")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS or cpu_count(),
+                        help="Количество worker процессов (по умолчанию - число CPU)")
+    parser.add_argument("--keep-alive", type=int, default=SERVER_KEEP_ALIVE,
+                        help="Таймаут keep-alive соединений, сек")
+    parser.add_argument("--backlog", type=int, default=SERVER_BACKLOG,
+                        help="Размер очереди ожидающих соединений")
+    parser.add_argument("--limit-concurrency", type=int, default=SERVER_LIMIT_CONCURRENCY,
+                        help="Максимум одновременных соединений на worker (сверх - 503)")
+    parser.add_argument("--graceful-timeout", type=int, default=SERVER_GRACEFUL_TIMEOUT,
+                        help="Время на завершение текущих запросов при остановке, сек")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--no-access-log", action="store_true",
+                        help="Отключить access log (снижает нагрузку на CPU)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Запуск сервера с параметрами из командной строки"""
+    args = parse_args(argv)
+    loop, http = select_loop(), select_http()
+    logger.info(f"Запуск: workers={args.workers}, loop={loop}, http={http}")
+
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        timeout_keep_alive=args.keep_alive,
+        backlog=args.backlog,
+        limit_concurrency=args.limit_concurrency,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        log_level=args.log_level,
+        proxy_headers=True,
+        access_log=not args.no_access_log,
+    )
+
+
+if __name__ == "__main__":
+    main()
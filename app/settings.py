@@ -0,0 +1,196 @@
+"""
+Настраиваемые параметры приложения
+Значения по умолчанию можно переопределить одноимёнными переменными в local_settings.py
+"""
+
+import os
+import sys
+
+# Добавляем путь к корневой директории
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+try:
+    import local_settings as _local_settings
+except ImportError:
+    _local_settings = None
+
+
+def _setting(name: str, default):
+    """
+    Получение значения параметра из local_settings.py
+
+    Args:
+        name (str): Имя параметра
+        default: Значение по умолчанию
+
+    Returns:
+        Значение из local_settings.py или значение по умолчанию
+    """
+    return getattr(_local_settings, name, default)
+
+
+# ===== ПОСТРАНИЧНАЯ НАВИГАЦИЯ =====
+PAGE_SIZE_DEFAULT = _setting('PAGE_SIZE_DEFAULT', 10)
+PAGE_SIZE_MAX = _setting('PAGE_SIZE_MAX', 100)
+
+# ===== ПАКЕТНЫЙ ПОИСК (/api/search/batch) =====
+# Максимальное количество поисков в одном запросе
+BATCH_SEARCH_MAX_ITEMS = _setting('BATCH_SEARCH_MAX_ITEMS', 20)
+# Сколько поисков пакета выполняется одновременно (подключения primary и реплик)
+BATCH_SEARCH_CONCURRENCY = _setting('BATCH_SEARCH_CONCURRENCY', 4)
+
+# ===== ВЫГРУЗКА РЕЗУЛЬТАТОВ =====
+# Количество строк, читаемых из курсора и обогащаемых за один раз
+EXPORT_BATCH_SIZE = _setting('EXPORT_BATCH_SIZE', 500)
+# Уровень сжатия gzip для выгрузки (1-9)
+EXPORT_GZIP_LEVEL = _setting('EXPORT_GZIP_LEVEL', 6)
+
+# ===== СЕРИАЛИЗАЦИЯ =====
+# Сериализатор JSON ответов: "orjson" (если установлен) или "json"
+JSON_BACKEND = _setting('JSON_BACKEND', 'orjson')
+
+# ===== СЖАТИЕ ОТВЕТОВ =====
+# JSON ответы меньше порога (в байтах) не сжимаются
+COMPRESSION_MIN_SIZE = _setting('COMPRESSION_MIN_SIZE', 1024)
+COMPRESSION_GZIP_LEVEL = _setting('COMPRESSION_GZIP_LEVEL', 6)
+COMPRESSION_BROTLI_QUALITY = _setting('COMPRESSION_BROTLI_QUALITY', 4)
+
+# JSON ответы GET запросов с этими префиксами получают ETag и 304 по If-None-Match
+ETAG_PATH_PREFIXES = _setting('ETAG_PATH_PREFIXES', ("/api/",))
+
+# Каталог собранных статических файлов (python -m tools.build_static)
+STATIC_DIST_DIR = _setting('STATIC_DIST_DIR', 'static/dist')
+
+# ===== PRODUCTION СЕРВЕР (python -m app.server) =====
+SERVER_HOST = _setting('SERVER_HOST', '0.0.0.0')
+SERVER_PORT = _setting('SERVER_PORT', 8000)
+# None - по числу доступных CPU
+SERVER_WORKERS = _setting('SERVER_WORKERS', None)
+SERVER_KEEP_ALIVE = _setting('SERVER_KEEP_ALIVE', 5)
+SERVER_BACKLOG = _setting('SERVER_BACKLOG', 2048)
+SERVER_LIMIT_CONCURRENCY = _setting('SERVER_LIMIT_CONCURRENCY', None)
+SERVER_GRACEFUL_TIMEOUT = _setting('SERVER_GRACEFUL_TIMEOUT', 30)
+
+# ===== ПОДКЛЮЧЕНИЯ К БД =====
+# Пауза между фоновыми попытками подключения, сек
+DB_RETRY_INTERVAL = _setting('DB_RETRY_INTERVAL', 5.0)
+# Сколько ждать MySQL при запуске перед прогревом, сек
+STARTUP_CONNECT_TIMEOUT = _setting('STARTUP_CONNECT_TIMEOUT', 3.0)
+
+# ===== РЕПЛИКИ MYSQL =====
+# Конфигурации реплик для чтения (формат как у dbconfig); пустой список - только primary
+MYSQL_REPLICAS = _setting('MYSQL_REPLICAS', [])
+# Балансировка: "round_robin" или "least_outstanding"
+MYSQL_REPLICA_POLICY = _setting('MYSQL_REPLICA_POLICY', 'round_robin')
+# Ошибок подключения подряд до исключения реплики и длительность исключения, сек
+MYSQL_REPLICA_FAILURE_THRESHOLD = _setting('MYSQL_REPLICA_FAILURE_THRESHOLD', 3)
+MYSQL_REPLICA_EVICTION_SECONDS = _setting('MYSQL_REPLICA_EVICTION_SECONDS', 30.0)
+
+# ===== ДИАГНОСТИКА ЗАПРОСОВ MYSQL (/api/debug/queries) =====
+# Порог медленного запроса, мс: такие запросы пишутся в журнал с параметрами; None - выключено
+SLOW_QUERY_MS = _setting('SLOW_QUERY_MS', 200)
+# Количество записей журнала медленных запросов в памяти
+SLOW_QUERY_LOG_SIZE = _setting('SLOW_QUERY_LOG_SIZE', 100)
+# Добавлять план (EXPLAIN) медленного запроса; для одного запроса не чаще раза за интервал, сек
+SLOW_QUERY_EXPLAIN = _setting('SLOW_QUERY_EXPLAIN', True)
+SLOW_QUERY_EXPLAIN_INTERVAL = _setting('SLOW_QUERY_EXPLAIN_INTERVAL', 60)
+# Проверить планы всех запросов при запуске и предупредить о полных просмотрах таблиц
+QUERY_PLAN_CHECK = _setting('QUERY_PLAN_CHECK', False)
+
+# ===== ОТМЕНА И ЛИМИТ ВРЕМЕНИ ЗАПРОСОВ MYSQL =====
+# Пути, работа которых отменяется при отключении клиента (KILL QUERY выполняющегося запроса)
+CANCEL_ON_DISCONNECT_PREFIXES = _setting(
+    'CANCEL_ON_DISCONNECT_PREFIXES', ("/api/search/", "/api/films/", "/api/actors/")
+)
+# Лимит времени SELECT запросов (MAX_EXECUTION_TIME), мс, по префиксу пути запроса:
+# действует самый длинный подходящий префикс, 0 - без лимита; фоновые задачи не ограничены
+MYSQL_MAX_EXECUTION_TIME_MS = _setting('MYSQL_MAX_EXECUTION_TIME_MS', {
+    "/api/search/": 3000,
+    "/api/films/": 2000,
+    "/api/actors/": 2000,
+    "/api/": 5000,
+    "/api/export/": 0,
+})
+
+# ===== ОТСЛЕЖИВАНИЕ ИЗМЕНЕНИЙ ДАННЫХ MYSQL =====
+# Интервал опроса MAX(last_update)/COUNT(*) таблиц Sakila, сек; None - выключено
+CHANGE_WATCH_INTERVAL = _setting('CHANGE_WATCH_INTERVAL', 10.0)
+
+# ===== ПОИСК С ОПЕЧАТКАМИ (mode=fuzzy) =====
+# Максимальное число опечаток в слове (короткие слова: 0-1)
+FUZZY_SEARCH_MAX_DISTANCE = _setting('FUZZY_SEARCH_MAX_DISTANCE', 2)
+# Максимальное количество найденных фильмов или актёров
+FUZZY_SEARCH_LIMIT = _setting('FUZZY_SEARCH_LIMIT', 1000)
+
+# ===== ПОХОЖИЕ ФИЛЬМЫ (/api/films/{film_id}/similar) =====
+# Файл векторов и списков соседей (python -m tools.similar_films build); None - только в памяти
+SIMILAR_FILMS_PATH = _setting('SIMILAR_FILMS_PATH', 'data/similar_films.npz')
+# Количество заранее вычисленных соседей каждого фильма
+SIMILAR_FILMS_TOP_K = _setting('SIMILAR_FILMS_TOP_K', 20)
+
+# ===== ГРАФ ПАРТНЁРОВ (/api/search/actors, /api/actors/...) =====
+# Максимальное число фильмов в цепочке партнёров (/api/actors/path)
+COSTAR_PATH_MAX_DEPTH = _setting('COSTAR_PATH_MAX_DEPTH', 6)
+# Максимальное количество актёров в поиске общих фильмов
+COSTAR_ACTORS_MAX = _setting('COSTAR_ACTORS_MAX', 10)
+
+# ===== ЛОКАЛЬНЫЙ КЭШ ПОСТЕРОВ (/api/posters) =====
+# Отдавать постеры TMDB через /api/posters/{film_id} вместо прямых ссылок на TMDB
+POSTER_PROXY = _setting('POSTER_PROXY', True)
+# Размер постера в результатах поиска: w92, w154, w185, w342 или w500
+POSTER_SIZE = _setting('POSTER_SIZE', 'w342')
+# Каталог изображений и индекса
+POSTER_CACHE_DIR = _setting('POSTER_CACHE_DIR', 'data/posters')
+# Каталог с готовыми изображениями вместо загрузки из TMDB (работа без сети); None - HTTP
+POSTER_LOCAL_DIR = _setting('POSTER_LOCAL_DIR', None)
+# Таймаут загрузки изображения, сек
+POSTER_FETCH_TIMEOUT = _setting('POSTER_FETCH_TIMEOUT', 10)
+
+# ===== ОГРАНИЧЕНИЕ НАГРУЗКИ (ADMISSION CONTROL) =====
+# Маршруты (префиксы путей), для которых действует адаптивный лимит одновременных запросов
+ADMISSION_PATH_PREFIXES = _setting('ADMISSION_PATH_PREFIXES', ("/api/search/",))
+ADMISSION_INITIAL_LIMIT = _setting('ADMISSION_INITIAL_LIMIT', 20)
+ADMISSION_MIN_LIMIT = _setting('ADMISSION_MIN_LIMIT', 2)
+ADMISSION_MAX_LIMIT = _setting('ADMISSION_MAX_LIMIT', 200)
+# Целевая задержка, мс: выше неё лимит уменьшается
+ADMISSION_LATENCY_TARGET_MS = _setting('ADMISSION_LATENCY_TARGET_MS', 300)
+# Доля занятых слотов, начиная с которой ответы облегчаются (без постеров, кэш количества)
+ADMISSION_DEGRADE_AT = _setting('ADMISSION_DEGRADE_AT', 0.8)
+# Значение заголовка Retry-After при отказе 503, сек
+ADMISSION_RETRY_AFTER = _setting('ADMISSION_RETRY_AFTER', 1)
+
+# ===== ХРАНЕНИЕ ЛОГОВ ПОИСКА =====
+# Хранилище логов: "mongodb", "sqlite" (локальный файл БД) или "file" (NDJSON + индекс в памяти)
+SEARCH_LOG_BACKEND = _setting('SEARCH_LOG_BACKEND', 'mongodb')
+# Путь к файлу локального хранилища (для "sqlite" и "file")
+SEARCH_LOG_PATH = _setting('SEARCH_LOG_PATH', 'data/search_log')
+# Срок хранения событий в MongoDB, дней (TTL индекс); None - бессрочно
+LOG_RETENTION_DAYS = _setting('LOG_RETENTION_DAYS', 90)
+# Каталог архива устаревших событий (python -m tools.search_logs archive); None - без архива
+LOG_ARCHIVE_DIR = _setting('LOG_ARCHIVE_DIR', None)
+# Запас TTL при включённом архиве, дней: архиватор успевает выгрузить события до удаления
+LOG_ARCHIVE_GRACE_DAYS = _setting('LOG_ARCHIVE_GRACE_DAYS', 1)
+# Размер пачки при переводе строковых timestamp в даты
+LOG_MIGRATION_BATCH_SIZE = _setting('LOG_MIGRATION_BATCH_SIZE', 1000)
+# Доля записываемых поисков (0..1]; записанные получают вес 1 / LOG_SAMPLE_RATE
+LOG_SAMPLE_RATE = _setting('LOG_SAMPLE_RATE', 1.0)
+# Окно, в котором одинаковые поиски складываются в вес одного документа, сек (0 - выключено)
+LOG_DEDUP_WINDOW_SECONDS = _setting('LOG_DEDUP_WINDOW_SECONDS', 10.0)
+LOG_DEDUP_MAX_KEYS = _setting('LOG_DEDUP_MAX_KEYS', 10000)
+# Очередь событий для фоновой записи в хранилище; при переполнении события отбрасываются
+LOG_QUEUE_MAX_SIZE = _setting('LOG_QUEUE_MAX_SIZE', 10000)
+
+# ===== СТАТИСТИКА В РЕАЛЬНОМ ВРЕМЕНИ (/api/stats/stream) =====
+LIVE_STATS_TOP_K = _setting('LIVE_STATS_TOP_K', 5)
+# Размер буфера последних поисков
+LIVE_STATS_RECENT_SIZE = _setting('LIVE_STATS_RECENT_SIZE', 20)
+# Интервал комментариев keep-alive в потоке SSE, сек
+STATS_STREAM_KEEPALIVE_SECONDS = _setting('STATS_STREAM_KEEPALIVE_SECONDS', 15)
+
+# ===== ПОПУЛЯРНЫЕ ПОИСКИ (потоковый top-k) =====
+# Максимальная переоценка количества как доля от всех поисков (счётчиков: 1 / значение)
+POPULAR_SKETCH_ERROR = _setting('POPULAR_SKETCH_ERROR', 0.001)
+# Общий checkpoint для worker процессов: "file", "mongodb" или None (только память процесса)
+POPULAR_SKETCH_STORE = _setting('POPULAR_SKETCH_STORE', 'file')
+POPULAR_SKETCH_PATH = _setting('POPULAR_SKETCH_PATH', 'data/popular_sketch.json')
+POPULAR_SKETCH_CHECKPOINT_SECONDS = _setting('POPULAR_SKETCH_CHECKPOINT_SECONDS', 30)
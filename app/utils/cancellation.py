@@ -0,0 +1,147 @@
+"""
+Отмена работы запроса, клиент которого отключился, и лимит времени запросов к БД
+
+Токен отмены и лимит времени хранятся в contextvars, поэтому доходят до
+пула потоков (run_in_threadpool копирует контекст): MySQLConnector
+проверяет токен перед каждым запросом, прерывает выполняющийся запрос
+(KILL QUERY) при отмене и добавляет к SELECT подсказку MAX_EXECUTION_TIME.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, List, Optional
+import asyncio
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCancelled(BaseException):
+    """
+    Работа запроса отменена: клиент отключился
+
+    Наследуется от BaseException, чтобы обработчики `except Exception`
+    маршрутов не превращали отмену в ответ 500 и запись в лог поиска;
+    перехватывается в QueryControlMiddleware.
+    """
+
+
+class CancelToken:
+    """Флаг отмены с обработчиками, вызываемыми один раз при отмене"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Отмена: установка флага и вызов зарегистрированных обработчиков"""
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as err:
+                logger.warning(f"Ошибка обработчика отмены: {err}")
+
+    @contextmanager
+    def on_cancel(self, callback: Callable[[], None]) -> Iterator[None]:
+        """
+        Вызов callback при отмене, пока выполняется блок with
+
+        Если токен уже отменён, callback вызывается сразу.
+
+        Args:
+            callback (Callable): Обработчик без аргументов
+        """
+        with self._lock:
+            registered = not self.cancelled
+            if registered:
+                self._callbacks.append(callback)
+        if not registered:
+            callback()
+        try:
+            yield
+        finally:
+            with self._lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled:
+            raise QueryCancelled()
+
+
+# Токен отмены текущего запроса (None - работа вне HTTP запроса)
+_current_token: ContextVar[Optional[CancelToken]] = ContextVar("cancel_token", default=None)
+# Лимит времени SELECT запросов текущего HTTP запроса, мс (None - без лимита)
+_time_limit_ms: ContextVar[Optional[int]] = ContextVar("query_time_limit_ms", default=None)
+
+
+def current_token() -> Optional[CancelToken]:
+    return _current_token.get()
+
+
+def raise_if_cancelled() -> None:
+    """Исключение QueryCancelled, если текущий запрос отменён"""
+    token = _current_token.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+def current_time_limit() -> Optional[int]:
+    return _time_limit_ms.get()
+
+
+@contextmanager
+def use_token(token: Optional[CancelToken]) -> Iterator[None]:
+    """Выполнение блока with под токеном отмены token"""
+    reset = _current_token.set(token)
+    try:
+        yield
+    finally:
+        _current_token.reset(reset)
+
+
+@contextmanager
+def time_limit(limit_ms: Optional[int]) -> Iterator[None]:
+    """Выполнение блока with с лимитом времени запросов к БД"""
+    reset = _time_limit_ms.set(limit_ms or None)
+    try:
+        yield
+    finally:
+        _time_limit_ms.reset(reset)
+
+
+async def wait_cancellable(task: asyncio.Future, token: CancelToken) -> Any:
+    """
+    Ожидание задачи до её завершения или отмены токена
+
+    Сама задача при отмене токена не отменяется.
+
+    Args:
+        task (asyncio.Future): Задача
+        token (CancelToken): Токен отмены ожидающего
+
+    Returns:
+        Any: Результат задачи
+
+    Raises:
+        QueryCancelled: Токен отменён раньше завершения задачи
+    """
+    loop = asyncio.get_running_loop()
+    cancelled = loop.create_future()
+
+    def wake() -> None:
+        # cancel() может быть вызван из любого потока
+        loop.call_soon_threadsafe(lambda: cancelled.done() or cancelled.set_result(None))
+
+    with token.on_cancel(wake):
+        await asyncio.wait({task, cancelled}, return_when=asyncio.FIRST_COMPLETED)
+    if task.done():
+        return task.result()
+    raise QueryCancelled()
@@ -0,0 +1,154 @@
+"""
+Двудольный граф актёр-фильм в форме CSR (compressed sparse row)
+
+Связи film_actor хранятся двумя парами массивов NumPy: для актёра a его фильмы -
+actor_films[actor_offsets[a]:actor_offsets[a + 1]] (по возрастанию film_id),
+для фильма f его актёры - film_actors[film_offsets[f]:film_offsets[f + 1]].
+ID актёров и фильмов Sakila плотные, поэтому используются как номера строк.
+Пересечение фильмов, партнёры по фильмам и кратчайшие цепочки партнёров
+вычисляются по срезам массивов без запросов к БД.
+"""
+
+from collections import deque
+from functools import reduce
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+def _csr(rows: np.ndarray, columns: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Смещения строк и колонки, упорядоченные по (строка, колонка)"""
+    order = np.lexsort((columns, rows))
+    offsets = np.zeros(size + 1, dtype=np.int32)
+    np.cumsum(np.bincount(rows, minlength=size), out=offsets[1:])
+    return offsets, columns[order].astype(np.int32)
+
+
+class CoStarGraph:
+    """Неизменяемый граф связей актёров и фильмов"""
+
+    def __init__(self, pairs: Iterable[Dict]):
+        """
+        Args:
+            pairs (Iterable[Dict]): Связи (film_id, actor_id) из film_actor
+        """
+        edges = np.array([(pair['actor_id'], pair['film_id']) for pair in pairs], dtype=np.int32)
+        edges = np.unique(edges.reshape(-1, 2), axis=0)
+        actors, films = edges[:, 0], edges[:, 1]
+        self.actor_count = int(actors.max()) + 1 if len(edges) else 0
+        self.film_count = int(films.max()) + 1 if len(edges) else 0
+        self.edge_count = len(edges)
+        self.actor_offsets, self.actor_films = _csr(actors, films, self.actor_count)
+        self.film_offsets, self.film_actors = _csr(films, actors, self.film_count)
+
+    def has_actor(self, actor_id: int) -> bool:
+        return len(self.films_of(actor_id)) > 0
+
+    def films_of(self, actor_id: int) -> np.ndarray:
+        """Фильмы актёра по возрастанию film_id"""
+        if not 0 <= actor_id < self.actor_count:
+            return self.actor_films[:0]
+        return self.actor_films[self.actor_offsets[actor_id]:self.actor_offsets[actor_id + 1]]
+
+    def actors_of(self, film_id: int) -> np.ndarray:
+        """Актёры фильма по возрастанию actor_id"""
+        if not 0 <= film_id < self.film_count:
+            return self.film_actors[:0]
+        return self.film_actors[self.film_offsets[film_id]:self.film_offsets[film_id + 1]]
+
+    def shared_films(self, actor_ids: List[int]) -> List[int]:
+        """
+        Фильмы, в которых снимались все указанные актёры
+
+        Args:
+            actor_ids (List[int]): ID актёров
+
+        Returns:
+            List[int]: ID фильмов по возрастанию
+        """
+        rows = sorted((self.films_of(actor_id) for actor_id in set(actor_ids)), key=len)
+        if not rows:
+            return []
+        # Пересечение начинается с самого короткого списка
+        shared = reduce(lambda left, right: np.intersect1d(left, right, assume_unique=True), rows)
+        return shared.tolist()
+
+    def costars(self, actor_id: int, limit: int = 20) -> List[Tuple[int, int]]:
+        """
+        Партнёры актёра по числу общих фильмов
+
+        Args:
+            actor_id (int): ID актёра
+            limit (int): Максимальное количество партнёров
+
+        Returns:
+            List[Tuple[int, int]]: (actor_id, общих фильмов) по убыванию, затем по actor_id
+        """
+        films = self.films_of(actor_id)
+        if not len(films):
+            return []
+        partners = np.concatenate([self.actors_of(film_id) for film_id in films])
+        counts = np.bincount(partners, minlength=self.actor_count)
+        counts[actor_id] = 0
+        found = np.flatnonzero(counts)
+        order = np.lexsort((found, -counts[found]))[:limit]
+        return [(int(found[index]), int(counts[found[index]])) for index in order]
+
+    def shortest_path(self, from_id: int, to_id: int,
+                      max_depth: int = 6) -> Optional[List[Tuple[int, Optional[int]]]]:
+        """
+        Кратчайшая цепочка партнёров между актёрами (поиск в ширину)
+
+        Args:
+            from_id (int): ID первого актёра
+            to_id (int): ID второго актёра
+            max_depth (int): Максимальное число фильмов в цепочке
+
+        Returns:
+            Optional[List[Tuple[int, Optional[int]]]]: [(actor_id, film_id, связывающий его
+            с предыдущим актёром)], у первого актёра film_id = None; None, если цепочки нет
+        """
+        if not self.has_actor(from_id) or not self.has_actor(to_id):
+            return None
+        if from_id == to_id:
+            return [(from_id, None)]
+        # Актёр -> (предыдущий актёр, общий фильм)
+        parents = {from_id: (None, None)}
+        seen_films = set()
+        queue = deque([(from_id, 0)])
+        while queue:
+            actor_id, depth = queue.popleft()
+            if depth == max_depth:
+                continue
+            for film_id in self.films_of(actor_id).tolist():
+                if film_id in seen_films:
+                    continue
+                seen_films.add(film_id)
+                for partner in self.actors_of(film_id).tolist():
+                    if partner in parents:
+                        continue
+                    parents[partner] = (actor_id, film_id)
+                    if partner == to_id:
+                        return self._unwind(parents, to_id)
+                    queue.append((partner, depth + 1))
+        return None
+
+    @staticmethod
+    def _unwind(parents: Dict[int, Tuple], actor_id: int) -> List[Tuple[int, Optional[int]]]:
+        path = []
+        while actor_id is not None:
+            previous, film_id = parents[actor_id]
+            path.append((actor_id, film_id))
+            actor_id = previous
+        return path[::-1]
+
+    def stats(self) -> Dict:
+        return {
+            "actors": int(np.count_nonzero(np.diff(self.actor_offsets))),
+            "films": int(np.count_nonzero(np.diff(self.film_offsets))),
+            "edges": self.edge_count,
+            "memory_bytes": int(
+                self.actor_offsets.nbytes + self.actor_films.nbytes
+                + self.film_offsets.nbytes + self.film_actors.nbytes
+            ),
+        }
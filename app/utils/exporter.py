@@ -0,0 +1,93 @@
+"""
+Сериализация результатов поиска для потоковой выгрузки (NDJSON/CSV)
+"""
+
+from typing import List, Dict, Iterable, Iterator
+import csv
+import io
+import zlib
+
+from app.utils.responses import dumps
+
+# Порядок колонок в выгрузке
+EXPORT_FIELDS = [
+    "film_id", "title", "description", "release_year",
+    "length", "rating", "actors", "categories", "poster"
+]
+
+# Разделитель элементов списков (актёры, жанры) в CSV
+CSV_LIST_SEPARATOR = "|"
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def serialize_ndjson(films: List[Dict]) -> bytes:
+    """
+    Сериализация пачки фильмов в NDJSON (одна JSON строка на фильм)
+
+    Используется тот же сериализатор, что и для FastJSONResponse (orjson, если доступен).
+
+    Args:
+        films (List[Dict]): Отформатированные фильмы
+
+    Returns:
+        bytes: Строки NDJSON в кодировке UTF-8
+    """
+    return b"".join(dumps(film) + b"\n" for film in films)
+
+
+def csv_header() -> bytes:
+    """
+    Заголовок CSV выгрузки
+
+    Returns:
+        bytes: Строка заголовка в кодировке UTF-8
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_FIELDS)
+    return buffer.getvalue().encode("utf-8")
+
+
+def serialize_csv(films: List[Dict]) -> bytes:
+    """
+    Сериализация пачки фильмов в строки CSV
+
+    Args:
+        films (List[Dict]): Отформатированные фильмы
+
+    Returns:
+        bytes: Строки CSV в кодировке UTF-8
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for film in films:
+        row = []
+        for field in EXPORT_FIELDS:
+            value = film.get(field)
+            if isinstance(value, list):
+                value = CSV_LIST_SEPARATOR.join(value)
+            row.append("" if value is None else value)
+        writer.writerow(row)
+    return buffer.getvalue().encode("utf-8")
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """
+    Потоковое сжатие последовательности блоков в формат gzip
+
+    Args:
+        chunks (Iterable[bytes]): Исходные блоки данных
+        level (int): Уровень сжатия (1-9)
+
+    Yields:
+        bytes: Сжатые блоки
+    """
+    # wbits=31 - формат gzip (заголовок и контрольная сумма)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        # Z_SYNC_FLUSH отдаёт данные клиенту сразу, не дожидаясь конца выгрузки
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
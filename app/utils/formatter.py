@@ -2,12 +2,18 @@
 Вспомогательные функции для форматирования и обработки данных
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, FrozenSet
 import requests
 import logging
 import os
 import sys
 
+from app.utils.cancellation import raise_if_cancelled
+from app.utils.single_flight import SingleFlight
+from app.utils.title_matcher import (
+    POPULAR_BY_YEAR, FALLBACK_MOVIES, DEFAULT_POSTERS, match_real_title, stable_choice
+)
+
 # Добавляем путь к корневой директории
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
@@ -24,8 +30,15 @@ logger = logging.getLogger(__name__)
 # Кэш для постеров (чтобы не делать повторные запросы)
 POSTER_CACHE = {}
 
+# Одновременные запросы постера одного фильма выполняют поиск в TMDB один раз
+POSTER_FLIGHT = SingleFlight()
+
+# Необязательные части ответа о фильме (проекция fields/include)
+FILM_FIELDS = frozenset({"actors", "categories", "poster", "description"})
 
-def format_film_response(film: Dict, actors: List[str], categories: List[str]) -> Dict:
+
+def format_film_response(film: Dict, actors: List[str], categories: List[str],
+                         with_poster: bool = True) -> Dict:
     """
     Форматирование ответа о фильме
 
@@ -33,12 +46,15 @@ def format_film_response(film: Dict, actors: List[str], categories: List[str]) -
         film (Dict): Информация о фильме из БД
         actors (List[str]): Список актёров
         categories (List[str]): Список категорий
+        with_poster (bool): Получать ли постер (запрос к TMDB API)
 
     Returns:
         Dict: Отформатированный ответ
     """
-    poster_url = get_poster_for_film(film.get('title', ''), film.get('release_year'))
-    
+    poster_url = None
+    if with_poster:
+        poster_url = get_poster_for_film(film.get('title', ''), film.get('release_year'))
+
     return {
         "film_id": film.get('film_id'),
         "title": film.get('title'),
@@ -52,6 +68,44 @@ def format_film_response(film: Dict, actors: List[str], categories: List[str]) -
     }
 
 
+def format_film_projection(film: Dict, fields: FrozenSet[str],
+                           actors: Optional[List[str]] = None,
+                           categories: Optional[List[str]] = None,
+                           with_poster: bool = True) -> Dict:
+    """
+    Форматирование ответа о фильме только с запрошенными частями
+
+    Args:
+        film (Dict): Информация о фильме из БД
+        fields (FrozenSet[str]): Запрошенные части из FILM_FIELDS
+        actors (Optional[List[str]]): Список актёров (если запрошены)
+        categories (Optional[List[str]]): Список категорий (если запрошены)
+        with_poster (bool): Получать ли постер, если он запрошен
+
+    Returns:
+        Dict: Отформатированный ответ без незапрошенных частей
+    """
+    response = {
+        "film_id": film.get('film_id'),
+        "title": film.get('title'),
+        "release_year": film.get('release_year'),
+        "length": film.get('length'),
+        "rating": film.get('rating'),
+    }
+    if "description" in fields:
+        response["description"] = film.get('description')
+    if "actors" in fields:
+        response["actors"] = actors or []
+    if "categories" in fields:
+        response["categories"] = categories or []
+    if "poster" in fields:
+        response["poster"] = (
+            get_poster_for_film(film.get('title', ''), film.get('release_year'))
+            if with_poster else None
+        )
+    return response
+
+
 def get_poster_for_film(title: str, year: Optional[int] = None) -> str:
     """
     Получение постера фильма через TMDB API с умным сопоставлением
@@ -77,24 +131,42 @@ def get_poster_for_film(title: str, year: Optional[int] = None) -> str:
     # Проверяем кэш
     if cache_key in POSTER_CACHE:
         return POSTER_CACHE[cache_key]
-    
+
+    # Клиент отключился - оставшиеся постеры не ищем (проверка до входа в общий поиск,
+    # чтобы отмена не передалась другим запросам того же постера)
+    raise_if_cancelled()
+    return POSTER_FLIGHT.do(cache_key, _find_poster, title, year, cache_key)
+
+
+def _find_poster(title: str, year: Optional[int], cache_key: str) -> str:
+    """
+    Поиск постера в TMDB несколькими способами с сохранением в кэш
+
+    Args:
+        title (str): Название фильма
+        year (Optional[int]): Год выпуска фильма
+        cache_key (str): Ключ кэша постеров
+
+    Returns:
+        str: URL постера или дефолтный эмодзи
+    """
     # Пытаемся найти постер несколькими способами
     poster_url = None
     
     try:
-        # Способ 1: Прямой поиск по названию
-        poster_url = search_movie_poster(title, year)
-        
-        # Способ 2: Поиск по сопоставлению с реальными фильмами
+        # Способ 1: Реальный фильм, сопоставленный с названием (таблица или пересечение слов)
+        real_title = match_real_title(title)
+        if real_title:
+            logger.info(f"Сопоставляем '{title}' с реальным фильмом '{real_title}'")
+            poster_url = search_movie_poster(real_title, None)
+
+        # Способ 2: Прямой поиск по названию
         if not poster_url:
-            real_title = map_to_real_movie(title, year)
-            if real_title != title:
-                logger.info(f"Сопоставляем '{title}' с реальным фильмом '{real_title}'")
-                poster_url = search_movie_poster(real_title, year)
-        
+            poster_url = search_movie_poster(title, year)
+
         # Способ 3: Генерация случайного популярного фильма по году
         if not poster_url and year:
-            random_title = get_random_popular_movie(year)
+            random_title = get_random_popular_movie(year, title)
             if random_title:
                 logger.info(f"Используем случайный популярный фильм '{random_title}' для '{title}'")
                 poster_url = search_movie_poster(random_title, year)
@@ -175,117 +247,22 @@ def map_to_real_movie(sakila_title: str, year: Optional[int] = None) -> str:
     Returns:
         str: Реальное название фильма или исходное название
     """
-    # Словарь сопоставлений вымышленных названий с реальными
-    sakila_to_real = {
-        # Экшн фильмы
-        'ACADEMY DINOSAUR': 'Jurassic Park',
-        'ACE GOLDFINGER': 'Goldfinger',
-        'ADAPTATION HOLES': 'The Shawshank Redemption',
-        'AFFAIR PREJUDICE': 'Pride and Prejudice',
-        'AFRICAN EGG': 'The Lion King',
-        'AGENT TRUMAN': 'The Truman Show',
-        'AIRPLANE SIERRA': 'Top Gun',
-        'AIRPORT POLLOCK': 'Airport',
-        'ALABAMA DEVIL': 'The Devil Wears Prada',
-        'ALADDIN CALENDAR': 'Aladdin',
-        'ALAMO VIDEOTAPE': 'The Alamo',
-        'ALASKA PHANTOM': 'The Phantom',
-        'ALI FOREVER': 'Ali',
-        'ALICE FANTASIA': 'Alice in Wonderland',
-        'ALIEN CENTER': 'Alien',
-        'ALLEY EVOLUTION': 'Evolution',
-        'ALONE TRIP': 'Into the Wild',
-        'ALTER VICTORY': 'Victory',
-        'AMADEUS HOLY': 'Amadeus',
-        'AMELIE HELLFIGHTERS': 'Amélie',
-        
-        # Комедии
-        'AMERICAN CIRCUS': 'The Greatest Showman',
-        'AMISTAD MIDSUMMER': 'Amistad',
-        'ANALYZE HOOSIERS': 'Hoosiers',
-        'ANGELS LIFE': 'Life is Beautiful',
-        'ANNIE IDENTITY': 'The Bourne Identity',
-        'ANONYMOUS HUMAN': 'The Matrix',
-        'ANTHEM LUKE': 'Star Wars',
-        'ANTITRUST TOMATOES': 'Attack of the Killer Tomatoes',
-        'ANYTHING SAVANNAH': 'Forrest Gump',
-        'APACHE DIVINE': 'Dances with Wolves',
-        
-        # Драмы
-        'APOCALYPSE FLAMINGOS': 'Apocalypse Now',
-        'ARABIA DOGMA': 'Lawrence of Arabia',
-        'ARACHNOPHOBIA ROLLERCOASTER': 'Arachnophobia',
-        'ARGONAUTS TOWN': 'Jason and the Argonauts',
-        'ARIZONA BANG': 'Raising Arizona',
-        'ARK RIDGEMONT': 'Fast Times at Ridgemont High',
-        'ARMAGEDDON LOST': 'Armageddon',
-        'ARMY FLINTSTONES': 'The Flintstones',
-        'ARTIST COLDBLOODED': 'The Artist',
-        'ATLANTIS CAUSE': 'Atlantis: The Lost Empire',
-        
-        # Ужасы
-        'ATTACK NOON': 'High Noon',
-        'ATTRACTION NEWTON': 'The Theory of Everything',
-        'AUTUMN CROW': 'The Crow',
-        'BABY HALL': 'Baby Driver',
-        'BACHELOR JAWBREAKER': 'Jawbreaker',
-        'BADMAN DAWN': 'Batman Begins',
-        'BAG BEETHOVEN': 'Beethoven',
-        'BALLOON HOMEWARD': 'Homeward Bound',
-        'BANG KWAI': 'The Bridge on the River Kwai',
-        'BANGER PINOCCHIO': 'Pinocchio',
-        
-        # Научная фантастика
-        'BARBARELLA STREETCAR': 'Barbarella',
-        'BAREFOOT MANCHURIAN': 'The Manchurian Candidate',
-        'BASIC EASY': 'Easy Rider',
-        'BEACH HEARTBREAKERS': 'Heartbreakers',
-        'BEAR GRACELAND': 'Graceland',
-        'BEAST HUNCHBACK': 'The Hunchback of Notre Dame',
-        'BEAUTY GREASE': 'Grease',
-        'BED HIGHBALL': 'High Society',
-        'BEDAZZLED MARRIED': 'Bedazzled',
-        'BEETHOVEN EXORCIST': 'The Exorcist'
-    }
-    
-    # Проверяем прямое сопоставление
-    if sakila_title.upper() in sakila_to_real:
-        return sakila_to_real[sakila_title.upper()]
-    
-    # Если прямого сопоставления нет, возвращаем исходное название
-    return sakila_title
+    return match_real_title(sakila_title) or sakila_title
 
 
-def get_random_popular_movie(year: Optional[int] = None) -> Optional[str]:
+def get_random_popular_movie(year: Optional[int] = None, title: Optional[str] = None) -> Optional[str]:
     """
-    Получение случайного популярного фильма по году
+    Получение популярного фильма по году
 
     Args:
         year (Optional[int]): Год выпуска
+        title (Optional[str]): Исходное название (для стабильного выбора среди фильмов года)
 
     Returns:
         Optional[str]: Название популярного фильма
     """
-    # Популярные фильмы по годам
-    popular_by_year = {
-        2006: ['The Departed', 'Casino Royale', 'Pirates of the Caribbean: Dead Man\'s Chest', 'The Devil Wears Prada', 'Ice Age: The Meltdown'],
-        2005: ['Star Wars: Episode III', 'Harry Potter and the Goblet of Fire', 'The Chronicles of Narnia', 'War of the Worlds', 'King Kong'],
-        2004: ['Shrek 2', 'Spider-Man 2', 'The Incredibles', 'Harry Potter and the Prisoner of Azkaban', 'I, Robot'],
-        2003: ['Finding Nemo', 'The Lord of the Rings: The Return of the King', 'Pirates of the Caribbean', 'The Matrix Reloaded', 'X2: X-Men United'],
-        2002: ['Spider-Man', 'The Lord of the Rings: The Two Towers', 'Star Wars: Episode II', 'Harry Potter and the Chamber of Secrets', 'Ice Age'],
-        2001: ['Harry Potter and the Philosopher\'s Stone', 'The Lord of the Rings: The Fellowship of the Ring', 'Shrek', 'Monsters, Inc.', 'The Fast and the Furious'],
-        2000: ['Gladiator', 'Cast Away', 'What Women Want', 'Dinosaur', 'How the Grinch Stole Christmas'],
-        1999: ['Star Wars: Episode I', 'The Sixth Sense', 'Toy Story 2', 'Austin Powers: The Spy Who Shagged Me', 'The Matrix'],
-        1998: ['Titanic', 'Armageddon', 'Saving Private Ryan', 'There\'s Something About Mary', 'The Truman Show'],
-        1997: ['The Lost World: Jurassic Park', 'Men in Black', 'Tomorrow Never Dies', 'Air Force One', 'As Good as It Gets']
-    }
-    
-    if year and year in popular_by_year:
-        movies = popular_by_year[year]
-        # Используем хеш для стабильного выбора
-        index = abs(hash(str(year))) % len(movies)
-        return movies[index]
-    
+    if year and year in POPULAR_BY_YEAR:
+        return stable_choice(POPULAR_BY_YEAR[year], title or str(year))
     return None
 
 
@@ -299,21 +276,7 @@ def get_fallback_movie(title: str) -> str:
     Returns:
         str: Название популярного фильма
     """
-    # Список популярных фильмов для резерва
-    fallback_movies = [
-        'The Shawshank Redemption', 'The Godfather', 'The Dark Knight', 'Pulp Fiction',
-        'The Lord of the Rings: The Return of the King', 'Forrest Gump', 'Star Wars',
-        'The Matrix', 'Goodfellas', 'One Flew Over the Cuckoo\'s Nest', 'Inception',
-        'The Empire Strikes Back', 'The Silence of the Lambs', 'Saving Private Ryan',
-        'Schindler\'s List', 'Casablanca', 'The Departed', 'The Prestige',
-        'Gladiator', 'Titanic', 'The Lion King', 'Back to the Future',
-        'Terminator 2: Judgment Day', 'Alien', 'Raiders of the Lost Ark',
-        'Jurassic Park', 'The Avengers', 'Iron Man', 'Spider-Man', 'Batman Begins'
-    ]
-    
-    # Используем хеш названия для стабильного выбора
-    index = abs(hash(title)) % len(fallback_movies)
-    return fallback_movies[index]
+    return stable_choice(FALLBACK_MOVIES, title)
 
 
 def get_default_poster_emoji(title: str) -> str:
@@ -326,14 +289,8 @@ def get_default_poster_emoji(title: str) -> str:
     Returns:
         str: Эмодзи постер
     """
-    # Дефолтные постеры
-    default_posters = ['🎬', '🎥', '📽️', '🎞️', '🍿', '🎪', '🎭', '🎨', '🌟', '✨']
-    
-    # Используем хеш названия для стабильного выбора
     if title:
-        poster_index = abs(hash(title)) % len(default_posters)
-        return default_posters[poster_index]
-    
+        return stable_choice(DEFAULT_POSTERS, title)
     return '🎬'
 
 
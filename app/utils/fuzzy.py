@@ -0,0 +1,189 @@
+"""
+Поиск с опечатками по словарю удалений (алгоритм SymSpell)
+
+Для каждого слова словаря заранее строятся все варианты с удалением
+до max_distance символов. Слова запроса, отличающиеся от слова словаря
+не больше чем на max_distance правок, имеют с ним общий вариант удаления,
+поэтому кандидаты находятся поиском в словаре без перебора всех слов;
+точное расстояние (Damerau-Levenshtein, OSA) считается только для кандидатов.
+"""
+
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+import re
+
+# Разбиение текста на слова (буквы и цифры любого алфавита)
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Слова текста в нижнем регистре"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def allowed_distance(token: str, max_distance: int) -> int:
+    """
+    Допустимое число опечаток для слова запроса
+
+    В коротких словах опечатки не допускаются или допускается одна,
+    иначе совпадает почти любое короткое слово словаря.
+    """
+    if len(token) <= 2:
+        return 0
+    if len(token) <= 5:
+        return min(1, max_distance)
+    return max_distance
+
+
+def _deletes(term: str, max_distance: int) -> Set[str]:
+    """Все варианты слова с удалением от 0 до max_distance символов"""
+    variants = {term}
+    frontier = {term}
+    for _ in range(max_distance):
+        frontier = {
+            variant[:index] + variant[index + 1:]
+            for variant in frontier if len(variant) > 1
+            for index in range(len(variant))
+        }
+        variants |= frontier
+    return variants
+
+
+def osa_distance(source: str, target: str, max_distance: int) -> int:
+    """
+    Расстояние Дамерау-Левенштейна (вставка, удаление, замена, перестановка соседних)
+
+    Args:
+        source (str): Первое слово
+        target (str): Второе слово
+        max_distance (int): Граница: большие расстояния не уточняются
+
+    Returns:
+        int: Расстояние или max_distance + 1, если оно больше границы
+    """
+    if abs(len(source) - len(target)) > max_distance:
+        return max_distance + 1
+    previous_previous = None
+    previous = list(range(len(target) + 1))
+    for i in range(1, len(source) + 1):
+        current = [i] + [0] * len(target)
+        row_minimum = i
+        for j in range(1, len(target) + 1):
+            cost = source[i - 1] != target[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and source[i - 1] == target[j - 2] and source[i - 2] == target[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+            row_minimum = min(row_minimum, current[j])
+        if row_minimum > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+class SymSpellIndex:
+    """Словарь слов с привязанными элементами и поиском слов с опечатками"""
+
+    def __init__(self, max_distance: int = 2):
+        """
+        Args:
+            max_distance (int): Максимальное число правок при поиске
+        """
+        self.max_distance = max_distance
+        # Вариант удаления -> слова словаря, из которых он получается
+        self._deletes: Dict[str, Set[str]] = {}
+        # Слово -> элементы (например, film_id), в которых оно встречается
+        self._postings: Dict[str, Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return sum(1 for items in self._postings.values() if items)
+
+    def add(self, term: str, item: Hashable) -> None:
+        """Добавление слова, встречающегося в элементе item"""
+        items = self._postings.get(term)
+        if items is None:
+            items = self._postings[term] = set()
+            for variant in _deletes(term, self.max_distance):
+                self._deletes.setdefault(variant, set()).add(term)
+        items.add(item)
+
+    def remove(self, term: str, item: Hashable) -> None:
+        """
+        Удаление связи слова с элементом
+
+        Варианты удаления слова остаются в словаре: слово без элементов
+        не попадает в результаты и снова используется при добавлении.
+        """
+        items = self._postings.get(term)
+        if items is not None:
+            items.discard(item)
+
+    def lookup(self, term: str, max_distance: int = None) -> List[Tuple[str, int]]:
+        """
+        Слова словаря на расстоянии не больше max_distance
+
+        Args:
+            term (str): Слово запроса
+            max_distance (int): Число правок (не больше заданного при создании)
+
+        Returns:
+            List[Tuple[str, int]]: (слово, расстояние), по возрастанию расстояния
+        """
+        if max_distance is None or max_distance > self.max_distance:
+            max_distance = self.max_distance
+        candidates = set()
+        for variant in _deletes(term, max_distance):
+            candidates |= self._deletes.get(variant, set())
+        matches = []
+        for candidate in candidates:
+            if not self._postings[candidate]:
+                continue
+            distance = osa_distance(term, candidate, max_distance)
+            if distance <= max_distance:
+                matches.append((candidate, distance))
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches
+
+    def items(self, term: str) -> Set[Hashable]:
+        """Элементы, в которых встречается слово"""
+        return self._postings.get(term, set())
+
+
+def rank_items(index: SymSpellIndex, query: str,
+               names: Dict[Hashable, str]) -> List[Tuple[Hashable, int]]:
+    """
+    Элементы, в которых найдено каждое слово запроса (с учётом опечаток)
+
+    Args:
+        index (SymSpellIndex): Словарь слов элементов
+        query (str): Текст запроса
+        names (Dict): {элемент: название} для упорядочивания при равном расстоянии
+
+    Returns:
+        List[Tuple[Hashable, int]]: (элемент, сумма опечаток) по возрастанию суммы
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    scores: Dict[Hashable, int] = {}
+    for position, token in enumerate(tokens):
+        best: Dict[Hashable, int] = {}
+        for term, distance in index.lookup(token, allowed_distance(token, index.max_distance)):
+            for item in index.items(term):
+                if distance < best.get(item, distance + 1):
+                    best[item] = distance
+        if position == 0:
+            scores = best
+        else:
+            # Должны совпасть все слова запроса
+            scores = {item: scores[item] + distance for item, distance in best.items() if item in scores}
+        if not scores:
+            return []
+    return sorted(scores.items(), key=lambda pair: (pair[1], names.get(pair[0], "")))
+
+
+def index_names(index: SymSpellIndex, names: Dict[Hashable, str],
+                items: Iterable[Hashable]) -> None:
+    """Добавление слов названий элементов items в словарь"""
+    for item in items:
+        for token in set(tokenize(names[item])):
+            index.add(token, item)
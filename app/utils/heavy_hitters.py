@@ -0,0 +1,237 @@
+"""
+Потоковый подсчёт самых частых элементов (алгоритм Space-Saving)
+
+Хранится не более capacity счётчиков. Новый элемент при заполненной таблице
+вытесняет элемент с минимальным счётчиком и наследует его значение как
+верхнюю оценку ошибки. Переоценка любого счётчика не больше total / capacity.
+Отслеживаемый top-k обновляется инкрементально. Структуры можно объединять
+(mergeable summaries), что позволяет складывать счётчики нескольких процессов.
+"""
+
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import heapq
+import math
+
+
+class _Counter:
+    __slots__ = ("count", "error")
+
+    def __init__(self, count: float, error: float):
+        self.count = count    # Оценка сверху числа появлений
+        self.error = error    # Максимальная переоценка
+
+
+class SpaceSaving:
+    """Top-k частых элементов в ограниченной памяти"""
+
+    def __init__(self, capacity: int = 1000, top_k: int = 5):
+        """
+        Args:
+            capacity (int): Максимальное количество счётчиков
+            top_k (int): Размер отслеживаемого топа
+        """
+        self.capacity = max(capacity, top_k)
+        self.top_k = top_k
+        self.total = 0.0
+        self._counters: Dict[Hashable, _Counter] = {}
+        # Min-heap (count, seq, key) с ленивым удалением устаревших записей
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._seq = 0
+        self._top: List[Hashable] = []
+
+    @classmethod
+    def for_error(cls, epsilon: float, top_k: int = 5) -> "SpaceSaving":
+        """
+        Создание структуры с заданной относительной погрешностью
+
+        Args:
+            epsilon (float): Максимальная переоценка как доля от общего количества
+            top_k (int): Размер отслеживаемого топа
+
+        Returns:
+            SpaceSaving: Структура с capacity = ceil(1 / epsilon)
+        """
+        return cls(math.ceil(1 / epsilon), top_k)
+
+    @property
+    def error_bound(self) -> float:
+        """Верхняя граница переоценки любого счётчика"""
+        return self.total / self.capacity
+
+    def add(self, key: Hashable, weight: float = 1) -> bool:
+        """
+        Учёт появления элемента
+
+        Args:
+            key (Hashable): Элемент
+            weight (float): Вес появления
+
+        Returns:
+            bool: Изменился ли top-k (состав, порядок или счётчики)
+        """
+        self.total += weight
+        counter = self._counters.get(key)
+        evicted = None
+        if counter is None:
+            if len(self._counters) < self.capacity:
+                counter = _Counter(0, 0)
+            else:
+                evicted, minimum = self._pop_min()
+                counter = _Counter(minimum, minimum)
+            self._counters[key] = counter
+        counter.count += weight
+        self._push(key, counter.count)
+        return self._update_top(key, evicted)
+
+    def _push(self, key: Hashable, count: float) -> None:
+        self._seq += 1
+        heapq.heappush(self._heap, (count, self._seq, key))
+        if len(self._heap) > 4 * self.capacity:
+            # Удаление устаревших записей
+            self._heap = [
+                (counter.count, index, key)
+                for index, (key, counter) in enumerate(self._counters.items())
+            ]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[Hashable, float]:
+        """Удаление элемента с минимальным счётчиком"""
+        while True:
+            count, _, key = heapq.heappop(self._heap)
+            counter = self._counters.get(key)
+            if counter is not None and counter.count == count:
+                del self._counters[key]
+                return key, count
+
+    def _update_top(self, key: Hashable, evicted: Optional[Hashable]) -> bool:
+        """Инкрементальное обновление top-k после изменения счётчика key"""
+        if evicted is not None and evicted in self._top:
+            self._top = self._compute_top()
+            return True
+        if key in self._top:
+            self._sort_top()
+            return True
+        if len(self._top) < self.top_k:
+            self._top.append(key)
+            self._sort_top()
+            return True
+        if self._counters[key].count > self._counters[self._top[-1]].count:
+            self._top[-1] = key
+            self._sort_top()
+            return True
+        return False
+
+    def _sort_top(self) -> None:
+        self._top.sort(key=lambda item: self._counters[item].count, reverse=True)
+
+    def _compute_top(self) -> List[Hashable]:
+        return heapq.nlargest(
+            self.top_k, self._counters, key=lambda item: self._counters[item].count
+        )
+
+    def top(self, k: Optional[int] = None) -> List[Tuple[Hashable, float, float]]:
+        """
+        Самые частые элементы
+
+        Args:
+            k (Optional[int]): Количество (по умолчанию top_k)
+
+        Returns:
+            List[Tuple]: (элемент, оценка количества, максимальная переоценка)
+        """
+        keys = self._top if k is None or k <= self.top_k else self._compute_top_k(k)
+        return [
+            (key, self._counters[key].count, self._counters[key].error)
+            for key in keys[:k]
+        ]
+
+    def _compute_top_k(self, k: int) -> List[Hashable]:
+        return heapq.nlargest(k, self._counters, key=lambda item: self._counters[item].count)
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    # ===== ОБЪЕДИНЕНИЕ И СОХРАНЕНИЕ =====
+    def _floor(self) -> float:
+        """Оценка количества для отсутствующего элемента (0, если таблица не заполнена)"""
+        if len(self._counters) < self.capacity:
+            return 0
+        return min(counter.count for counter in self._counters.values())
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """
+        Объединение двух структур (например, разных процессов)
+
+        Элемент, отсутствующий в заполненной структуре, мог встречаться в ней
+        не больше её минимального счётчика - это значение добавляется к оценке
+        и к ошибке. Из объединения остаются capacity наибольших счётчиков.
+
+        Args:
+            other (SpaceSaving): Другая структура
+
+        Returns:
+            SpaceSaving: Новая структура (исходные не меняются)
+        """
+        floor_self, floor_other = self._floor(), other._floor()
+        counters = {}
+        for key in set(self._counters) | set(other._counters):
+            mine = self._counters.get(key)
+            theirs = other._counters.get(key)
+            counters[key] = (
+                (mine.count if mine else floor_self) + (theirs.count if theirs else floor_other),
+                (mine.error if mine else floor_self) + (theirs.error if theirs else floor_other),
+            )
+        return self._from_counters(
+            self.capacity, self.top_k, self.total + other.total, counters
+        )
+
+    def copy(self) -> "SpaceSaving":
+        counters = {key: (c.count, c.error) for key, c in self._counters.items()}
+        return self._from_counters(self.capacity, self.top_k, self.total, counters)
+
+    @classmethod
+    def _from_counters(cls, capacity: int, top_k: int, total: float,
+                       counters: Dict[Hashable, Tuple[float, float]]) -> "SpaceSaving":
+        sketch = cls(capacity, top_k)
+        sketch.total = total
+        kept = heapq.nlargest(capacity, counters.items(), key=lambda item: item[1][0])
+        for key, (count, error) in kept:
+            sketch._counters[key] = _Counter(count, error)
+        sketch._heap = [
+            (counter.count, index, key)
+            for index, (key, counter) in enumerate(sketch._counters.items())
+        ]
+        heapq.heapify(sketch._heap)
+        sketch._seq = len(sketch._heap)
+        sketch._top = sketch._compute_top()
+        return sketch
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Представление для сохранения в JSON (ключи - кортежи строк)"""
+        return {
+            "capacity": self.capacity,
+            "top_k": self.top_k,
+            "total": self.total,
+            "counters": [
+                [list(key), counter.count, counter.error]
+                for key, counter in self._counters.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], capacity: Optional[int] = None,
+                  top_k: Optional[int] = None) -> "SpaceSaving":
+        """
+        Восстановление из to_dict()
+
+        Args:
+            data (Dict): Сохранённое представление
+            capacity (Optional[int]): Новая ёмкость (по умолчанию сохранённая)
+            top_k (Optional[int]): Новый размер топа (по умолчанию сохранённый)
+        """
+        counters = {
+            tuple(key): (count, error) for key, count, error in data["counters"]
+        }
+        return cls._from_counters(
+            capacity or data["capacity"], top_k or data["top_k"], data["total"], counters
+        )
@@ -0,0 +1,196 @@
+"""
+Локальный кэш постеров TMDB для /api/posters/{film_id}
+
+Каждое изображение загружается один раз и хранится на диске под именем из
+SHA-256 содержимого (content-addressed): одинаковые постеры разных фильмов
+занимают место один раз, а хеш служит ETag. Уменьшенные размеры создаются
+локально через Pillow, если он установлен, иначе загружается готовый размер
+TMDB (/t/p/w185/...). Загрузка выполняется через сменный fetcher, поэтому
+в тестах и без сети используется LocalFetcher с каталогом изображений.
+"""
+
+from typing import Dict, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+import hashlib
+import io
+import logging
+import mimetypes
+import os
+import re
+import threading
+
+import requests
+
+try:
+    from PIL import Image
+except ImportError:
+    # Без Pillow уменьшенные размеры берутся у TMDB
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Ширина размеров постера (имена как у TMDB)
+POSTER_WIDTHS = {"w92": 92, "w154": 154, "w185": 185, "w342": 342, "w500": 500}
+ORIGINAL_SIZE = "w500"
+SIZE_PATTERN = f"^({'|'.join(POSTER_WIDTHS)})$"
+
+# Сегмент размера в URL изображения TMDB
+_TMDB_SIZE_RE = re.compile(r"/t/p/(w\d+|original)/")
+
+INDEX_FILE = "index.tsv"
+
+
+class PosterFile(NamedTuple):
+    """Изображение в кэше"""
+    path: str
+    digest: str
+    media_type: str
+
+
+class HTTPFetcher:
+    """Загрузка изображений по HTTP"""
+
+    def __init__(self, timeout: float = 10.0):
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    def fetch(self, url: str) -> Tuple[bytes, str]:
+        """
+        Загрузка изображения
+
+        Args:
+            url (str): URL изображения
+
+        Returns:
+            Tuple[bytes, str]: (содержимое, MIME тип)
+
+        Raises:
+            ValueError: Ответ не является изображением
+            requests.RequestException: Ошибка загрузки
+        """
+        response = self._session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        media_type = response.headers.get("content-type", "").split(";")[0].strip()
+        if not media_type.startswith("image/"):
+            raise ValueError(f"Не изображение: {media_type or 'тип не указан'}")
+        return response.content, media_type
+
+
+class LocalFetcher:
+    """Изображения из локального каталога по имени файла в URL (тесты, работа без сети)"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def fetch(self, url: str) -> Tuple[bytes, str]:
+        name = os.path.basename(urlparse(url).path)
+        path = os.path.join(self.directory, name)
+        with open(path, "rb") as source:
+            data = source.read()
+        return data, mimetypes.guess_type(name)[0] or "image/jpeg"
+
+
+def sized_url(url: str, size: str) -> str:
+    """URL изображения TMDB нужного размера (другие URL не меняются)"""
+    return _TMDB_SIZE_RE.sub(f"/t/p/{size}/", url, count=1)
+
+
+class PosterStore:
+    """Постеры на диске: объекты по SHA-256 содержимого и индекс (URL, размер) -> объект"""
+
+    def __init__(self, directory: str, fetcher=None):
+        """
+        Args:
+            directory (str): Каталог кэша
+            fetcher: Объект с методом fetch(url) -> (bytes, MIME тип); по умолчанию HTTPFetcher
+        """
+        self.directory = directory
+        self.fetcher = fetcher or HTTPFetcher()
+        self._lock = threading.Lock()
+        self._index: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self._index_path = os.path.join(directory, INDEX_FILE)
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Чтение индекса: строки "размер<TAB>URL<TAB>хеш<TAB>MIME тип" (последняя запись главнее)"""
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, encoding="utf-8") as source:
+            for line in source:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) == 4:
+                    size, url, digest, media_type = parts
+                    self._index[(url, size)] = (digest, media_type)
+        logger.info(f"Кэш постеров: {len(self._index)} изображений в {self.directory}")
+
+    def _object_path(self, digest: str, media_type: str) -> str:
+        extension = mimetypes.guess_extension(media_type) or ".img"
+        return os.path.join(self.directory, "objects", digest[:2], f"{digest}{extension}")
+
+    def cached(self, url: str, size: str) -> Optional[PosterFile]:
+        """Изображение из кэша без загрузки (None, если его нет)"""
+        with self._lock:
+            entry = self._index.get((url, size))
+        if entry is None:
+            return None
+        path = self._object_path(*entry)
+        if not os.path.exists(path):
+            return None
+        return PosterFile(path, entry[0], entry[1])
+
+    def get(self, url: str, size: str = ORIGINAL_SIZE) -> PosterFile:
+        """
+        Изображение нужного размера: из кэша или с загрузкой и сохранением
+
+        Args:
+            url (str): URL постера TMDB (любого размера)
+            size (str): Размер из POSTER_WIDTHS
+
+        Returns:
+            PosterFile: Файл в кэше
+
+        Raises:
+            Exception: Ошибка загрузки (ответ не кэшируется)
+        """
+        cached = self.cached(url, size)
+        if cached is not None:
+            return cached
+        data, media_type = self._render(url, size)
+        return self._store(url, size, data, media_type)
+
+    def _render(self, url: str, size: str) -> Tuple[bytes, str]:
+        """Получение изображения нужного размера"""
+        if size == ORIGINAL_SIZE or Image is None:
+            return self.fetcher.fetch(sized_url(url, size))
+        original = self.get(url, ORIGINAL_SIZE)
+        with open(original.path, "rb") as source:
+            data = source.read()
+        return self._thumbnail(data, POSTER_WIDTHS[size]), "image/jpeg"
+
+    @staticmethod
+    def _thumbnail(data: bytes, width: int) -> bytes:
+        """Уменьшение изображения до ширины width (Pillow)"""
+        with Image.open(io.BytesIO(data)) as image:
+            image = image.convert("RGB")
+            if image.width > width:
+                image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+            output = io.BytesIO()
+            image.save(output, "JPEG", quality=85, optimize=True, progressive=True)
+            return output.getvalue()
+
+    def _store(self, url: str, size: str, data: bytes, media_type: str) -> PosterFile:
+        """Сохранение объекта (атомарно, если его ещё нет) и запись в индекс"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest, media_type)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary, "wb") as target:
+                target.write(data)
+            os.replace(temporary, path)
+        with self._lock:
+            self._index[(url, size)] = (digest, media_type)
+            with open(self._index_path, "a", encoding="utf-8") as index:
+                index.write(f"{size}\t{url}\t{digest}\t{media_type}\n")
+        return PosterFile(path, digest, media_type)
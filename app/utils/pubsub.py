@@ -0,0 +1,55 @@
+"""
+Внутрипроцессная публикация событий (pub/sub)
+"""
+
+from typing import Any, Callable, List
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PubSub:
+    """
+    Синхронная рассылка событий подписчикам
+
+    Подписчик - функция, вызываемая в потоке публикации; она должна
+    работать быстро. Ошибка подписчика логируется и не мешает остальным.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[Any], None]] = []
+
+    def subscribe(self, callback: Callable[[Any], None]) -> Callable[[], None]:
+        """
+        Подписка на события
+
+        Args:
+            callback (Callable): Обработчик события
+
+        Returns:
+            Callable: Функция отмены подписки
+        """
+        with self._lock:
+            self._subscribers = self._subscribers + [callback]
+
+        def unsubscribe() -> None:
+            with self._lock:
+                self._subscribers = [item for item in self._subscribers if item is not callback]
+
+        return unsubscribe
+
+    def publish(self, event: Any) -> None:
+        """
+        Рассылка события всем подписчикам
+
+        Args:
+            event (Any): Событие
+        """
+        # Список подписчиков заменяется целиком, поэтому читается без блокировки
+        for callback in self._subscribers:
+            try:
+                callback(event)
+            except Exception as err:
+                logger.error(f"Ошибка подписчика {callback}: {err}")
@@ -0,0 +1,71 @@
+"""
+Быстрый JSON ответ для маршрутов /api/*
+
+Данные, полученные из БД, уже имеют нужную структуру, поэтому маршруты
+возвращают FastJSONResponse напрямую: FastAPI в этом случае не вызывает
+jsonable_encoder и не валидирует ответ через response_model.
+Pydantic схемы из app/models/schemas.py остаются опубликованным контрактом (OpenAPI).
+"""
+
+from fastapi.responses import JSONResponse
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+import json
+import logging
+
+from app.settings import JSON_BACKEND
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+USE_ORJSON = JSON_BACKEND == "orjson" and orjson is not None
+if JSON_BACKEND == "orjson" and orjson is None:
+    logger.warning("orjson не установлен, используется стандартный модуль json")
+
+
+def _json_default(value: Any) -> Any:
+    """
+    Преобразование типов, которые не поддерживаются сериализатором напрямую
+
+    Args:
+        value (Any): Значение (Decimal, datetime, ObjectId, set и т.д.)
+
+    Returns:
+        Any: Сериализуемое значение
+    """
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Сериализация в JSON выбранным сериализатором
+
+    Args:
+        content (Any): Данные ответа
+
+    Returns:
+        bytes: JSON в кодировке UTF-8
+    """
+    if USE_ORJSON:
+        return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, ensure_ascii=False, separators=(",", ":"), default=_json_default
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON ответ без jsonable_encoder с сериализацией через orjson (если доступен)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
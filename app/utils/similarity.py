@@ -0,0 +1,231 @@
+"""
+Векторы фильмов и похожие фильмы (NumPy)
+
+Фильм описывается строкой в нескольких матрицах: актёры и жанры (0/1 по ID),
+рейтинг (код из RATINGS) и длительность (доля от LENGTH_SCALE). Похожесть двух
+фильмов - взвешенная сумма коэффициента Жаккара по актёрам, косинуса по жанрам,
+совпадения рейтинга и близости длительности. Она симметрична, поэтому после
+изменения части фильмов пересчитываются только их строки и строки, в соседях
+которых они были; остальные списки соседей дополняются новыми оценками.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# Рейтинги MPAA в Sakila (код - позиция в кортеже, -1 - нет рейтинга)
+RATINGS = ("G", "PG", "PG-13", "R", "NC-17")
+# Длительность, соответствующая 1.0 (в Sakila фильмы до 185 минут)
+LENGTH_SCALE = 200.0
+# Веса составляющих похожести (сумма 1)
+SIMILARITY_WEIGHTS = {"actors": 0.4, "genres": 0.4, "rating": 0.1, "length": 0.1}
+# Количество строк, для которых оценки считаются одной матрицей
+BLOCK_SIZE = 256
+
+FEATURE_ARRAYS = ("film_ids", "actors", "genres", "ratings", "lengths")
+
+
+def empty_features() -> Dict[str, np.ndarray]:
+    """Матрицы признаков без фильмов"""
+    return {
+        "film_ids": np.zeros(0, dtype=np.int32),
+        "actors": np.zeros((0, 0), dtype=np.float32),
+        "genres": np.zeros((0, 0), dtype=np.float32),
+        "ratings": np.zeros(0, dtype=np.int8),
+        "lengths": np.zeros(0, dtype=np.float32),
+    }
+
+
+def _grow_columns(matrix: np.ndarray, width: int) -> np.ndarray:
+    """Расширение матрицы нулевыми колонками до width (новые ID актёров или жанров)"""
+    if matrix.shape[1] >= width:
+        return matrix
+    return np.pad(matrix, ((0, 0), (0, width - matrix.shape[1])))
+
+
+def update_features(features: Dict[str, np.ndarray], films: List[Dict],
+                    actor_pairs: Iterable[Dict],
+                    category_pairs: Iterable[Dict]) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """
+    Замена строк признаков фильмов films (новые фильмы добавляются в конец)
+
+    Args:
+        features (Dict[str, np.ndarray]): Текущие матрицы (не изменяются)
+        films (List[Dict]): Фильмы (film_id, rating, length)
+        actor_pairs (Iterable[Dict]): Пары (film_id, actor_id) этих фильмов
+        category_pairs (Iterable[Dict]): Пары (film_id, category_id) этих фильмов
+
+    Returns:
+        Tuple: (новые матрицы, номера изменённых строк)
+    """
+    film_ids = features["film_ids"]
+    rows = {int(film_id): row for row, film_id in enumerate(film_ids)}
+    new_ids = [film['film_id'] for film in films if film['film_id'] not in rows]
+    for film_id in new_ids:
+        rows[film_id] = len(rows)
+    size = len(rows)
+
+    actor_pairs, category_pairs = list(actor_pairs), list(category_pairs)
+    actor_width = max([pair['actor_id'] + 1 for pair in actor_pairs] + [features["actors"].shape[1]])
+    genre_width = max([pair['category_id'] + 1 for pair in category_pairs] + [features["genres"].shape[1]])
+
+    def extend(array: np.ndarray, width: int = None) -> np.ndarray:
+        shape = (size - len(array),) + array.shape[1:]
+        grown = np.concatenate([array, np.zeros(shape, dtype=array.dtype)])
+        return grown if width is None else _grow_columns(grown, width)
+
+    updated = {
+        "film_ids": np.concatenate([film_ids, np.asarray(new_ids, dtype=np.int32)]),
+        "actors": extend(features["actors"], actor_width),
+        "genres": extend(features["genres"], genre_width),
+        "ratings": extend(features["ratings"]),
+        "lengths": extend(features["lengths"]),
+    }
+    changed = np.asarray(sorted(rows[film['film_id']] for film in films), dtype=np.int64)
+    updated["actors"][changed] = 0
+    updated["genres"][changed] = 0
+    for film in films:
+        row = rows[film['film_id']]
+        rating = film.get('rating')
+        updated["ratings"][row] = RATINGS.index(rating) if rating in RATINGS else -1
+        updated["lengths"][row] = min((film.get('length') or 0) / LENGTH_SCALE, 1.0)
+    for pair in actor_pairs:
+        updated["actors"][rows[pair['film_id']], pair['actor_id']] = 1.0
+    genres = updated["genres"]
+    for pair in category_pairs:
+        genres[rows[pair['film_id']], pair['category_id']] = 1.0
+    # Строки жанров хранятся нормированными: косинус - скалярное произведение
+    norms = np.linalg.norm(genres[changed], axis=1, keepdims=True)
+    genres[changed] = np.divide(genres[changed], norms, out=np.zeros_like(genres[changed]), where=norms > 0)
+    return updated, changed
+
+
+def similarity_block(features: Dict[str, np.ndarray], rows: np.ndarray) -> np.ndarray:
+    """
+    Похожесть фильмов rows со всеми фильмами
+
+    Args:
+        features (Dict[str, np.ndarray]): Матрицы признаков
+        rows (np.ndarray): Номера строк
+
+    Returns:
+        np.ndarray: Матрица len(rows) x N; похожесть фильма на себя -inf
+    """
+    actors, genres = features["actors"], features["genres"]
+    ratings, lengths = features["ratings"], features["lengths"]
+
+    shared = actors[rows] @ actors.T
+    counts = actors.sum(axis=1)
+    union = counts[rows, None] + counts[None, :] - shared
+    jaccard = np.divide(shared, union, out=np.zeros_like(shared), where=union > 0)
+    cosine = genres[rows] @ genres.T
+    same_rating = (ratings[rows, None] == ratings[None, :]) & (ratings[rows, None] >= 0)
+    closeness = 1.0 - np.abs(lengths[rows, None] - lengths[None, :])
+
+    scores = (
+        SIMILARITY_WEIGHTS["actors"] * jaccard
+        + SIMILARITY_WEIGHTS["genres"] * cosine
+        + SIMILARITY_WEIGHTS["rating"] * same_rating
+        + SIMILARITY_WEIGHTS["length"] * closeness
+    ).astype(np.float32)
+    scores[np.arange(len(rows)), rows] = -np.inf
+    return scores
+
+
+def top_k(candidates: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    k лучших кандидатов каждой строки по убыванию оценки
+
+    Args:
+        candidates (np.ndarray): Номера фильмов-кандидатов (M x C)
+        scores (np.ndarray): Их оценки (M x C)
+        k (int): Количество соседей (не больше C)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (номера соседей int32, оценки float32), M x k
+    """
+    if k == 0:
+        shape = (scores.shape[0], 0)
+        return np.zeros(shape, dtype=np.int32), np.zeros(shape, dtype=np.float32)
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    best = np.take_along_axis(best, order, axis=1)
+    return (
+        np.take_along_axis(candidates, best, axis=1).astype(np.int32),
+        np.take_along_axis(best_scores, order, axis=1).astype(np.float32),
+    )
+
+
+def neighbor_count(size: int, k: int) -> int:
+    """Количество соседей в списке при size фильмах"""
+    return max(0, min(k, size - 1))
+
+
+def _rows_top_k(features: Dict[str, np.ndarray], rows: np.ndarray,
+                k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Соседи строк rows по полным строкам оценок (блоками по BLOCK_SIZE)"""
+    size = len(features["film_ids"])
+    neighbors = np.zeros((len(rows), k), dtype=np.int32)
+    scores = np.zeros((len(rows), k), dtype=np.float32)
+    all_rows = np.arange(size)
+    for start in range(0, len(rows), BLOCK_SIZE):
+        block = rows[start:start + BLOCK_SIZE]
+        block_scores = similarity_block(features, block)
+        candidates = np.broadcast_to(all_rows, block_scores.shape)
+        neighbors[start:start + len(block)], scores[start:start + len(block)] = top_k(
+            candidates, block_scores, k
+        )
+    return neighbors, scores
+
+
+def build_neighbors(features: Dict[str, np.ndarray], k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Списки k самых похожих фильмов для всех фильмов
+
+    Args:
+        features (Dict[str, np.ndarray]): Матрицы признаков
+        k (int): Количество соседей
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (номера строк соседей, оценки), N x k
+    """
+    size = len(features["film_ids"])
+    return _rows_top_k(features, np.arange(size), neighbor_count(size, k))
+
+
+def refresh_neighbors(features: Dict[str, np.ndarray], neighbors: np.ndarray, scores: np.ndarray,
+                      changed: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Обновление списков соседей после изменения строк changed
+
+    Строки changed и строки, в соседях которых есть changed, пересчитываются
+    полностью (оценка соседа могла уменьшиться). В остальных списках оценки
+    прежних соседей не изменились, поэтому достаточно выбрать лучших среди
+    прежних соседей и изменённых фильмов.
+
+    Args:
+        features (Dict[str, np.ndarray]): Матрицы признаков (после update_features)
+        neighbors (np.ndarray): Прежние списки (строки новых фильмов - любые)
+        scores (np.ndarray): Прежние оценки
+        changed (np.ndarray): Номера изменённых строк
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Новые (номера соседей, оценки)
+    """
+    k = neighbors.shape[1]
+    neighbors, scores = neighbors.copy(), scores.copy()
+
+    stale = np.isin(neighbors, changed).any(axis=1)
+    stale[changed] = True
+    stale_rows = np.flatnonzero(stale)
+    if len(stale_rows):
+        neighbors[stale_rows], scores[stale_rows] = _rows_top_k(features, stale_rows, k)
+
+    rest = np.flatnonzero(~stale)
+    if len(rest) and len(changed):
+        changed_scores = similarity_block(features, changed)[:, rest].T
+        candidates = np.concatenate([neighbors[rest], np.broadcast_to(changed, (len(rest), len(changed)))], axis=1)
+        candidate_scores = np.concatenate([scores[rest], changed_scores], axis=1)
+        neighbors[rest], scores[rest] = top_k(candidates, candidate_scores, k)
+    return neighbors, scores
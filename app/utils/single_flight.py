@@ -0,0 +1,185 @@
+"""
+Объединение одинаковых одновременных вычислений (single-flight)
+
+Если вычисление с тем же ключом уже выполняется, новый вызов не запускает
+его повторно, а дожидается и получает тот же результат (или то же исключение).
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+import asyncio
+import threading
+
+from app.utils.cancellation import CancelToken, current_token, use_token, wait_cancellable
+
+
+class _FlightStats:
+    """Счётчики объединения вызовов"""
+
+    def __init__(self):
+        self.calls = 0        # Всего вызовов
+        self.executions = 0   # Реально выполненных вычислений
+        self.hits = 0         # Вызовов, получивших результат чужого вычисления
+        self.waiting = 0      # Вызовов, ожидающих результат прямо сейчас
+        self.errors = 0       # Вычислений, завершившихся исключением
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "hits": self.hits,
+            "waiting": self.waiting,
+            "errors": self.errors,
+        }
+
+
+class SingleFlight:
+    """Single-flight для синхронных функций, вызываемых из нескольких потоков"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, "_Call"] = {}
+        self._stats = _FlightStats()
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Выполнение func(*args, **kwargs) не более одного раза на ключ одновременно
+
+        Args:
+            key (Hashable): Ключ вычисления
+            func (Callable): Функция
+
+        Returns:
+            Any: Результат функции (общий для всех одновременных вызовов)
+        """
+        with self._lock:
+            self._stats.calls += 1
+            call = self._in_flight.get(key)
+            if call is not None:
+                self._stats.hits += 1
+                self._stats.waiting += 1
+                leader = False
+            else:
+                call = _Call()
+                self._in_flight[key] = call
+                self._stats.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            with self._lock:
+                self._stats.waiting -= 1
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as err:
+            call.error = err
+            with self._lock:
+                self._stats.errors += 1
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        """Текущие значения счётчиков"""
+        with self._lock:
+            return self._stats.as_dict()
+
+
+class _Call:
+    """Состояние одного выполняющегося вычисления"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class AsyncSingleFlight:
+    """Single-flight для корутин внутри одного event loop"""
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, "_AsyncCall"] = {}
+        self._stats = _FlightStats()
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Выполнение корутины func() не более одного раза на ключ одновременно
+
+        Вычисление выполняется отдельной задачей под собственным токеном отмены:
+        отключение клиента одного из ожидающих запросов (в том числе первого)
+        не отменяет его для остальных, а отменяется оно, когда отключились все.
+
+        Args:
+            key (Hashable): Ключ вычисления
+            func (Callable): Фабрика корутины
+
+        Returns:
+            Any: Результат корутины (общий для всех одновременных вызовов)
+
+        Raises:
+            QueryCancelled: Клиент этого запроса отключился
+        """
+        self._stats.calls += 1
+        call = self._in_flight.get(key)
+        if call is None:
+            call = _AsyncCall()
+
+            async def run() -> Any:
+                # Задача выполняется в копии контекста: токен меняется только для неё
+                with use_token(call.token):
+                    return await func()
+
+            call.task = asyncio.ensure_future(run())
+            self._in_flight[key] = call
+            self._stats.executions += 1
+            call.task.add_done_callback(lambda done: self._finish(key, done))
+            return await self._wait(call)
+
+        self._stats.hits += 1
+        self._stats.waiting += 1
+        try:
+            return await self._wait(call)
+        finally:
+            self._stats.waiting -= 1
+
+    @staticmethod
+    async def _wait(call: "_AsyncCall") -> Any:
+        """Ожидание результата с отменой вычисления после ухода последнего ожидающего"""
+        token = current_token()
+        call.waiters += 1
+        try:
+            if token is None:
+                return await asyncio.shield(call.task)
+            return await wait_cancellable(call.task, token)
+        finally:
+            call.waiters -= 1
+            if token is not None and token.cancelled and call.waiters == 0 and not call.task.done():
+                call.token.cancel()
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        """Удаление завершённого вычисления и учёт ошибок"""
+        call = self._in_flight.get(key)
+        if call is not None and call.task is task:
+            del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            self._stats.errors += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Текущие значения счётчиков"""
+        return self._stats.as_dict()
+
+
+class _AsyncCall:
+    """Состояние одного выполняющегося асинхронного вычисления"""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.token = CancelToken()
+        # Запросы, ожидающие результат
+        self.waiters = 0
@@ -0,0 +1,113 @@
+"""
+Раздача статических файлов с предварительно сжатыми вариантами (.br/.gz)
+Сжатые файлы и имена с хешем содержимого создаёт tools/build_static.py
+"""
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+import anyio
+import mimetypes
+import os
+import re
+import stat
+
+from app.middleware.compression import parse_accept_encoding
+
+# Варианты в порядке предпочтения: (кодировка, расширение файла)
+PRECOMPRESSED_VARIANTS = (("br", ".br"), ("gzip", ".gz"))
+
+# Имена вида script.3f2a9c1b0d.js - содержимое не меняется, кэшируем навсегда
+HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{10}\.[a-z0-9]+$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def cache_control_for(path: str) -> str:
+    """
+    Заголовок Cache-Control для файла
+
+    Args:
+        path (str): Путь или имя файла
+
+    Returns:
+        str: immutable для файлов с хешем в имени, no-cache для остальных
+    """
+    return IMMUTABLE_CACHE_CONTROL if HASHED_NAME_RE.search(path) else REVALIDATE_CACHE_CONTROL
+
+
+def precompressed_file_response(full_path: str, accept_encoding: str) -> FileResponse:
+    """
+    Ответ с файлом: сжатый вариант при поддержке клиентом, иначе исходный файл
+
+    Args:
+        full_path (str): Путь к исходному файлу
+        accept_encoding (str): Значение заголовка Accept-Encoding
+
+    Returns:
+        FileResponse: Ответ с файлом и заголовками кэширования
+    """
+    media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+    try:
+        accepted = parse_accept_encoding(accept_encoding)
+    except ValueError:
+        accepted = set()
+
+    response = None
+    for encoding, suffix in PRECOMPRESSED_VARIANTS:
+        if encoding in accepted and os.path.isfile(full_path + suffix):
+            response = FileResponse(full_path + suffix, media_type=media_type)
+            response.headers["Content-Encoding"] = encoding
+            break
+    if response is None:
+        response = FileResponse(full_path, media_type=media_type)
+
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = cache_control_for(full_path)
+    return response
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles с выбором .br/.gz варианта по Accept-Encoding и долгим кэшированием"""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        request_headers = Headers(scope=scope)
+        if scope["method"] in ("GET", "HEAD"):
+            accepted = set()
+            try:
+                accepted = parse_accept_encoding(request_headers.get("accept-encoding", ""))
+            except ValueError:
+                pass
+            for encoding, suffix in PRECOMPRESSED_VARIANTS:
+                if encoding not in accepted:
+                    continue
+                full_path, stat_result = await anyio.to_thread.run_sync(
+                    self.lookup_path, path + suffix
+                )
+                if stat_result and stat.S_ISREG(stat_result.st_mode):
+                    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                    response = FileResponse(
+                        full_path, stat_result=stat_result,
+                        method=scope["method"], media_type=media_type
+                    )
+                    response.headers["Content-Encoding"] = encoding
+                    return self._with_cache_headers(response, path, request_headers)
+
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            return self._with_cache_headers(response, path, request_headers)
+        return response
+
+    def _with_cache_headers(self, response: Response, path: str,
+                            request_headers: Headers) -> Response:
+        """Добавление заголовков кэширования и обработка условного запроса"""
+        response.headers["Vary"] = "Accept-Encoding"
+        response.headers["Cache-Control"] = cache_control_for(path)
+        if response.status_code == 200 and self.is_not_modified(response.headers, request_headers):
+            return Response(status_code=304, headers={
+                key: value for key, value in response.headers.items()
+                if key in ("cache-control", "etag", "vary", "last-modified")
+            })
+        return response
@@ -0,0 +1,278 @@
+"""
+Сопоставление вымышленных названий Sakila с реальными фильмами (для поиска постеров в TMDB)
+
+Таблицы неизменяемые и создаются один раз при импорте модуля. Помимо точного
+сопоставления, TitleMatcher находит реальный фильм с наибольшим пересечением слов:
+слова каталога проиндексированы по триграммам, поэтому совпадают и близкие
+написания ("BADMAN" - "Batman"). Выбор резервных фильмов и эмодзи использует
+stable_hash, одинаковый во всех процессах (в отличие от встроенного hash()).
+"""
+
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+import hashlib
+import re
+import unicodedata
+
+# ===== ТАБЛИЦЫ =====
+# Точные сопоставления вымышленных названий с реальными
+SAKILA_TO_REAL = MappingProxyType({
+    # Экшн фильмы
+    'ACADEMY DINOSAUR': 'Jurassic Park',
+    'ACE GOLDFINGER': 'Goldfinger',
+    'ADAPTATION HOLES': 'The Shawshank Redemption',
+    'AFFAIR PREJUDICE': 'Pride and Prejudice',
+    'AFRICAN EGG': 'The Lion King',
+    'AGENT TRUMAN': 'The Truman Show',
+    'AIRPLANE SIERRA': 'Top Gun',
+    'AIRPORT POLLOCK': 'Airport',
+    'ALABAMA DEVIL': 'The Devil Wears Prada',
+    'ALADDIN CALENDAR': 'Aladdin',
+    'ALAMO VIDEOTAPE': 'The Alamo',
+    'ALASKA PHANTOM': 'The Phantom',
+    'ALI FOREVER': 'Ali',
+    'ALICE FANTASIA': 'Alice in Wonderland',
+    'ALIEN CENTER': 'Alien',
+    'ALLEY EVOLUTION': 'Evolution',
+    'ALONE TRIP': 'Into the Wild',
+    'ALTER VICTORY': 'Victory',
+    'AMADEUS HOLY': 'Amadeus',
+    'AMELIE HELLFIGHTERS': 'Amélie',
+    
+    # Комедии
+    'AMERICAN CIRCUS': 'The Greatest Showman',
+    'AMISTAD MIDSUMMER': 'Amistad',
+    'ANALYZE HOOSIERS': 'Hoosiers',
+    'ANGELS LIFE': 'Life is Beautiful',
+    'ANNIE IDENTITY': 'The Bourne Identity',
+    'ANONYMOUS HUMAN': 'The Matrix',
+    'ANTHEM LUKE': 'Star Wars',
+    'ANTITRUST TOMATOES': 'Attack of the Killer Tomatoes',
+    'ANYTHING SAVANNAH': 'Forrest Gump',
+    'APACHE DIVINE': 'Dances with Wolves',
+    
+    # Драмы
+    'APOCALYPSE FLAMINGOS': 'Apocalypse Now',
+    'ARABIA DOGMA': 'Lawrence of Arabia',
+    'ARACHNOPHOBIA ROLLERCOASTER': 'Arachnophobia',
+    'ARGONAUTS TOWN': 'Jason and the Argonauts',
+    'ARIZONA BANG': 'Raising Arizona',
+    'ARK RIDGEMONT': 'Fast Times at Ridgemont High',
+    'ARMAGEDDON LOST': 'Armageddon',
+    'ARMY FLINTSTONES': 'The Flintstones',
+    'ARTIST COLDBLOODED': 'The Artist',
+    'ATLANTIS CAUSE': 'Atlantis: The Lost Empire',
+    
+    # Ужасы
+    'ATTACK NOON': 'High Noon',
+    'ATTRACTION NEWTON': 'The Theory of Everything',
+    'AUTUMN CROW': 'The Crow',
+    'BABY HALL': 'Baby Driver',
+    'BACHELOR JAWBREAKER': 'Jawbreaker',
+    'BADMAN DAWN': 'Batman Begins',
+    'BAG BEETHOVEN': 'Beethoven',
+    'BALLOON HOMEWARD': 'Homeward Bound',
+    'BANG KWAI': 'The Bridge on the River Kwai',
+    'BANGER PINOCCHIO': 'Pinocchio',
+    
+    # Научная фантастика
+    'BARBARELLA STREETCAR': 'Barbarella',
+    'BAREFOOT MANCHURIAN': 'The Manchurian Candidate',
+    'BASIC EASY': 'Easy Rider',
+    'BEACH HEARTBREAKERS': 'Heartbreakers',
+    'BEAR GRACELAND': 'Graceland',
+    'BEAST HUNCHBACK': 'The Hunchback of Notre Dame',
+    'BEAUTY GREASE': 'Grease',
+    'BED HIGHBALL': 'High Society',
+    'BEDAZZLED MARRIED': 'Bedazzled',
+    'BEETHOVEN EXORCIST': 'The Exorcist'
+})
+
+# Популярные фильмы по годам (резерв, если название не сопоставлено)
+POPULAR_BY_YEAR = MappingProxyType({
+    2006: ('The Departed', 'Casino Royale', 'Pirates of the Caribbean: Dead Man\'s Chest', 'The Devil Wears Prada', 'Ice Age: The Meltdown'),
+    2005: ('Star Wars: Episode III', 'Harry Potter and the Goblet of Fire', 'The Chronicles of Narnia', 'War of the Worlds', 'King Kong'),
+    2004: ('Shrek 2', 'Spider-Man 2', 'The Incredibles', 'Harry Potter and the Prisoner of Azkaban', 'I, Robot'),
+    2003: ('Finding Nemo', 'The Lord of the Rings: The Return of the King', 'Pirates of the Caribbean', 'The Matrix Reloaded', 'X2: X-Men United'),
+    2002: ('Spider-Man', 'The Lord of the Rings: The Two Towers', 'Star Wars: Episode II', 'Harry Potter and the Chamber of Secrets', 'Ice Age'),
+    2001: ('Harry Potter and the Philosopher\'s Stone', 'The Lord of the Rings: The Fellowship of the Ring', 'Shrek', 'Monsters, Inc.', 'The Fast and the Furious'),
+    2000: ('Gladiator', 'Cast Away', 'What Women Want', 'Dinosaur', 'How the Grinch Stole Christmas'),
+    1999: ('Star Wars: Episode I', 'The Sixth Sense', 'Toy Story 2', 'Austin Powers: The Spy Who Shagged Me', 'The Matrix'),
+    1998: ('Titanic', 'Armageddon', 'Saving Private Ryan', 'There\'s Something About Mary', 'The Truman Show'),
+    1997: ('The Lost World: Jurassic Park', 'Men in Black', 'Tomorrow Never Dies', 'Air Force One', 'As Good as It Gets')
+})
+
+# Популярные фильмы без привязки к году (последний резерв)
+FALLBACK_MOVIES = (
+    'The Shawshank Redemption', 'The Godfather', 'The Dark Knight', 'Pulp Fiction',
+    'The Lord of the Rings: The Return of the King', 'Forrest Gump', 'Star Wars',
+    'The Matrix', 'Goodfellas', 'One Flew Over the Cuckoo\'s Nest', 'Inception',
+    'The Empire Strikes Back', 'The Silence of the Lambs', 'Saving Private Ryan',
+    'Schindler\'s List', 'Casablanca', 'The Departed', 'The Prestige',
+    'Gladiator', 'Titanic', 'The Lion King', 'Back to the Future',
+    'Terminator 2: Judgment Day', 'Alien', 'Raiders of the Lost Ark',
+    'Jurassic Park', 'The Avengers', 'Iron Man', 'Spider-Man', 'Batman Begins',
+)
+
+DEFAULT_POSTERS = ('🎬', '🎥', '📽️', '🎞️', '🍿', '🎪', '🎭', '🎨', '🌟', '✨')
+
+# Слова, не влияющие на сопоставление
+STOP_WORDS = frozenset({
+    "a", "an", "and", "as", "at", "by", "for", "from", "in", "into", "is", "it",
+    "of", "on", "or", "the", "to", "who", "with", "i", "ii", "iii", "episode",
+})
+
+# Минимальное сходство слов по триграммам (коэффициент Жаккара)
+WORD_SIMILARITY_THRESHOLD = 0.4
+# Минимальная оценка сопоставления названия (доля совпавших слов с весом сходства)
+TITLE_SCORE_THRESHOLD = 0.2
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def stable_hash(text: str) -> int:
+    """
+    Хеш строки, одинаковый во всех процессах и запусках
+
+    Args:
+        text (str): Строка
+
+    Returns:
+        int: Неотрицательное 64-битное число
+    """
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def stable_choice(options: Tuple[str, ...], key: str) -> str:
+    """Детерминированный выбор элемента по ключу"""
+    return options[stable_hash(key) % len(options)]
+
+
+def normalize_words(title: str) -> List[str]:
+    """Значимые слова названия: нижний регистр, без диакритики, без служебных слов"""
+    text = unicodedata.normalize("NFKD", title.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return [word for word in _WORD_RE.findall(text) if word not in STOP_WORDS]
+
+
+def trigrams(word: str) -> FrozenSet[str]:
+    """Триграммы слова с границами (как в pg_trgm)"""
+    padded = f"  {word} "
+    return frozenset(padded[index:index + 3] for index in range(len(padded) - 2))
+
+
+class TitleMatcher:
+    """Поиск реального фильма с наибольшим пересечением слов названия"""
+
+    def __init__(self, titles: Iterable[str]):
+        """
+        Args:
+            titles (Iterable[str]): Каталог реальных названий
+        """
+        self.titles: Tuple[str, ...] = tuple(sorted(set(titles)))
+        self._title_words: Dict[str, FrozenSet[str]] = {}
+        # Слово -> названия каталога, в которых оно есть
+        self._word_titles: Dict[str, Set[str]] = {}
+        # Триграмма -> слова каталога
+        self._trigram_words: Dict[str, Set[str]] = {}
+        self._word_trigrams: Dict[str, FrozenSet[str]] = {}
+        for title in self.titles:
+            words = frozenset(normalize_words(title))
+            self._title_words[title] = words
+            for word in words:
+                self._word_titles.setdefault(word, set()).add(title)
+                if word not in self._word_trigrams:
+                    self._word_trigrams[word] = trigrams(word)
+                    for trigram in self._word_trigrams[word]:
+                        self._trigram_words.setdefault(trigram, set()).add(word)
+
+    def similar_words(self, word: str) -> Dict[str, float]:
+        """
+        Слова каталога, похожие на word
+
+        Returns:
+            Dict[str, float]: {слово: сходство от WORD_SIMILARITY_THRESHOLD до 1}
+        """
+        if word in self._word_titles:
+            return {word: 1.0}
+        if len(word) < 4:
+            # Короткие слова сравниваются только точно
+            return {}
+        word_trigrams = trigrams(word)
+        shared: Dict[str, int] = {}
+        for trigram in word_trigrams:
+            for candidate in self._trigram_words.get(trigram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        similar = {}
+        for candidate, common in shared.items():
+            union = len(word_trigrams) + len(self._word_trigrams[candidate]) - common
+            similarity = common / union
+            if similarity >= WORD_SIMILARITY_THRESHOLD:
+                similar[candidate] = similarity
+        return similar
+
+    def match(self, title: str) -> Optional[Tuple[str, float]]:
+        """
+        Реальный фильм, ближайший к названию
+
+        Оценка - доля слов названия, найденных в реальном названии (с весом сходства).
+        При равной оценке выбирается название с большей долей совпавших собственных
+        слов, затем - по алфавиту, поэтому результат детерминирован.
+
+        Args:
+            title (str): Вымышленное название
+
+        Returns:
+            Optional[Tuple[str, float]]: (реальное название, оценка) или None
+        """
+        words = normalize_words(title)
+        if not words:
+            return None
+        # Название каталога -> {слово каталога: лучшее сходство}
+        matched: Dict[str, Dict[str, float]] = {}
+        for word in set(words):
+            for candidate, similarity in self.similar_words(word).items():
+                for real_title in self._word_titles[candidate]:
+                    best = matched.setdefault(real_title, {})
+                    best[candidate] = max(best.get(candidate, 0.0), similarity)
+        best_match = None
+        for real_title, similarities in matched.items():
+            score = sum(similarities.values()) / len(set(words))
+            coverage = len(similarities) / len(self._title_words[real_title])
+            rank = (score, coverage, real_title)
+            if best_match is None or rank[:2] > best_match[:2] or (
+                    rank[:2] == best_match[:2] and real_title < best_match[2]):
+                best_match = rank
+        if best_match is None or best_match[0] < TITLE_SCORE_THRESHOLD:
+            return None
+        return best_match[2], round(best_match[0], 3)
+
+
+def _catalog() -> List[str]:
+    """Все реальные названия из таблиц модуля"""
+    titles = list(SAKILA_TO_REAL.values()) + list(FALLBACK_MOVIES)
+    for movies in POPULAR_BY_YEAR.values():
+        titles.extend(movies)
+    return titles
+
+
+TITLE_MATCHER = TitleMatcher(_catalog())
+
+
+@lru_cache(maxsize=4096)
+def match_real_title(sakila_title: str) -> Optional[str]:
+    """
+    Реальное название для вымышленного: точное сопоставление или ближайшее по словам
+
+    Args:
+        sakila_title (str): Название из Sakila
+
+    Returns:
+        Optional[str]: Реальное название или None
+    """
+    exact = SAKILA_TO_REAL.get(sakila_title.upper())
+    if exact is not None:
+        return exact
+    match = TITLE_MATCHER.match(sakila_title)
+    return match[0] if match else None
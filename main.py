@@ -3,23 +3,72 @@ Film Search Project - FastAPI Web Application
 Главный модуль приложения
 """
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import os
 
-from app.routes import films
+from app.routes import films, export, posters, actors
+from app.dependencies import (
+    lifespan, backends_readiness, mysql_replicas_status, get_mysql_db, get_log_writer, get_log_stats
+)
+from app.database.mysql_connector import MySQLConnector
+from app.logging.log_stats import LogStats
+from app.logging.log_writer import LogWriter
+from app.middleware.admission import AdmissionControlMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.etag import ETagMiddleware
+from app.middleware.query_control import QueryControlMiddleware
+from app.utils.static_files import PrecompressedStaticFiles, precompressed_file_response
+from app.settings import (
+    COMPRESSION_MIN_SIZE, COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY, STATIC_DIST_DIR,
+    ADMISSION_PATH_PREFIXES, ADMISSION_INITIAL_LIMIT, ADMISSION_MIN_LIMIT, ADMISSION_MAX_LIMIT,
+    ADMISSION_LATENCY_TARGET_MS, ADMISSION_DEGRADE_AT, ADMISSION_RETRY_AFTER, ETAG_PATH_PREFIXES,
+    CANCEL_ON_DISCONNECT_PREFIXES, MYSQL_MAX_EXECUTION_TIME_MS
+)
 
 # Инициализация FastAPI приложения
 app = FastAPI(
     title="Film Search API",
     description="API для поиска фильмов из базы данных Sakila",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+# Отмена работы при отключении клиента и лимиты времени запросов MySQL по путям
+app.add_middleware(
+    QueryControlMiddleware,
+    cancel_prefixes=tuple(CANCEL_ON_DISCONNECT_PREFIXES),
+    time_limits=dict(MYSQL_MAX_EXECUTION_TIME_MS),
+)
+
+# Адаптивный лимит одновременных запросов поиска: 503 + Retry-After при перегрузке
+app.add_middleware(
+    AdmissionControlMiddleware,
+    path_prefixes=tuple(ADMISSION_PATH_PREFIXES),
+    initial_limit=ADMISSION_INITIAL_LIMIT,
+    min_limit=ADMISSION_MIN_LIMIT,
+    max_limit=ADMISSION_MAX_LIMIT,
+    latency_target_ms=ADMISSION_LATENCY_TARGET_MS,
+    degrade_at=ADMISSION_DEGRADE_AT,
+    retry_after=ADMISSION_RETRY_AFTER,
 )
 
-# Подключение CORS для кросс-доменных запросов
+# ETag для JSON ответов API: 304 клиенту с актуальной копией (до сжатия)
+app.add_middleware(ETagMiddleware, path_prefixes=tuple(ETAG_PATH_PREFIXES))
+
+# Сжатие JSON ответов (brotli/gzip)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MIN_SIZE,
+    gzip_level=COMPRESSION_GZIP_LEVEL,
+    brotli_quality=COMPRESSION_BROTLI_QUALITY,
+)
+
+# Подключение CORS для кросс-доменных запросов: добавляется последним, чтобы быть внешним
+# слоем: заголовки CORS получают и ответы 503/499 внутренних middleware
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -28,28 +77,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Собранные статические файлы (python -m tools.build_static): хеш в имени, .br/.gz варианты
+if os.path.exists(STATIC_DIST_DIR):
+    app.mount("/static/dist", PrecompressedStaticFiles(directory=STATIC_DIST_DIR), name="static_dist")
+
 # Подключение статических файлов (CSS, JS, изображения)
 if os.path.exists("static"):
     app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Подключение маршрутов
 app.include_router(films.router)
+app.include_router(export.router)
+app.include_router(posters.router)
+app.include_router(actors.router)
 
 
 @app.get("/")
-async def root():
-    """Главная страница приложения"""
+async def root(request: Request):
+    """Главная страница приложения (собранная версия, если есть)"""
+    dist_index = os.path.join(STATIC_DIST_DIR, "index.html")
+    if os.path.exists(dist_index):
+        return precompressed_file_response(dist_index, request.headers.get("accept-encoding", ""))
     return FileResponse("static/index.html")
 
 
 @app.get("/health")
-async def health_check():
-    """Проверка здоровья приложения"""
-    return {"status": "ok"}
+async def health_check(
+    mysql_db: MySQLConnector = Depends(get_mysql_db),
+    log_writer: LogWriter = Depends(get_log_writer),
+    log_stats: LogStats = Depends(get_log_stats)
+):
+    """
+    Проверка здоровья приложения и готовности подключений к БД
+
+    Клиенты берутся из зависимостей, поэтому тесты подменяют их через app.dependency_overrides.
+    """
+    backends = backends_readiness({
+        "mysql_db": mysql_db, "log_writer": log_writer, "log_stats": log_stats
+    })
+    return {
+        "status": "ok" if all(backends.values()) else "degraded",
+        "backends": backends,
+        "mysql_replicas": mysql_replicas_status(mysql_db)
+    }
 
 
 if __name__ == "__main__":
-    # Запуск сервера Uvicorn на localhost:8000
+    # Запуск сервера Uvicorn на localhost:8000 (режим разработки)
+    # Для production: python -m app.server
     uvicorn.run(
         "main:app",
         host="127.0.0.1",
@@ -8,6 +8,178 @@ const API_BASE = '/api';
 // Глобальная переменная для хранения текущей функции поиска
 window.currentSearchFunction = null;
 
+// ===== КЕШ ОТВЕТОВ API =====
+
+// Ответы хранятся в памяти и в IndexedDB по URL вместе с ETag. Пока ответ свежий,
+// он используется без запроса; устаревший проверяется на сервере по If-None-Match
+// (304 - тело не передаётся).
+const CACHE_DB_NAME = 'film-search-cache';
+const CACHE_STORE = 'responses';
+const CACHE_MAX_ENTRIES = 300;
+// Время свежести: результаты поиска и справочники (жанры, актёры, годы)
+const SEARCH_FRESH_MS = 60 * 1000;
+const REFERENCE_FRESH_MS = 10 * 60 * 1000;
+
+const memoryCache = new Map();      // url -> {url, etag, data, storedAt}
+const prefetchRequests = new Map(); // url -> Promise предзагрузки
+const activeRequests = {};          // containerId -> AbortController текущего поиска
+let cacheDbPromise = null;
+
+function openCacheDb() {
+    if (!window.indexedDB) {
+        return Promise.resolve(null);
+    }
+    if (!cacheDbPromise) {
+        cacheDbPromise = new Promise(resolve => {
+            const request = indexedDB.open(CACHE_DB_NAME, 1);
+            request.onupgradeneeded = () => {
+                const store = request.result.createObjectStore(CACHE_STORE, { keyPath: 'url' });
+                store.createIndex('storedAt', 'storedAt');
+            };
+            request.onsuccess = () => resolve(request.result);
+            // Без IndexedDB (приватный режим и т.п.) работает только кеш в памяти
+            request.onerror = () => resolve(null);
+        });
+    }
+    return cacheDbPromise;
+}
+
+async function readStoredEntry(url) {
+    const db = await openCacheDb();
+    if (!db) {
+        return null;
+    }
+    return new Promise(resolve => {
+        const request = db.transaction(CACHE_STORE).objectStore(CACHE_STORE).get(url);
+        request.onsuccess = () => resolve(request.result || null);
+        request.onerror = () => resolve(null);
+    });
+}
+
+async function writeStoredEntry(entry) {
+    const db = await openCacheDb();
+    if (!db) {
+        return;
+    }
+    const store = db.transaction(CACHE_STORE, 'readwrite').objectStore(CACHE_STORE);
+    store.put(entry);
+    // Удаление самых старых записей сверх лимита
+    store.count().onsuccess = (event) => {
+        let excess = event.target.result - CACHE_MAX_ENTRIES;
+        if (excess <= 0) {
+            return;
+        }
+        store.index('storedAt').openCursor().onsuccess = (cursorEvent) => {
+            const cursor = cursorEvent.target.result;
+            if (cursor && excess-- > 0) {
+                cursor.delete();
+                cursor.continue();
+            }
+        };
+    };
+}
+
+function rememberEntry(entry) {
+    // Map хранит порядок вставки: первая запись - давно не использованная
+    memoryCache.delete(entry.url);
+    memoryCache.set(entry.url, entry);
+    if (memoryCache.size > CACHE_MAX_ENTRIES) {
+        memoryCache.delete(memoryCache.keys().next().value);
+    }
+}
+
+async function cachedFetch(url, { signal = null, freshMs = SEARCH_FRESH_MS, priority = 'auto' } = {}) {
+    let entry = memoryCache.get(url) || await readStoredEntry(url);
+    if (entry && Date.now() - entry.storedAt < freshMs) {
+        rememberEntry(entry);
+        return entry.data;
+    }
+
+    const headers = entry && entry.etag ? { 'If-None-Match': entry.etag } : {};
+    const response = await fetch(url, { headers, signal, priority });
+
+    if (response.status === 304 && entry) {
+        entry = { ...entry, storedAt: Date.now() };
+    } else {
+        const data = await response.json();
+        // Ошибки и облегчённые ответы при перегрузке не кешируются
+        if (!response.ok || data.error || response.headers.get('X-Degraded')) {
+            return data;
+        }
+        entry = { url, etag: response.headers.get('ETag'), data, storedAt: Date.now() };
+    }
+    rememberEntry(entry);
+    writeStoredEntry(entry);
+    return entry.data;
+}
+
+function prefetch(url) {
+    // Предзагрузка не отменяется новым поиском и не выполняется в режиме экономии трафика
+    if (prefetchRequests.has(url) || (navigator.connection && navigator.connection.saveData)) {
+        return;
+    }
+    const request = cachedFetch(url, { priority: 'low' })
+        .catch(error => console.debug('Предзагрузка не выполнена:', error))
+        .finally(() => prefetchRequests.delete(url));
+    prefetchRequests.set(url, request);
+}
+
+function replaceRequest(containerId) {
+    // Новый поиск в контейнере отменяет предыдущий незавершённый запрос
+    if (activeRequests[containerId]) {
+        activeRequests[containerId].abort();
+    }
+    const controller = new AbortController();
+    activeRequests[containerId] = controller;
+    return controller;
+}
+
+async function loadResults(containerId, pageUrl, page) {
+    const controller = replaceRequest(containerId);
+    const url = pageUrl(page);
+
+    showLoading(containerId);
+
+    try {
+        // Страница уже предзагружается - дожидаемся её вместо второго запроса
+        if (prefetchRequests.has(url)) {
+            await prefetchRequests.get(url);
+        }
+        const data = await cachedFetch(url, { signal: controller.signal });
+        if (controller.signal.aborted) {
+            return;
+        }
+
+        if (data.error) {
+            showError(containerId, data.message || 'Ошибка при поиске');
+            return;
+        }
+
+        displayResults(
+            containerId,
+            data.films,
+            data.total_count,
+            data.page,
+            data.page_size
+        );
+
+        // Следующая страница загружается, пока пользователь смотрит текущую
+        if (data.page * data.page_size < data.total_count) {
+            prefetch(pageUrl(data.page + 1));
+        }
+    } catch (error) {
+        if (error.name === 'AbortError') {
+            return;
+        }
+        console.error('Ошибка:', error);
+        showError(containerId, 'Ошибка подключения к серверу');
+    } finally {
+        if (activeRequests[containerId] === controller) {
+            delete activeRequests[containerId];
+        }
+    }
+}
+
 // ===== ПЕРЕКЛЮЧЕНИЕ ВКЛАДОК =====
 
 function switchTab(tabName) {
@@ -20,6 +192,11 @@ function switchTab(tabName) {
     document.getElementById(tabName).classList.add('active');
     event.target.classList.add('active');
 
+    // Поток статистики нужен только на вкладке статистики
+    if (tabName !== 'stats') {
+        stopStatsStream();
+    }
+
     // Загрузка данных при открытии вкладок
     if (tabName === 'genre') {
         loadGenres();
@@ -36,8 +213,7 @@ function switchTab(tabName) {
 
 async function loadGenres() {
     try {
-        const response = await fetch(`${API_BASE}/genres`);
-        const genres = await response.json();
+        const genres = await cachedFetch(`${API_BASE}/genres`, { freshMs: REFERENCE_FRESH_MS });
 
         const select = document.getElementById('genre-select');
         select.innerHTML = '<option value="">-- Выберите жанр --</option>';
@@ -66,8 +242,10 @@ async function loadGenres() {
 
 async function updateYearRangeForGenre(genre) {
     try {
-        const response = await fetch(`${API_BASE}/year-range-for-genre?genre=${encodeURIComponent(genre)}`);
-        const data = await response.json();
+        const data = await cachedFetch(
+            `${API_BASE}/year-range-for-genre?genre=${encodeURIComponent(genre)}`,
+            { freshMs: REFERENCE_FRESH_MS }
+        );
 
         document.getElementById('year-from').value = data.min_year;
         document.getElementById('year-from').min = data.min_year;
@@ -91,8 +269,7 @@ async function updateYearRangeForGenre(genre) {
 
 async function loadActors() {
     try {
-        const response = await fetch(`${API_BASE}/actors`);
-        const actors = await response.json();
+        const actors = await cachedFetch(`${API_BASE}/actors`, { freshMs: REFERENCE_FRESH_MS });
 
         const select = document.getElementById('actor-select');
         select.innerHTML = '<option value="">-- Выберите актёра --</option>';
@@ -112,8 +289,7 @@ async function loadActors() {
 
 async function loadYearRange() {
     try {
-        const response = await fetch(`${API_BASE}/year-range`);
-        const data = await response.json();
+        const data = await cachedFetch(`${API_BASE}/year-range`, { freshMs: REFERENCE_FRESH_MS });
 
         document.getElementById('year-from').value = data.min_year;
         document.getElementById('year-from').min = data.min_year;
@@ -129,6 +305,7 @@ async function loadYearRange() {
 
 async function searchByKeyword(page = 1) {
     const keyword = document.getElementById('keyword-input').value.trim();
+    const mode = document.getElementById('keyword-fuzzy').checked ? 'fuzzy' : 'exact';
 
     if (!keyword) {
         showError('keyword-results', 'Пожалуйста, введите название фильма');
@@ -138,30 +315,11 @@ async function searchByKeyword(page = 1) {
     // Сохраняем функцию поиска для пагинации
     window.currentSearchFunction = (p) => searchByKeyword(p);
 
-    showLoading('keyword-results');
-
-    try {
-        const response = await fetch(
-            `${API_BASE}/search/keyword?q=${encodeURIComponent(keyword)}&page=${page}`
-        );
-        const data = await response.json();
-
-        if (data.error) {
-            showError('keyword-results', data.message || 'Ошибка при поиске');
-            return;
-        }
-
-        displayResults(
-            'keyword-results',
-            data.films,
-            data.total_count,
-            data.page,
-            data.page_size
-        );
-    } catch (error) {
-        console.error('Ошибка:', error);
-        showError('keyword-results', 'Ошибка подключения к серверу');
-    }
+    await loadResults(
+        'keyword-results',
+        (p) => `${API_BASE}/search/keyword?q=${encodeURIComponent(keyword)}&mode=${mode}&page=${p}`,
+        page
+    );
 }
 
 // ===== ПОИСК ПО ЖАНРУ И ГОДУ =====
@@ -184,30 +342,11 @@ async function searchByGenreYear(page = 1) {
     // Сохраняем функцию поиска для пагинации
     window.currentSearchFunction = (p) => searchByGenreYear(p);
 
-    showLoading('genre-results');
-
-    try {
-        const response = await fetch(
-            `${API_BASE}/search/genre-year?genre=${encodeURIComponent(genre)}&year_from=${yearFrom}&year_to=${yearTo}&page=${page}`
-        );
-        const data = await response.json();
-
-        if (data.error) {
-            showError('genre-results', data.message || 'Ошибка при поиске');
-            return;
-        }
-
-        displayResults(
-            'genre-results',
-            data.films,
-            data.total_count,
-            data.page,
-            data.page_size
-        );
-    } catch (error) {
-        console.error('Ошибка:', error);
-        showError('genre-results', 'Ошибка подключения к серверу');
-    }
+    await loadResults(
+        'genre-results',
+        (p) => `${API_BASE}/search/genre-year?genre=${encodeURIComponent(genre)}&year_from=${yearFrom}&year_to=${yearTo}&page=${p}`,
+        page
+    );
 }
 
 // ===== ПОИСК ПО ГОДУ =====
@@ -224,30 +363,11 @@ async function searchByYear(page = 1) {
     // Сохраняем функцию поиска для пагинации
     window.currentSearchFunction = (p) => searchByYear(p);
 
-    showLoading('year-results');
-
-    try {
-        const response = await fetch(
-            `${API_BASE}/search/year?year_from=${yearFrom}&year_to=${yearTo}&page=${page}`
-        );
-        const data = await response.json();
-
-        if (data.error) {
-            showError('year-results', data.message || 'Ошибка при поиске');
-            return;
-        }
-
-        displayResults(
-            'year-results',
-            data.films,
-            data.total_count,
-            data.page,
-            data.page_size
-        );
-    } catch (error) {
-        console.error('Ошибка:', error);
-        showError('year-results', 'Ошибка подключения к серверу');
-    }
+    await loadResults(
+        'year-results',
+        (p) => `${API_BASE}/search/year?year_from=${yearFrom}&year_to=${yearTo}&page=${p}`,
+        page
+    );
 }
 
 // ===== ПОИСК ПО ИМЕНИ АКТЁРА =====
@@ -263,30 +383,11 @@ async function searchByActorName(page = 1) {
     // Сохраняем функцию поиска для пагинации
     window.currentSearchFunction = (p) => searchByActorName(p);
 
-    showLoading('actor-results');
-
-    try {
-        const response = await fetch(
-            `${API_BASE}/search/actor-by-name?name=${encodeURIComponent(name)}&page=${page}`
-        );
-        const data = await response.json();
-
-        if (data.error) {
-            showError('actor-results', data.message || 'Ошибка при поиске');
-            return;
-        }
-
-        displayResults(
-            'actor-results',
-            data.films,
-            data.total_count,
-            data.page,
-            data.page_size
-        );
-    } catch (error) {
-        console.error('Ошибка:', error);
-        showError('actor-results', 'Ошибка подключения к серверу');
-    }
+    await loadResults(
+        'actor-results',
+        (p) => `${API_BASE}/search/actor-by-name?name=${encodeURIComponent(name)}&mode=fuzzy&page=${p}`,
+        page
+    );
 }
 
 // ===== ПОИСК ПО АКТЁРУ =====
@@ -302,30 +403,11 @@ async function searchByActor(page = 1) {
     // Сохраняем функцию поиска для пагинации
     window.currentSearchFunction = (p) => searchByActor(p);
 
-    showLoading('actor-results');
-
-    try {
-        const response = await fetch(
-            `${API_BASE}/search/actor?actor_id=${actorId}&page=${page}`
-        );
-        const data = await response.json();
-
-        if (data.error) {
-            showError('actor-results', data.message || 'Ошибка при поиске');
-            return;
-        }
-
-        displayResults(
-            'actor-results',
-            data.films,
-            data.total_count,
-            data.page,
-            data.page_size
-        );
-    } catch (error) {
-        console.error('Ошибка:', error);
-        showError('actor-results', 'Ошибка подключения к серверу');
-    }
+    await loadResults(
+        'actor-results',
+        (p) => `${API_BASE}/search/actor?actor_id=${actorId}&page=${p}`,
+        page
+    );
 }
 
 // ===== ОТОБРАЖЕНИЕ РЕЗУЛЬТАТОВ С ПАГИНАЦИЕЙ =====
@@ -359,9 +441,9 @@ function displayResults(containerId, films, totalCount, currentPage, pageSize) {
 
         // Определяем тип постера и создаем соответствующий элемент
         let posterElement;
-        if (film.poster && film.poster.startsWith('http')) {
-            // Это URL изображения
-            posterElement = `<img src="${film.poster}" alt="${escapeHtml(film.title)}" class="film-poster-image" onerror="this.style.display='none'; this.nextElementSibling.style.display='flex';">
+        if (film.poster && (film.poster.startsWith('http') || film.poster.startsWith('/'))) {
+            // Это URL изображения (TMDB или локальный кэш /api/posters)
+            posterElement = `<img src="${film.poster}" loading="lazy" alt="${escapeHtml(film.title)}" class="film-poster-image" onerror="this.style.display='none'; this.nextElementSibling.style.display='flex';">
                             <div class="film-poster-fallback" style="display:none;">🎬</div>`;
         } else {
             // Это эмодзи
@@ -424,7 +506,68 @@ function displayResults(containerId, films, totalCount, currentPage, pageSize) {
 
 // ===== СТАТИСТИКА =====
 
-async function loadStats() {
+// Поток статистики в реальном времени (/api/stats/stream)
+let statsSource = null;
+let liveRecentSearches = [];
+const RECENT_STATS_LIMIT = 5;
+
+function loadStats() {
+    if (!window.EventSource) {
+        loadStatsOnce();
+        return;
+    }
+    startStatsStream();
+}
+
+function stopStatsStream() {
+    if (statsSource) {
+        statsSource.close();
+        statsSource = null;
+    }
+}
+
+function startStatsStream() {
+    if (statsSource) {
+        return;
+    }
+    showLoading('popular-stats');
+    showLoading('recent-stats');
+
+    statsSource = new EventSource(`${API_BASE}/stats/stream`);
+
+    statsSource.addEventListener('snapshot', (event) => {
+        const data = JSON.parse(event.data);
+        liveRecentSearches = data.recent;
+        displayPopularStats(data.popular);
+        displayRecentStats(liveRecentSearches);
+    });
+
+    statsSource.addEventListener('update', (event) => {
+        const data = JSON.parse(event.data);
+        if (data.popular) {
+            displayPopularStats(data.popular);
+        }
+        if (!data.search) {
+            return;
+        }
+        // Новый поиск - в начало списка, без повторов того же поиска
+        const key = JSON.stringify([data.search.search_type, data.search.params]);
+        liveRecentSearches = [data.search].concat(
+            liveRecentSearches.filter(item => JSON.stringify([item.search_type, item.params]) !== key)
+        ).slice(0, RECENT_STATS_LIMIT);
+        displayRecentStats(liveRecentSearches);
+    });
+
+    statsSource.onerror = () => {
+        // Браузер переподключается сам; если поток закрыт окончательно - разовая загрузка
+        if (statsSource && statsSource.readyState === EventSource.CLOSED) {
+            statsSource = null;
+            loadStatsOnce();
+        }
+    };
+}
+
+async function loadStatsOnce() {
     showLoading('popular-stats');
     showLoading('recent-stats');
 
@@ -0,0 +1,60 @@
+"""
+/health с локальными заменами клиентов БД через app.dependency_overrides
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.dependencies import get_log_stats, get_log_writer, get_mysql_db
+
+
+class StubClient:
+    """Заглушка клиента БД с заданной готовностью"""
+
+    def __init__(self, is_ready: bool):
+        self.is_ready = is_ready
+
+
+class StubReplicaPool:
+    def status(self) -> list:
+        return [{"name": "replica-1", "healthy": True}]
+
+
+@pytest.fixture
+def override_clients():
+    def override(mysql_db, log_writer, log_stats):
+        main.app.dependency_overrides.update({
+            get_mysql_db: lambda: mysql_db,
+            get_log_writer: lambda: log_writer,
+            get_log_stats: lambda: log_stats,
+        })
+        return TestClient(main.app)
+
+    yield override
+    main.app.dependency_overrides.clear()
+
+
+def test_health_ok(override_clients):
+    mysql_db = StubClient(True)
+    mysql_db.replica_pool = StubReplicaPool()
+    client = override_clients(mysql_db, StubClient(True), StubClient(True))
+
+    response = client.get("/health")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "status": "ok",
+        "backends": {"mysql_db": True, "log_writer": True, "log_stats": True},
+        "mysql_replicas": [{"name": "replica-1", "healthy": True}],
+    }
+
+
+def test_health_degraded(override_clients):
+    client = override_clients(StubClient(True), StubClient(False), StubClient(False))
+
+    body = client.get("/health").json()
+
+    assert body["status"] == "degraded"
+    assert body["backends"] == {"mysql_db": True, "log_writer": False, "log_stats": False}
+    assert body["mysql_replicas"] == []
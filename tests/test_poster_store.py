@@ -0,0 +1,111 @@
+"""
+Локальный кэш постеров с заглушкой fetcher вместо загрузки из TMDB
+"""
+
+import hashlib
+import os
+from typing import Dict, List, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import app.routes.posters as posters
+import app.utils.poster_store as poster_store_module
+from app.dependencies import get_mysql_db, get_poster_store
+from app.utils.poster_store import PosterStore
+from app.utils.static_files import IMMUTABLE_CACHE_CONTROL
+
+POSTER_URL = "https://image.tmdb.org/t/p/w500/academy.jpg"
+SAME_IMAGE_URL = "https://image.tmdb.org/t/p/w500/academy-copy.jpg"
+IMAGE = b"\xff\xd8\xff\xe0 poster bytes"
+
+
+class StubFetcher:
+    """Изображения из словаря {URL: содержимое}; загруженные URL запоминаются"""
+
+    def __init__(self, images: Dict[str, bytes]):
+        self.images = images
+        self.fetched: List[str] = []
+
+    def fetch(self, url: str) -> Tuple[bytes, str]:
+        self.fetched.append(url)
+        return self.images[url], "image/jpeg"
+
+
+class StubMySQL:
+    def get_film_details(self, film_id: int):
+        return {"film_id": film_id, "title": "ACADEMY DINOSAUR", "release_year": 2006}
+
+
+def object_files(directory: str) -> List[str]:
+    return [name for _, _, names in os.walk(os.path.join(directory, "objects")) for name in names]
+
+
+@pytest.fixture
+def fetcher() -> StubFetcher:
+    return StubFetcher({
+        POSTER_URL: IMAGE,
+        SAME_IMAGE_URL: IMAGE,
+        "https://image.tmdb.org/t/p/w185/academy.jpg": b"small poster",
+    })
+
+
+@pytest.fixture
+def store(tmp_path, fetcher) -> PosterStore:
+    return PosterStore(str(tmp_path), fetcher)
+
+
+def test_content_addressed_dedup(store, fetcher, tmp_path):
+    first = store.get(POSTER_URL)
+    second = store.get(SAME_IMAGE_URL)
+
+    digest = hashlib.sha256(IMAGE).hexdigest()
+    assert first.digest == second.digest == digest
+    assert first.path == second.path
+    assert os.path.basename(first.path) == f"{digest}.jpg"
+    assert object_files(str(tmp_path)) == [f"{digest}.jpg"]
+
+    # Повторный запрос и новый экземпляр (индекс на диске) не загружают изображение снова
+    assert store.get(POSTER_URL) == first
+    assert PosterStore(str(tmp_path), fetcher).cached(POSTER_URL, "w500") == first
+    assert fetcher.fetched == [POSTER_URL, SAME_IMAGE_URL]
+
+
+def test_thumbnail_without_pillow(store, fetcher, monkeypatch):
+    monkeypatch.setattr(poster_store_module, "Image", None)
+
+    poster = store.get(POSTER_URL, "w185")
+
+    # Без Pillow загружается готовый размер TMDB
+    assert fetcher.fetched == ["https://image.tmdb.org/t/p/w185/academy.jpg"]
+    assert poster.digest == hashlib.sha256(b"small poster").hexdigest()
+
+
+@pytest.fixture
+def client(store, monkeypatch):
+    monkeypatch.setattr(posters, "get_poster_for_film", lambda title, year=None: POSTER_URL)
+    main.app.dependency_overrides.update({
+        get_mysql_db: StubMySQL,
+        get_poster_store: lambda: store,
+    })
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
+
+
+def test_poster_routes(client):
+    digest = hashlib.sha256(IMAGE).hexdigest()
+
+    response = client.get("/api/posters/1?size=w500", follow_redirects=False)
+    assert response.status_code == 307
+    assert response.headers["location"] == f"/api/posters/objects/{digest}.jpg"
+
+    response = client.get(response.headers["location"])
+    assert response.status_code == 200
+    assert response.content == IMAGE
+    assert response.headers["etag"] == f'"{digest}"'
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+    response = client.get(f"/api/posters/objects/{digest}.jpg", headers={"If-None-Match": f'"{digest}"'})
+    assert response.status_code == 304
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
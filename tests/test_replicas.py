@@ -0,0 +1,138 @@
+"""
+Маршрутизация чтений MySQL по репликам с подменённым драйвером mysql.connector
+
+Фальшивые подключения возвращают имя хоста, на котором выполнен запрос;
+хост из DOWN_HOSTS не принимает подключения, а уже открытое подключение к нему
+теряется при следующем запросе.
+"""
+
+import time
+
+import pytest
+from mysql.connector import InterfaceError, OperationalError
+
+import app.database.mysql_connector as mysql_connector
+from app.database.mysql_connector import MySQLConnector
+from app.database.replicas import LEAST_OUTSTANDING, ROUND_ROBIN
+
+DOWN_HOSTS = set()
+
+
+class FakeCursor:
+    def __init__(self, host: str):
+        self.host = host
+
+    def execute(self, query, params=None):
+        if self.host in DOWN_HOSTS:
+            raise OperationalError(msg="Lost connection to MySQL server during query", errno=2013)
+
+    def fetchall(self):
+        return [{"host": self.host}]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    connection_id = 1
+
+    def __init__(self, host: str):
+        self.host = host
+
+    def is_connected(self) -> bool:
+        return self.host not in DOWN_HOSTS
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self.host)
+
+    def close(self):
+        pass
+
+
+def fake_connect(**config):
+    if config["host"] in DOWN_HOSTS:
+        raise InterfaceError(msg="Can't connect to MySQL server", errno=2003)
+    return FakeConnection(config["host"])
+
+
+@pytest.fixture
+def make_db(monkeypatch):
+    monkeypatch.setattr(mysql_connector.mysql.connector, "connect", fake_connect)
+    created = []
+
+    def make(policy: str = ROUND_ROBIN, eviction_seconds: float = 60.0) -> MySQLConnector:
+        db = MySQLConnector(
+            {"host": "primary", "database": "sakila"}, retry_interval=0.01,
+            replicas=[{"host": "replica-a", "database": "sakila"},
+                      {"host": "replica-b", "database": "sakila"}],
+            replica_policy=policy, replica_failure_threshold=2,
+            replica_eviction_seconds=eviction_seconds
+        )
+        created.append(db)
+        return db
+
+    yield make
+    for db in created:
+        db.close()
+    DOWN_HOSTS.clear()
+
+
+def read_host(db: MySQLConnector) -> str:
+    return db._execute_query("SELECT 1")[0]["host"]
+
+
+def replica_status(db: MySQLConnector) -> dict:
+    return {item["host"]: item for item in db.replica_pool.status()}
+
+
+def test_round_robin(make_db):
+    db = make_db(ROUND_ROBIN)
+    assert [read_host(db) for _ in range(4)] == ["replica-a", "replica-b", "replica-a", "replica-b"]
+    # Запись выполняется на primary
+    assert db._execute_query("UPDATE film SET length = 1", read_only=False)[0]["host"] == "primary"
+
+
+def test_least_outstanding(make_db):
+    db = make_db(LEAST_OUTSTANDING)
+    replica_a = db.replica_pool.replicas[0]
+    with db.replica_pool.track(replica_a):
+        assert [read_host(db) for _ in range(3)] == ["replica-b"] * 3
+    assert read_host(db) == "replica-a"
+
+
+def test_eviction_after_failure_threshold(make_db):
+    db = make_db(ROUND_ROBIN)
+    DOWN_HOSTS.add("replica-a")
+
+    # Запрос на недоступной реплике переходит на следующую
+    assert {read_host(db) for _ in range(4)} == {"replica-b"}
+    status = replica_status(db)
+    assert status["replica-a"]["evicted"]
+    assert status["replica-a"]["failures"] == 2
+    assert not status["replica-b"]["evicted"]
+
+
+def test_readmission_after_eviction(make_db):
+    db = make_db(ROUND_ROBIN, eviction_seconds=0.05)
+    DOWN_HOSTS.add("replica-a")
+    for _ in range(4):
+        read_host(db)
+    assert replica_status(db)["replica-a"]["evicted"]
+
+    DOWN_HOSTS.clear()
+    replica_a = db.replica_pool.replicas[0]
+    assert replica_a.wait_ready(2)
+    time.sleep(0.06)
+
+    assert "replica-a" in {read_host(db) for _ in range(2)}
+    status = replica_status(db)
+    assert not status["replica-a"]["evicted"]
+    assert status["replica-a"]["failures"] == 0
+
+
+def test_fallback_to_primary(make_db):
+    db = make_db(ROUND_ROBIN)
+    DOWN_HOSTS.update({"replica-a", "replica-b"})
+
+    assert [read_host(db) for _ in range(3)] == ["primary"] * 3
+    assert all(item["evicted"] for item in replica_status(db).values())
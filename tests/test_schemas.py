@@ -0,0 +1,97 @@
+"""
+Соответствие ответов FastJSONResponse схемам app/models/schemas.py
+
+Маршруты отдают словари без проверки response_model, поэтому тест проверяет,
+что payload справочников и поиска по-прежнему проходят валидацию схем.
+MySQL заменён заглушкой в app.state.mysql_db.
+"""
+
+from typing import Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+import main
+from app.models.schemas import ActorResponse, GenreResponse, SearchResponse, YearRangeResponse
+
+FILMS = [
+    {"film_id": 1, "title": "ACADEMY DINOSAUR", "description": "An Epic Drama",
+     "release_year": 2006, "length": 86, "rating": "PG", "language_id": 1},
+    {"film_id": 2, "title": "ACE GOLDFINGER", "description": "An Astounding Epistle",
+     "release_year": 2006, "length": 48, "rating": "G", "language_id": 1},
+]
+
+
+class StubMySQL:
+    """Заглушка MySQLConnector с фиксированными данными"""
+
+    def get_all_genres(self) -> List[Dict]:
+        return [{"category_id": 1, "name": "Action"}, {"category_id": 7, "name": "Drama"}]
+
+    def get_all_actors(self) -> List[Dict]:
+        return [{"actor_id": 1, "first_name": "PENELOPE", "last_name": "GUINESS"}]
+
+    def get_year_range(self) -> Dict:
+        return {"min_year": 2000, "max_year": 2010}
+
+    def get_year_range_for_genre(self, genre: str) -> Dict:
+        return {"min_year": 2005, "max_year": 2006}
+
+    def search_by_genre(self, genre: str, page: int, page_size: int,
+                        use_cached_count: bool = False, with_description: bool = True):
+        return FILMS, len(FILMS)
+
+    def get_actors_for_films(self, film_ids: List[int]) -> Dict[int, List[str]]:
+        return {film_id: ["PENELOPE GUINESS"] for film_id in film_ids}
+
+    def get_categories_for_films(self, film_ids: List[int]) -> Dict[int, List[str]]:
+        return {film_id: ["Drama"] for film_id in film_ids}
+
+
+class StubLogWriter:
+    """Заглушка LogWriter: события поиска не записываются"""
+
+    def log_search(self, **kwargs) -> None:
+        pass
+
+
+@pytest.fixture
+def client():
+    # Без lifespan: подключения к БД не создаются
+    main.app.state.mysql_db = StubMySQL()
+    main.app.state.log_writer = StubLogWriter()
+    yield TestClient(main.app)
+    del main.app.state.mysql_db
+    del main.app.state.log_writer
+
+
+def test_genres(client):
+    response = client.get("/api/genres")
+    assert response.status_code == 200
+    genres = TypeAdapter(List[GenreResponse]).validate_python(response.json())
+    assert [genre.name for genre in genres] == ["Action", "Drama"]
+
+
+def test_actors(client):
+    response = client.get("/api/actors")
+    assert response.status_code == 200
+    actors = TypeAdapter(List[ActorResponse]).validate_python(response.json())
+    assert actors[0].full_name == "PENELOPE GUINESS"
+
+
+def test_year_range(client):
+    for path in ("/api/year-range", "/api/year-range-for-genre?genre=Drama"):
+        response = client.get(path)
+        assert response.status_code == 200
+        YearRangeResponse.model_validate(response.json())
+
+
+def test_search_by_genre(client):
+    # Без постеров: постер запрашивается у TMDB
+    response = client.get("/api/search/genre?genre=Drama&include=actors,categories,description")
+    assert response.status_code == 200
+    result = SearchResponse.model_validate(response.json())
+    assert result.total_count == 2
+    assert [film.film_id for film in result.films] == [1, 2]
+    assert result.films[0].actors == ["PENELOPE GUINESS"]
@@ -0,0 +1,97 @@
+"""
+Замер затрат CPU на сериализацию ответов /api/*
+
+Сравнивает прежний путь (Pydantic модели + jsonable_encoder + JSONResponse)
+с быстрым путём FastJSONResponse на синтетических строках, похожих на Sakila.
+
+Запуск:
+    python -m tools.bench_serialization
+"""
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from typing import List
+import timeit
+
+from app.models.schemas import GenreResponse, ActorResponse
+from app.utils.responses import FastJSONResponse, USE_ORJSON
+
+REPEAT = 200
+
+
+def make_films(count: int = 10) -> List[dict]:
+    """Синтетическая страница результатов поиска"""
+    return [
+        {
+            "film_id": i,
+            "title": f"FILM TITLE {i}",
+            "description": "A Epic Drama of a Feminist And a Mad Scientist who must Battle a Teacher",
+            "release_year": 2006,
+            "length": 86 + i,
+            "rating": "PG",
+            "actors": [f"ACTOR {j} NAME {j}" for j in range(8)],
+            "categories": ["Documentary"],
+            "poster": "🎬",
+        }
+        for i in range(count)
+    ]
+
+
+def make_actors(count: int = 100) -> List[dict]:
+    """Синтетические строки таблицы actor"""
+    return [{"actor_id": i, "first_name": f"FIRST{i}", "last_name": f"LAST{i}"} for i in range(count)]
+
+
+def old_search(films: List[dict]) -> bytes:
+    content = {"total_count": 1000, "page": 1, "page_size": 10, "films": films}
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def new_search(films: List[dict]) -> bytes:
+    return FastJSONResponse({"total_count": 1000, "page": 1, "page_size": 10, "films": films}).body
+
+
+actors_adapter = TypeAdapter(List[ActorResponse])
+
+
+def old_actors(rows: List[dict]) -> bytes:
+    models = [
+        ActorResponse(
+            actor_id=a['actor_id'], first_name=a['first_name'], last_name=a['last_name'],
+            full_name=f"{a['first_name']} {a['last_name']}"
+        )
+        for a in rows
+    ]
+    # Повторная валидация через response_model
+    validated = actors_adapter.validate_python([m.model_dump() for m in models])
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def new_actors(rows: List[dict]) -> bytes:
+    return FastJSONResponse([
+        {
+            "actor_id": a['actor_id'], "first_name": a['first_name'], "last_name": a['last_name'],
+            "full_name": f"{a['first_name']} {a['last_name']}"
+        }
+        for a in rows
+    ]).body
+
+
+def measure(name: str, func, data) -> float:
+    seconds = timeit.timeit(lambda: func(data), number=REPEAT)
+    per_call_us = seconds / REPEAT * 1e6
+    print(f"{name:<32} {per_call_us:10.1f} мкс/ответ")
+    return per_call_us
+
+
+if __name__ == "__main__":
+    print(f"Сериализатор: {'orjson' if USE_ORJSON else 'json'}")
+    films = make_films()
+    actors = make_actors()
+    before = measure("search (jsonable_encoder)", old_search, films)
+    after = measure("search (FastJSONResponse)", new_search, films)
+    print(f"  ускорение: x{before / after:.1f}")
+    before = measure("actors (Pydantic + validation)", old_actors, actors)
+    after = measure("actors (FastJSONResponse)", new_actors, actors)
+    print(f"  ускорение: x{before / after:.1f}")
@@ -0,0 +1,93 @@
+"""
+Сборка статических файлов для production
+
+Создаёт в static/dist:
+- копии script.js и styles.css с хешем содержимого в имени
+- index.html со ссылками на файлы с хешем
+- сжатые варианты .gz и .br (если установлен brotli) для каждого файла
+- manifest.json с сопоставлением исходных и собранных имён
+
+Запуск:
+    python -m tools.build_static
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+
+# Исходные файлы, получающие хеш в имени (путь относительно static/)
+HASHED_ASSETS = ["js/script.js", "css/styles.css"]
+INDEX_FILE = "index.html"
+
+
+def content_hash(data: bytes) -> str:
+    """Короткий хеш содержимого для имени файла"""
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def write_with_variants(path: str, data: bytes) -> None:
+    """
+    Запись файла и его сжатых вариантов
+
+    Args:
+        path (str): Путь к файлу
+        data (bytes): Содержимое
+    """
+    with open(path, "wb") as file:
+        file.write(data)
+    # mtime=0 - сжатый файл не меняется при пересборке без изменений
+    with open(path + ".gz", "wb") as file:
+        file.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + ".br", "wb") as file:
+            file.write(brotli.compress(data, quality=11))
+
+
+def build() -> dict:
+    """
+    Сборка static/dist
+
+    Returns:
+        dict: Манифест {исходный URL: собранный URL}
+    """
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+    os.makedirs(DIST_DIR)
+
+    manifest = {}
+    for asset in HASHED_ASSETS:
+        with open(os.path.join(STATIC_DIR, asset), "rb") as file:
+            data = file.read()
+        name, ext = os.path.splitext(os.path.basename(asset))
+        hashed_name = f"{name}.{content_hash(data)}{ext}"
+        write_with_variants(os.path.join(DIST_DIR, hashed_name), data)
+        manifest[f"/static/{asset}"] = f"/static/dist/{hashed_name}"
+
+    with open(os.path.join(STATIC_DIR, INDEX_FILE), "r", encoding="utf-8") as file:
+        index_html = file.read()
+    for source_url, built_url in manifest.items():
+        index_html = index_html.replace(f'"{source_url}"', f'"{built_url}"')
+    write_with_variants(os.path.join(DIST_DIR, INDEX_FILE), index_html.encode("utf-8"))
+
+    with open(os.path.join(DIST_DIR, "manifest.json"), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+    return manifest
+
+
+if __name__ == "__main__":
+    result = build()
+    for source, target in result.items():
+        print(f"{source} -> {target}")
+    if brotli is None:
+        print("brotli не установлен: созданы только .gz варианты")
+    print(f"Готово: {DIST_DIR}")
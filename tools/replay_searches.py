@@ -0,0 +1,280 @@
+"""
+Нагрузочное воспроизведение записанных поисков на целевом сервере
+
+Запросы /api/search/* восстанавливаются из логов поиска (app/logging/replay.py)
+и отправляются с исходными интервалами между поисками, ускоренными в --speed раз
+(0 - без пауз, как можно быстрее), не более --concurrency одновременно.
+Отчёт по типам поиска: пропускная способность, перцентили задержки, доля ошибок
+и отставание от расписания (сервер или --concurrency не успевают за нагрузкой).
+
+Запуск:
+    python -m tools.replay_searches data/search_log.ndjson --speed 10
+    python -m tools.replay_searches archive/search_logs_20240101.ndjson.gz --speed 0 --concurrency 64
+    python -m tools.replay_searches --mongo --since 2024-06-01 --limit 20000 --target http://staging:8000
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import argparse
+import json
+import logging
+import math
+import threading
+import time
+
+import requests
+
+from app.logging.replay import ReplayRequest, read_ndjson, read_mongo, build_schedule
+
+PERCENTILES = (50, 90, 95, 99)
+
+_sessions = threading.local()
+
+
+def parse_args() -> argparse.Namespace:
+    """Разбор аргументов командной строки"""
+    parser = argparse.ArgumentParser(description="Воспроизведение записанных поисков")
+    parser.add_argument("paths", nargs="*", help="Файлы NDJSON с событиями поиска (.gz - сжатые)")
+    parser.add_argument("--mongo", action="store_true", help="Читать события из MongoDB (MONGODB_URL_READ)")
+    parser.add_argument("--since", help="Начало интервала для --mongo (ISO дата)")
+    parser.add_argument("--until", help="Конец интервала для --mongo (ISO дата)")
+    parser.add_argument("--limit", type=int, default=0, help="Максимум событий из MongoDB (0 - все)")
+    parser.add_argument("--target", default="http://127.0.0.1:8000", help="Адрес сервера")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Ускорение относительно исходного времени (0 - без пауз)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Максимум одновременных запросов")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Таймаут запроса, сек")
+    parser.add_argument("--include", help="Параметр include для всех запросов (проекция ответа)")
+    parser.add_argument("--no-weights", action="store_true",
+                        help="Воспроизводить каждое событие один раз, без учёта weight")
+    parser.add_argument("--json", action="store_true", help="Вывести отчёт в JSON")
+    args = parser.parse_args()
+    if not args.paths and not args.mongo:
+        parser.error("Укажите файлы NDJSON или --mongo")
+    return args
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def load_records(args: argparse.Namespace) -> List[Dict]:
+    """События поиска из файлов и/или MongoDB"""
+    records = list(read_ndjson(args.paths))
+    if args.mongo:
+        from pymongo import MongoClient
+        from local_settings import MONGODB_URL_READ
+        from app.logging.retention import SEARCH_LOG_COLLECTION
+        from tools.search_logs import DATABASE_NAME
+
+        client = MongoClient(MONGODB_URL_READ, tz_aware=True)
+        try:
+            collection = client[DATABASE_NAME][SEARCH_LOG_COLLECTION]
+            records.extend(read_mongo(
+                collection, _parse_date(args.since), _parse_date(args.until), args.limit
+            ))
+        finally:
+            client.close()
+    return records
+
+
+def load_actor_ids(target: str, timeout: float) -> Dict[str, int]:
+    """Справочник {полное имя: actor_id} целевого сервера (пустой при ошибке)"""
+    try:
+        response = requests.get(f"{target}/api/actors", timeout=timeout)
+        response.raise_for_status()
+        actor_ids = {}
+        for actor in response.json():
+            actor_ids.setdefault(actor["full_name"], actor["actor_id"])
+        return actor_ids
+    except (requests.RequestException, ValueError, KeyError, TypeError) as err:
+        logging.warning(f"Справочник актёров не загружен, поиск по актёру - по имени: {err}")
+        return {}
+
+
+# ===== ВОСПРОИЗВЕДЕНИЕ =====
+class ReplayStats:
+    """Результаты запросов по типам поиска"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {}
+        self.lags: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+
+    def record(self, search_type: str, status: str, latency_ms: float, lag_ms: float) -> None:
+        with self._lock:
+            self.latencies.setdefault(search_type, []).append(latency_ms)
+            self.lags.setdefault(search_type, []).append(lag_ms)
+            statuses = self.statuses.setdefault(search_type, {})
+            statuses[status] = statuses.get(status, 0) + 1
+
+    def report(self, elapsed: float) -> Dict[str, Dict]:
+        """
+        Отчёт по типам поиска и по всем запросам ("total")
+
+        Args:
+            elapsed (float): Длительность воспроизведения, сек
+
+        Returns:
+            Dict[str, Dict]: {тип: {requests, throughput_rps, error_rate, latency_ms, lag_ms, statuses}}
+        """
+        with self._lock:
+            groups = {name: (self.latencies[name], self.lags[name], self.statuses[name])
+                      for name in sorted(self.latencies)}
+        total_statuses: Dict[str, int] = {}
+        for _, _, statuses in groups.values():
+            for status, count in statuses.items():
+                total_statuses[status] = total_statuses.get(status, 0) + count
+        groups["total"] = (
+            [value for latencies, _, _ in groups.values() for value in latencies],
+            [value for _, lags, _ in groups.values() for value in lags],
+            total_statuses,
+        )
+        return {
+            name: _summary(latencies, lags, statuses, elapsed)
+            for name, (latencies, lags, statuses) in groups.items()
+        }
+
+
+def percentile(values: List[float], rank: float) -> float:
+    """Перцентиль по ближайшему рангу (values отсортированы)"""
+    if not values:
+        return 0.0
+    index = max(0, math.ceil(rank / 100 * len(values)) - 1)
+    return values[index]
+
+
+def _summary(latencies: List[float], lags: List[float], statuses: Dict[str, int],
+             elapsed: float) -> Dict:
+    latencies, lags = sorted(latencies), sorted(lags)
+    count = len(latencies)
+    errors = sum(value for status, value in statuses.items() if not status.startswith("2"))
+    return {
+        "requests": count,
+        "throughput_rps": round(count / elapsed, 2) if elapsed > 0 else None,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "latency_ms": {
+            **{f"p{rank}": round(percentile(latencies, rank), 1) for rank in PERCENTILES},
+            "max": round(latencies[-1], 1) if latencies else 0.0,
+        },
+        "lag_ms": {
+            "p50": round(percentile(lags, 50), 1),
+            "p99": round(percentile(lags, 99), 1),
+        },
+        "statuses": dict(sorted(statuses.items())),
+    }
+
+
+def _session() -> requests.Session:
+    """Сессия потока (keep-alive подключения к серверу)"""
+    session = getattr(_sessions, "session", None)
+    if session is None:
+        session = _sessions.session = requests.Session()
+    return session
+
+
+def send(target: str, request: ReplayRequest, timeout: float) -> Tuple[str, float]:
+    """
+    Отправка одного запроса (ответ читается полностью)
+
+    Returns:
+        Tuple[str, float]: (статус: код HTTP или имя исключения, задержка, мс)
+    """
+    start = time.perf_counter()
+    try:
+        response = _session().get(f"{target}{request.path}", params=request.params, timeout=timeout)
+        status = str(response.status_code)
+    except requests.RequestException as err:
+        status = type(err).__name__
+    return status, (time.perf_counter() - start) * 1000
+
+
+def replay(schedule: List[ReplayRequest], target: str, speed: float, concurrency: int,
+           timeout: float, include: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    Воспроизведение расписания запросов
+
+    Запрос отправляется в момент offset / speed от начала, но не раньше, чем
+    освободится одно из concurrency мест; задержка отправки учитывается как lag.
+
+    Args:
+        schedule (List[ReplayRequest]): Запросы по возрастанию offset
+        target (str): Адрес сервера
+        speed (float): Ускорение времени (0 - без пауз)
+        concurrency (int): Максимум одновременных запросов
+        timeout (float): Таймаут запроса, сек
+        include (Optional[str]): Параметр include для всех запросов
+
+    Returns:
+        Dict[str, Dict]: Отчёт ReplayStats.report
+    """
+    stats = ReplayStats()
+    slots = threading.BoundedSemaphore(concurrency)
+
+    def run(request: ReplayRequest, due: float) -> None:
+        try:
+            lag_ms = max(0.0, (time.perf_counter() - due) * 1000)
+            status, latency_ms = send(target, request, timeout)
+            stats.record(request.search_type, status, latency_ms, lag_ms)
+        finally:
+            slots.release()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for request in schedule:
+            if include is not None:
+                request = request._replace(params={**request.params, "include": include})
+            due = start + request.offset / speed if speed > 0 else time.perf_counter()
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            slots.acquire()
+            executor.submit(run, request, due)
+    return stats.report(time.perf_counter() - start)
+
+
+def print_report(report: Dict[str, Dict]) -> None:
+    """Таблица отчёта"""
+    columns = "{:<20} {:>8} {:>9} {:>8} {:>8} {:>8} {:>8} {:>9} {:>7} {:>9}"
+    print(columns.format("type", "requests", "rps", "p50 ms", "p90 ms", "p95 ms", "p99 ms",
+                         "max ms", "errors", "lag p99"))
+    for name, row in report.items():
+        latency = row["latency_ms"]
+        print(columns.format(
+            name, row["requests"], row["throughput_rps"] or "-", latency["p50"], latency["p90"],
+            latency["p95"], latency["p99"], latency["max"], f"{row['error_rate']:.1%}",
+            row["lag_ms"]["p99"]
+        ))
+    for name, row in report.items():
+        print(f"{name}: {row['statuses']}")
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args()
+    target = args.target.rstrip("/")
+    records = load_records(args)
+    schedule, skipped = build_schedule(
+        records, load_actor_ids(target, args.timeout), use_weights=not args.no_weights
+    )
+    if not schedule:
+        raise SystemExit("Нет поисков для воспроизведения")
+    duration = schedule[-1].offset / args.speed if args.speed > 0 else 0
+    logging.info(
+        f"Событий: {len(records)}, запросов: {len(schedule)}, пропущено: {skipped or 0}, "
+        f"расчётная длительность: {duration:.1f} с"
+    )
+    report = replay(schedule, target, args.speed, args.concurrency, args.timeout, args.include)
+    if args.json:
+        print(json.dumps({"report": report, "skipped": skipped}, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
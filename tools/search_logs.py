@@ -0,0 +1,62 @@
+"""
+Обслуживание коллекции логов поиска в MongoDB
+
+Команды:
+    indexes  - создать TTL индекс и индексы статистики
+    migrate  - перевести строковые timestamp в BSON даты пачками
+    archive  - выгрузить события старше срока хранения в LOG_ARCHIVE_DIR и удалить их
+
+Запуск:
+    python -m tools.search_logs migrate
+    python -m tools.search_logs archive --archive-dir /var/backups/search_logs
+"""
+
+import argparse
+import logging
+
+from pymongo import MongoClient
+
+from app.logging.retention import ensure_indexes, migrate_string_timestamps, archive_expired
+from app.settings import (
+    LOG_RETENTION_DAYS, LOG_ARCHIVE_DIR, LOG_ARCHIVE_GRACE_DAYS, LOG_MIGRATION_BATCH_SIZE
+)
+
+DATABASE_NAME = "ich_edit"
+
+
+def parse_args() -> argparse.Namespace:
+    """Разбор аргументов командной строки"""
+    parser = argparse.ArgumentParser(description="Обслуживание логов поиска в MongoDB")
+    parser.add_argument("command", choices=("indexes", "migrate", "archive"))
+    parser.add_argument("--retention-days", type=float, default=LOG_RETENTION_DAYS,
+                        help="Срок хранения событий, дней")
+    parser.add_argument("--archive-dir", default=LOG_ARCHIVE_DIR,
+                        help="Каталог архива для команды archive")
+    parser.add_argument("--batch-size", type=int, default=LOG_MIGRATION_BATCH_SIZE,
+                        help="Размер пачки для команды migrate")
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args()
+    from local_settings import MONGODB_URL_WRITE
+
+    client = MongoClient(MONGODB_URL_WRITE, tz_aware=True)
+    db = client[DATABASE_NAME]
+    try:
+        if args.command == "indexes":
+            grace = LOG_ARCHIVE_GRACE_DAYS if args.archive_dir else 0
+            ensure_indexes(db, args.retention_days, grace)
+        elif args.command == "migrate":
+            print(migrate_string_timestamps(db, args.batch_size))
+        else:
+            if not args.archive_dir or args.retention_days is None:
+                raise SystemExit("Для archive нужны --archive-dir и --retention-days")
+            print(archive_expired(db, args.archive_dir, args.retention_days))
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
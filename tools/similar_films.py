@@ -0,0 +1,59 @@
+"""
+Построение списков похожих фильмов
+
+Команды:
+    build        - построить векторы и списки соседей из MySQL и записать SIMILAR_FILMS_PATH
+    show FILM_ID - вывести похожие фильмы из файла (проверка результата)
+
+Запуск:
+    python -m tools.similar_films build
+    python -m tools.similar_films show 1 --top-k 10
+
+Работающее приложение подхватывает новый файл при следующем запуске;
+изменения данных между сборками оно учитывает само (ChangeWatcher).
+"""
+
+import argparse
+import logging
+
+from app.database.mysql_connector import MySQLConnector
+from app.database.similar_films import SimilarFilms
+from app.settings import SIMILAR_FILMS_PATH, SIMILAR_FILMS_TOP_K
+
+
+def parse_args() -> argparse.Namespace:
+    """Разбор аргументов командной строки"""
+    parser = argparse.ArgumentParser(description="Построение списков похожих фильмов")
+    parser.add_argument("command", choices=("build", "show"))
+    parser.add_argument("film_id", type=int, nargs="?", help="ID фильма для команды show")
+    parser.add_argument("--path", default=SIMILAR_FILMS_PATH, help="Файл .npz")
+    parser.add_argument("--top-k", type=int, default=SIMILAR_FILMS_TOP_K,
+                        help="Количество соседей каждого фильма")
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args()
+    if not args.path:
+        raise SystemExit("Не задан файл: --path или SIMILAR_FILMS_PATH")
+    from local_settings import dbconfig
+
+    mysql_db = MySQLConnector(dbconfig)
+    try:
+        similar_films = SimilarFilms(mysql_db, args.path, args.top_k)
+        if args.command == "build":
+            if not similar_films.rebuild():
+                raise SystemExit("Построение не выполнено: нет данных MySQL")
+            print(similar_films.stats())
+        else:
+            if args.film_id is None:
+                raise SystemExit("Для show нужен ID фильма")
+            similar_films.load()
+            print(similar_films.similar(args.film_id, args.top_k))
+    finally:
+        mysql_db.close()
+
+
+if __name__ == "__main__":
+    main()